@@ -0,0 +1 @@
+# benchmarks - 图像匹配性能基准脚本
@@ -0,0 +1,105 @@
+# benchmarks.bench_best_match - 最佳匹配快速路径基准
+"""
+对比「全量枚举后取第一名」与「最佳匹配快速路径」在示例截图上的单模板延迟
+
+分别统计打分阶段（matchTemplate 之后）和端到端（含 matchTemplate）的耗时。
+
+用法：
+    python -m benchmarks.bench_best_match [--similarity 0.8] [--repeat 5]
+"""
+import argparse
+import glob
+import statistics
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from win_util.image import ImageFinder, PROJECT_ROOT
+from win_util.matching import best_match, collect_matches
+
+EXAMPLE_DIR = PROJECT_ROOT / "yys" / "abyss_shadows" / "images" / "example"
+TEMPLATE_GLOBS = [
+    "yys/abyss_shadows/images/*.bmp",
+    "yys/abyss_shadows/images/scene/*.bmp",
+    "yys/common/images/scene/*.bmp",
+    "yys/images/*.bmp",
+]
+
+
+class StaticEnvironment:
+    """只提供截图的最小环境，供 ImageFinder 使用"""
+
+    def __init__(self, image: Image.Image):
+        self.image = image
+
+    def capture_screen(self) -> Image.Image:
+        return self.image
+
+
+def load_screenshots():
+    """加载示例截图（PIL 读取，兼容中文路径）"""
+    return [Image.open(path).convert('RGB') for path in sorted(EXAMPLE_DIR.glob("*.png"))]
+
+
+def time_call(fn, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="最佳匹配快速路径基准")
+    parser.add_argument("--similarity", type=float, default=0.8)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    sim = args.similarity
+
+    images = load_screenshots()
+    env = StaticEnvironment(images[0])
+    finder = ImageFinder(env=env)
+    frames = []
+    for image in images:
+        env.image = image
+        frames.append(finder.update_screenshot_cache())
+    templates = sorted({p for g in TEMPLATE_GLOBS for p in glob.glob(str(PROJECT_ROOT / g))})
+
+    print(f"截图 {len(frames)} 张，模板 {len(templates)} 个，相似度阈值 {sim}")
+    print(f"{'template':<32}{'score:full':>11}{'score:best':>11}{'e2e:full':>10}{'e2e:best':>10}{'e2e x':>7}")
+    totals = np.zeros(4)
+    mismatches = 0
+    for template in templates:
+        row = np.zeros(4)
+        for frame in frames:
+            # 预热：模板解码、帧派生产物只在首次调用时计算
+            prepared = finder._prepare_match(frame, template)
+            if prepared is None:
+                continue
+            tpl, search_frame, result, offset = prepared
+
+            t_score_full, full = time_call(lambda: collect_matches(search_frame, tpl, result, sim, offset), args.repeat)
+            t_score_best, best = time_call(lambda: best_match(search_frame, tpl, result, sim, offset), args.repeat)
+            t_e2e_full, _ = time_call(lambda: finder.bg_find_pic_all(frame, template, similarity=sim, nms_iou=None),
+                                      args.repeat)
+            t_e2e_best, _ = time_call(lambda: finder.bg_find_pic_best(frame, template, similarity=sim), args.repeat)
+            row += (t_score_full, t_score_best, t_e2e_full, t_e2e_best)
+            if (full[0] if full else None) != best:
+                mismatches += 1
+        row /= len(frames)
+        totals += row
+        print(f"{Path(template).name:<32}{row[0]:>11.3f}{row[1]:>11.3f}{row[2]:>10.2f}{row[3]:>10.2f}"
+              f"{row[2] / row[3]:>6.2f}x")
+
+    print(f"{'TOTAL(ms)':<32}{totals[0]:>11.3f}{totals[1]:>11.3f}{totals[2]:>10.2f}{totals[3]:>10.2f}"
+          f"{totals[2] / totals[3]:>6.2f}x")
+    print(f"打分阶段加速: {totals[0] / totals[1]:.2f}x，结果不一致: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# benchmarks.bench_cascade - 级联预筛基准
+"""
+在示例截图上对比直接完整匹配与「下采样相关 -> 完整匹配」级联的耗时
+
+准确性以完整匹配结果为准，统计级联造成的漏检（完整匹配找到、级联拒绝），
+并输出各级的拒绝率和平均耗时。--battle-end 时只测战斗结束配置使用的模板和级联，
+截图为全部 yys/**/example 示例截图。
+
+用法：
+    python -m benchmarks.bench_cascade [--similarity 0.8] [--repeat 3] [--level 2] [--slack 0.1] [--battle-end]
+"""
+import argparse
+import glob
+from collections import defaultdict
+
+from benchmarks.bench_best_match import StaticEnvironment, TEMPLATE_GLOBS, load_screenshots, time_call
+from PIL import Image
+
+from win_util.cascade import CASCADE_COARSE_SLACK, DetectorCascade, DownsampledCorrelationStage
+from win_util.image import ImageFinder, PROJECT_ROOT
+from yys.common.event_script_base import (BATTLE_END_CASCADE_LEVEL, BATTLE_END_LOSS_IMAGES, BATTLE_END_OTHER_IMAGES,
+                                          BATTLE_END_SUCCESS_IMAGES)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="级联预筛基准")
+    parser.add_argument("--similarity", type=float, default=0.8)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--level", type=int, default=2)
+    parser.add_argument("--slack", type=float, default=CASCADE_COARSE_SLACK)
+    parser.add_argument("--battle-end", action="store_true", help="只测战斗结束配置的模板和级联")
+    args = parser.parse_args()
+    sim = args.similarity
+
+    if args.battle_end:
+        images = [Image.open(path).convert('RGB') for path in sorted(PROJECT_ROOT.glob("yys/**/example/*.png"))]
+    else:
+        images = load_screenshots()
+    env = StaticEnvironment(images[0])
+    finder = ImageFinder(env=env)
+    # 只比较匹配本身：关闭帧内备忘、区域差分复用和学习区域
+    finder.match_memo.enabled = False
+    finder.dirty_tracker.enabled = False
+    finder.region_learner.enabled = False
+    frames = []
+    for image in images:
+        env.image = image
+        frames.append(finder.update_screenshot_cache())
+    if args.battle_end:
+        templates = BATTLE_END_SUCCESS_IMAGES + BATTLE_END_LOSS_IMAGES + BATTLE_END_OTHER_IMAGES
+        cascade = DetectorCascade([DownsampledCorrelationStage(BATTLE_END_CASCADE_LEVEL)])
+    else:
+        templates = sorted({p for g in TEMPLATE_GLOBS for p in glob.glob(str(PROJECT_ROOT / g))})
+        cascade = DetectorCascade([DownsampledCorrelationStage(args.level, args.slack)])
+
+    full_ms = cascade_ms = 0.0
+    found = missed = 0
+    for template in templates:
+        for frame in frames:
+            # 预热：模板解码、帧派生产物只在首次调用时计算
+            finder.bg_find_pic_best(frame, template, similarity=sim, cascade=cascade)
+            elapsed, expected = time_call(lambda: finder.bg_find_pic_best(frame, template, similarity=sim),
+                                          args.repeat)
+            full_ms += elapsed
+            elapsed, actual = time_call(
+                lambda: finder.bg_find_pic_best(frame, template, similarity=sim, cascade=cascade), args.repeat)
+            cascade_ms += elapsed
+            found += expected is not None
+            missed += expected is not None and actual is None
+
+    stages = defaultdict(lambda: [0, 0, 0.0])
+    for row in cascade.report():
+        totals = stages[row['stage']]
+        totals[0] += row['evaluated']
+        totals[1] += row['rejected']
+        totals[2] += row['mean_us'] * row['evaluated']
+
+    pairs = len(templates) * len(frames)
+    print(f"截图 {len(frames)} 张，模板 {len(templates)} 个，相似度阈值 {sim}，完整匹配命中 {found} / {pairs}")
+    print(f"完整匹配 {full_ms:.1f} ms，级联 {cascade_ms:.1f} ms ({full_ms / cascade_ms:.2f}x)，级联漏检 {missed}")
+    print(f"{'stage':<14}{'evaluated':>10}{'rejected':>10}{'reject':>9}{'mean(us)':>10}")
+    for stage in cascade.stages:
+        evaluated, rejected, total_us = stages[stage.name]
+        print(f"{stage.name:<14}{evaluated:>10}{rejected:>10}{rejected / max(1, evaluated):>9.1%}"
+              f"{total_us / max(1, evaluated):>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+# benchmarks.bench_fft_matching - FFT 批量相关基准
+"""
+在示例截图上对比空间域 matchTemplate、FFT 频域相关和自动选择三种方式，
+模板数量分别为 10 / 50 / 200（模板不足时循环使用），统计每帧耗时和与空间域结果的偏差
+
+用法：
+    python -m benchmarks.bench_fft_matching [--counts 10 50 200] [--repeat 3]
+"""
+import argparse
+import itertools
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.bench_best_match import StaticEnvironment, load_screenshots
+from win_util.fft_matching import correlate, fft_correlation, fft_decisions
+from win_util.frame import ScreenFrame
+from win_util.image import ImageFinder, PROJECT_ROOT
+
+
+def spatial(frame, template):
+    return cv2.matchTemplate(frame.gray, template.gray, cv2.TM_CCOEFF_NORMED)
+
+
+MODES = {'spatial': spatial, 'fft': fft_correlation, 'auto': correlate}
+
+
+def load_templates(finder, frame):
+    paths = sorted(p for p in (PROJECT_ROOT / "yys").rglob("*.bmp") if "debug" not in p.parts)
+    templates = [finder.template_cache.get(str(p)) for p in paths]
+    return [t for t in templates if t is not None and t.width <= frame.width and t.height <= frame.height]
+
+
+def run_mode(fn, frames, templates, repeat):
+    """每次都用新的 ScreenFrame，计入每帧一次的频谱等派生产物开销"""
+    samples = []
+    for _ in range(repeat):
+        for frame in frames:
+            fresh = ScreenFrame(np.asarray(frame))
+            start = time.perf_counter()
+            for template in templates:
+                fn(fresh, template)
+            samples.append(time.perf_counter() - start)
+    return float(np.median(samples)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FFT 批量相关基准")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    images = load_screenshots()
+    env = StaticEnvironment(images[0])
+    finder = ImageFinder(env=env)
+    frames = []
+    for image in images:
+        env.image = image
+        frames.append(finder.update_screenshot_cache())
+    unique = load_templates(finder, frames[0])
+
+    # 准确性：FFT 与空间域相关系数图的最大偏差和最大值位置是否一致
+    max_diff, argmax_mismatch = 0.0, 0
+    for frame in frames:
+        for template in unique:
+            expected, actual = spatial(frame, template), fft_correlation(frame, template)
+            max_diff = max(max_diff, float(np.abs(expected - actual).max()))
+            argmax_mismatch += cv2.minMaxLoc(expected)[3] != cv2.minMaxLoc(actual)[3]
+    # 自动选择先对每个模板做一次计时探测，计时循环中只测选定后的耗时
+    for template in unique:
+        correlate(frames[0], template)
+    decisions = fft_decisions()
+    fft_share = sum(decisions.values()) / len(unique) if unique else 0.0
+    print(f"截图 {len(frames)} 张 {frames[0].width}x{frames[0].height}，不同模板 {len(unique)} 个，"
+          f"自动选择 FFT 的比例 {fft_share:.0%}")
+    print(f"FFT 与空间域最大偏差 {max_diff:.5f}，最大值位置不一致 {argmax_mismatch} / {len(frames) * len(unique)}")
+
+    print(f"{'templates':>10}" + "".join(f"{mode + '(ms)':>14}" for mode in MODES) + f"{'fft x':>8}{'auto x':>8}")
+    for count in args.counts:
+        templates = list(itertools.islice(itertools.cycle(unique), count))
+        timings = {mode: run_mode(fn, frames, templates, args.repeat) for mode, fn in MODES.items()}
+        print(f"{count:>10}" + "".join(f"{timings[mode]:>14.1f}" for mode in MODES)
+              + f"{timings['spatial'] / timings['fft']:>7.2f}x{timings['spatial'] / timings['auto']:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
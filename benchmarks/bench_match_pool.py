@@ -0,0 +1,64 @@
+# benchmarks.bench_match_pool - 多模板并行匹配扩展性基准
+"""
+在示例截图上用 1..N 个工作线程并行匹配全部模板，统计每帧耗时和相对单线程的加速比
+
+cv2.matchTemplate 执行期间会释放 GIL，因此多线程可以真正并行；
+OpenCV 自身也有内部并行，可用 --cv-threads 1 关闭以单独观察线程池的扩展性。
+
+用法：
+    python -m benchmarks.bench_match_pool [--max-workers 8] [--repeat 5] [--cv-threads -1]
+"""
+import argparse
+import glob
+import os
+
+import cv2
+
+from benchmarks.bench_best_match import StaticEnvironment, TEMPLATE_GLOBS, load_screenshots, time_call
+from win_util.image import ImageFinder, PROJECT_ROOT
+from win_util.match_pool import MatchJob
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多模板并行匹配扩展性基准")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--similarity", type=float, default=0.8)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--cv-threads", type=int, default=-1, help="cv2.setNumThreads，-1 表示保持默认")
+    args = parser.parse_args()
+    if args.cv_threads >= 0:
+        cv2.setNumThreads(args.cv_threads)
+
+    images = load_screenshots()
+    env = StaticEnvironment(images[0])
+    finder = ImageFinder(env=env)
+    frames = []
+    for image in images:
+        env.image = image
+        frames.append(finder.update_screenshot_cache())
+    templates = sorted({p for g in TEMPLATE_GLOBS for p in glob.glob(str(PROJECT_ROOT / g))})
+    jobs = [MatchJob(path, similarity=args.similarity) for path in templates]
+
+    # 预热：模板解码、帧派生产物只在首次调用时计算
+    finder.set_match_workers(1)
+    expected = [finder.bg_find_pic_batch(frame, jobs) for frame in frames]
+
+    print(f"截图 {len(frames)} 张，模板 {len(jobs)} 个，CPU {os.cpu_count()} 核，"
+          f"OpenCV 线程 {cv2.getNumThreads()}")
+    print(f"{'workers':>8}{'ms/frame':>10}{'speedup':>9}")
+    baseline = None
+    for workers in range(1, args.max_workers + 1):
+        finder.set_match_workers(workers)
+        total = 0.0
+        for frame, frame_expected in zip(frames, expected):
+            elapsed, results = time_call(lambda: finder.bg_find_pic_batch(frame, jobs), args.repeat)
+            total += elapsed
+            assert results == frame_expected, "并行结果与串行不一致"
+        per_frame = total / len(frames)
+        baseline = baseline or per_frame
+        print(f"{workers:>8}{per_frame:>10.2f}{baseline / per_frame:>8.2f}x")
+    finder.match_pool.shutdown()
+
+
+if __name__ == '__main__':
+    main()
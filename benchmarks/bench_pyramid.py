@@ -0,0 +1,89 @@
+# benchmarks.bench_pyramid - 金字塔粗到精匹配基准
+"""
+在示例截图上对比原分辨率全屏匹配与金字塔匹配（1/2、1/4、默认的自动选择）的耗时和准确性
+
+准确性以原分辨率结果为准：
+- 漏检：原分辨率找到、金字塔没找到
+- 误检：原分辨率没找到、金字塔找到
+- 偏移：两者都找到但中心点距离超过 --tolerance 像素
+
+用法：
+    python -m benchmarks.bench_pyramid [--similarity 0.8] [--repeat 5] [--tolerance 2]
+"""
+import argparse
+import glob
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.bench_best_match import StaticEnvironment, TEMPLATE_GLOBS, load_screenshots, time_call
+from win_util.image import ImageFinder, PROJECT_ROOT
+
+# None 为默认的自动选择（全屏搜索时按模板尺寸选择层级）
+LEVELS = (1, 2, None)
+
+
+def _label(level):
+    return 'auto' if level is None else f'L{level}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="金字塔粗到精匹配基准")
+    parser.add_argument("--similarity", type=float, default=0.8)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tolerance", type=int, default=2)
+    args = parser.parse_args()
+    sim = args.similarity
+
+    images = load_screenshots()
+    env = StaticEnvironment(images[0])
+    finder = ImageFinder(env=env)
+    frames = []
+    for image in images:
+        env.image = image
+        frames.append(finder.update_screenshot_cache())
+    templates = sorted({p for g in TEMPLATE_GLOBS for p in glob.glob(str(PROJECT_ROOT / g))})
+
+    print(f"截图 {len(frames)} 张，模板 {len(templates)} 个，相似度阈值 {sim}")
+    header = f"{'template':<32}{'size':>9}{'full':>8}" + "".join(f"{_label(lv):>8}" for lv in LEVELS)
+    print(header)
+    totals = np.zeros(1 + len(LEVELS))
+    errors = {lv: {'miss': 0, 'false': 0, 'shift': 0} for lv in LEVELS}
+    found = 0
+    for template in templates:
+        row = np.zeros(1 + len(LEVELS))
+        for frame in frames:
+            # 预热：模板解码、帧派生产物（含金字塔）只在首次调用时计算
+            for lv in (0,) + LEVELS:
+                finder.bg_find_pic_best(frame, template, similarity=sim, pyramid_level=lv)
+
+            row[0] += time_call(lambda: finder.bg_find_pic_best(frame, template, similarity=sim, pyramid_level=0),
+                                args.repeat)[0]
+            expected = finder.bg_find_pic_best(frame, template, similarity=sim, pyramid_level=0)
+            found += expected is not None
+            for i, lv in enumerate(LEVELS, start=1):
+                elapsed, actual = time_call(
+                    lambda: finder.bg_find_pic_best(frame, template, similarity=sim, pyramid_level=lv), args.repeat)
+                row[i] += elapsed
+                if expected is not None and actual is None:
+                    errors[lv]['miss'] += 1
+                elif expected is None and actual is not None:
+                    errors[lv]['false'] += 1
+                elif expected is not None and max(abs(expected[0] - actual[0]),
+                                                  abs(expected[1] - actual[1])) > args.tolerance:
+                    errors[lv]['shift'] += 1
+        row /= len(frames)
+        totals += row
+        tpl = finder.template_cache.get(template)
+        print(f"{Path(template).name:<32}{f'{tpl.width}x{tpl.height}':>9}"
+              + "".join(f"{v:>8.2f}" for v in row))
+
+    print(f"{'TOTAL(ms)':<32}{'':>9}" + "".join(f"{v:>8.2f}" for v in totals))
+    print(f"原分辨率命中 {found} / {len(frames) * len(templates)}")
+    for i, lv in enumerate(LEVELS, start=1):
+        print(f"{_label(lv)}: 加速 {totals[0] / totals[i]:.2f}x，漏检 {errors[lv]['miss']}，"
+              f"误检 {errors[lv]['false']}，偏移 {errors[lv]['shift']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# benchmarks.bench_scene_detection - 场景识别基准
+"""
+在示例截图上对比逐个模板匹配场景图与像素指纹识别的耗时
+
+先关闭指纹逐个模板匹配得到基准结果，再打开指纹识别一轮（学习各场景图的位置），
+之后统计指纹路径的耗时，以及与基准结果不一致的次数。
+
+用法：
+    python -m benchmarks.bench_scene_detection [--repeat 20]
+"""
+import argparse
+
+from benchmarks.bench_best_match import StaticEnvironment, load_screenshots, time_call
+from win_util.image import ImageFinder, PROJECT_ROOT
+from yys.common.scene_fingerprint import SceneFingerprintIndex
+from yys.common.scene_manager import SceneManager
+
+SCENE_DIRS = [
+    PROJECT_ROOT / "yys" / "common" / "images" / "scene",
+    PROJECT_ROOT / "yys" / "abyss_shadows" / "images" / "scene",
+]
+
+
+class FinderController:
+    """只提供找图的最小控制器，供 SceneManager 使用"""
+
+    def __init__(self, finder: ImageFinder):
+        self.image_finder = finder
+
+    def bg_find_pic(self, screenshot, small_img_path, *args, **kwargs):
+        return self.image_finder.bg_find_pic(screenshot, small_img_path, *args, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="场景识别基准")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    images = load_screenshots()
+    env = StaticEnvironment(images[0])
+    finder = ImageFinder(env=env)
+    # 只比较识别本身：关闭帧内备忘、区域差分复用和学习区域
+    finder.match_memo.enabled = False
+    finder.dirty_tracker.enabled = False
+    finder.region_learner.enabled = False
+    frames = []
+    for image in images:
+        env.image = image
+        frames.append(finder.update_screenshot_cache())
+
+    manager = SceneManager(0, FinderController(finder))
+    manager.fingerprints = SceneFingerprintIndex(path=None)
+    for scene_dir in SCENE_DIRS:
+        manager.register_scenes_from_directory(str(scene_dir), str(scene_dir / "none"))
+
+    def scene_of(frame):
+        result = manager.detect_current_scene(frame)
+        return result.scene_name if result else None
+
+    def templates_per_detection(start):
+        tried, detections = manager.templates_tried - start[0], manager.detections - start[1]
+        return tried / max(1, detections)
+
+    manager.fingerprints.enabled = False
+    start = (manager.templates_tried, manager.detections)
+    template_ms, expected = 0.0, []
+    for frame in frames:
+        elapsed, scene = time_call(lambda: scene_of(frame), args.repeat)
+        template_ms += elapsed
+        expected.append(scene)
+    template_tried = templates_per_detection(start)
+
+    manager.fingerprints.enabled = True
+    for frame in frames:
+        scene_of(frame)
+    manager.fingerprints.reset_stats()
+    start = (manager.templates_tried, manager.detections)
+    fingerprint_ms, mismatches = 0.0, 0
+    # 指纹唯一命中（不做任何模板匹配）的帧单独统计
+    hit_ms, hit_frames = 0.0, 0
+    for frame, scene in zip(frames, expected):
+        unique_hits = manager.fingerprints.unique_hits
+        elapsed, actual = time_call(lambda: scene_of(frame), args.repeat)
+        fingerprint_ms += elapsed
+        mismatches += actual != scene
+        if manager.fingerprints.unique_hits - unique_hits == args.repeat:
+            hit_ms += elapsed
+            hit_frames += 1
+
+    fingerprint_tried = templates_per_detection(start)
+
+    stats = manager.fingerprints.stats()
+    print(f"截图 {len(frames)} 张，场景图 {sum(len(p) for p in manager.scene_images.values())} 张，"
+          f"已学习指纹 {stats['fingerprints']} 个，识别结果 {expected}")
+    print(f"模板匹配 {template_ms / len(frames):.3f} ms/帧，指纹 {fingerprint_ms / len(frames):.3f} ms/帧 "
+          f"({template_ms / fingerprint_ms:.1f}x)，结果不一致 {mismatches}")
+    print(f"平均每次识别模板匹配：模板匹配 {template_tried:.2f} 次，指纹 {fingerprint_tried:.2f} 次")
+    print(f"指纹唯一命中 {stats['unique_hits']} / {stats['probes']}，并列 {stats['ties']}，未命中 {stats['misses']}，"
+          f"探测平均 {stats['mean_us']:.0f}us")
+    if hit_frames:
+        print(f"指纹命中帧 {hit_frames} 张，识别 {hit_ms / hit_frames:.3f} ms/帧")
+    stats = manager.classifier.stats()
+    print(f"缩略图分类 {stats['classifications']} 次，场景图 {stats['references']} 张，平均 {stats['mean_us']:.0f}us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# benchmarks.bench_startup - 模板预编译包启动耗时基准
+"""
+对比使用/不使用模板预编译包时的启动耗时
+
+每轮在独立子进程中测量：导入找图与场景模块、注册公共场景目录、首次加载所有模板
+（即首轮场景检测前需要完成的读盘和解码）。预编译包不存在时先自动生成。
+
+用法：
+    python -m benchmarks.bench_startup [--repeat 5]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+PHASES = ['import', 'register', 'templates', 'total']
+
+
+def child(use_bundle: bool):
+    start = time.perf_counter()
+    from unittest.mock import Mock
+
+    from win_util.image import to_project_path
+    from win_util.template_bundle import get_template_bundle, list_bundle_templates, set_template_bundle
+    from win_util.template_cache import TemplateCache
+    from yys.common.scene_manager import SceneManager
+    imported = time.perf_counter()
+
+    if not use_bundle:
+        set_template_bundle(None)
+    manager = SceneManager(0, Mock())
+    manager.register_scenes_from_directory(to_project_path("yys/common/images/scene/"),
+                                           to_project_path("yys/common/images/scene_control/"))
+    registered = time.perf_counter()
+
+    cache = TemplateCache(use_bundle=use_bundle)
+    for path in list_bundle_templates():
+        cache.get(path)
+    loaded = time.perf_counter()
+
+    bundle = get_template_bundle()
+    print(json.dumps({
+        'import': imported - start,
+        'register': registered - imported,
+        'templates': loaded - registered,
+        'total': loaded - start,
+        'bundle_loads': cache.stats()['bundle_loads'],
+        'misses': cache.stats()['misses'],
+        'scenes': len(manager.scene_images),
+        'bundled': 0 if bundle is None else len(bundle),
+    }))
+
+
+def run(use_bundle: bool, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        args = [sys.executable, "-m", "benchmarks.bench_startup", "--child"] + ([] if use_bundle else ["--no-bundle"])
+        output = subprocess.run(args, capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    result = {phase: statistics.median(s[phase] for s in samples) * 1000 for phase in PHASES}
+    result.update({key: samples[-1][key] for key in ('bundle_loads', 'misses', 'scenes', 'bundled')})
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模板预编译包启动耗时基准")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--no-bundle", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(not args.no_bundle)
+        return
+
+    from win_util.template_bundle import DEFAULT_BUNDLE_PATH, build_bundle
+    if not DEFAULT_BUNDLE_PATH.exists():
+        print(f"生成预编译包: {build_bundle()} 个模板 -> {DEFAULT_BUNDLE_PATH}")
+
+    print(f"{'mode':>10}" + "".join(f"{phase + '(ms)':>16}" for phase in PHASES) + f"{'from bundle':>14}")
+    for use_bundle in (False, True):
+        result = run(use_bundle, args.repeat)
+        print(f"{'bundle' if use_bundle else 'bmp':>10}" + "".join(f"{result[p]:>16.1f}" for p in PHASES)
+              + f"{result['bundle_loads']:>8} / {result['misses']}")
+
+
+if __name__ == '__main__':
+    main()
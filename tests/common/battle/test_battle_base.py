@@ -4,6 +4,7 @@ import pytest
 from unittest.mock import Mock, MagicMock
 from yys.common.battle.base import BattleFlow
 from yys.common.battle.hooks import BattleHooks
+from yys.common.battle.polling import FramePoller
 from yys.common.constants import BattleEndType, ImageSimilarity, ClickRange
 from yys.common.operations import ImageOperations, OperationResult
 
@@ -54,6 +55,7 @@ def mock_operations():
     ops.wait_for_image = Mock()
     ops.find_and_click = Mock()
     ops.find_image = Mock()
+    ops.capture_and_find_first = Mock()
     return ops
 
 
@@ -182,19 +184,16 @@ def test_battle_flow_poll_battle_end_victory(mock_operations):
         {'image': 'defeat.bmp', 'type': 'defeat'},
     ]
 
-    # 模拟先找到胜利图片
-    call_count = [0]
+    # 模拟同一帧上胜利和失败图片都命中，胜利优先
+    def mock_capture_and_find_first(image_paths, similarity=0.8):
+        assert image_paths == ['victory.bmp', 'defeat.bmp']
+        return image_paths[0], OperationResult(success=True, position=(100, 200))
 
-    def mock_find_image(img_path, **kwargs):
-        call_count[0] += 1
-        if 'victory.bmp' in img_path:
-            return OperationResult(success=True, position=(100, 200))
-        return OperationResult(success=False)
-
-    ops.find_image.side_effect = mock_find_image
+    ops.capture_and_find_first.side_effect = mock_capture_and_find_first
 
     end_type = flow._poll_battle_end(max_wait_seconds=5)
     assert end_type == BattleEndType.VICTORY
+    ops.find_image.assert_not_called()
 
 
 def test_battle_flow_poll_battle_end_defeat(mock_operations):
@@ -216,17 +215,41 @@ def test_battle_flow_poll_battle_end_defeat(mock_operations):
         {'image': 'defeat.bmp', 'type': 'defeat'},
     ]
 
-    def mock_find_image(img_path, **kwargs):
-        if 'defeat.bmp' in img_path:
-            return OperationResult(success=True, position=(100, 200))
-        return OperationResult(success=False)
-
-    ops.find_image.side_effect = mock_find_image
+    ops.capture_and_find_first.return_value = ('defeat.bmp', OperationResult(success=True, position=(100, 200)))
 
     end_type = flow._poll_battle_end(max_wait_seconds=5)
     assert end_type == BattleEndType.DEFEAT
 
 
+def test_frame_poller_one_frame_per_tick(mock_operations, fake_clock):
+    """测试每个节拍只截一帧并批量匹配，命中后记录检测延迟"""
+    ops = mock_operations
+    results = iter([
+        (None, OperationResult(success=False)),
+        (None, OperationResult(success=False)),
+        ('defeat.bmp', OperationResult(success=True, position=(100, 200))),
+    ])
+
+    def capture_and_find_first(image_paths, similarity):
+        # 每次截图和匹配耗时 4ms
+        fake_clock.sleep(0.004)
+        return next(results)
+
+    ops.capture_and_find_first.side_effect = capture_and_find_first
+    poller = FramePoller(ops, tick_rate=100, clock=fake_clock, sleep=fake_clock.sleep)
+
+    assert poller.poll(['victory.bmp', 'defeat.bmp'], timeout=5) == 'defeat.bmp'
+    assert ops.capture_and_find_first.call_count == 3
+    stats = poller.stats()
+    assert stats['ticks'] == 3 and stats['detections'] == 1
+    # 命中帧与上一帧间隔 10ms，延迟按一半加上本帧耗时估计
+    assert abs(stats['mean_latency_ms'] - 9.0) < 1e-6
+    assert abs(stats['mean_tick_ms'] - 4.0) < 1e-6
+
+    # 超时或被停止时返回 None
+    assert poller.poll(['victory.bmp'], timeout=5, should_continue=lambda: False) is None
+
+
 def test_battle_flow_battle_end_configs_default_empty(mock_operations):
     """测试默认 BATTLE_END_CONFIGS 为空"""
     hooks = MockBattleHooks()
@@ -0,0 +1,38 @@
+# tests.common.battle.test_battle_duration - 战斗时长分布测试
+
+from unittest.mock import Mock
+
+from yys.common.battle.duration import BattleDurationModel, MIN_DURATION_SAMPLES, SLOW_POLL_MARGIN
+from yys.common.battle.polling import FramePoller
+from yys.common.operations import ImageOperations, OperationResult
+
+
+def test_slow_phase_from_persisted_durations(tmp_path):
+    """测试样本足够后按最短的一批战斗预测低频时长，样本跨运行保留"""
+    path = tmp_path / "battle_durations.json"
+    model = BattleDurationModel(path)
+    for seconds in range(MIN_DURATION_SAMPLES - 1):
+        model.record("soul_raid", 30.0 + seconds)
+    assert model.slow_phase_seconds("soul_raid") == 0.0
+
+    model.record("soul_raid", 40.0)
+    assert model.slow_phase_seconds("soul_raid") == 30.0 - SLOW_POLL_MARGIN
+    assert model.slow_phase_seconds("yuling") == 0.0
+    assert model.save() and not model.save()
+
+    reloaded = BattleDurationModel(path)
+    assert reloaded.stats("soul_raid")['samples'] == MIN_DURATION_SAMPLES
+    assert reloaded.slow_phase_seconds("soul_raid") == 30.0 - SLOW_POLL_MARGIN
+
+
+def test_poller_slow_phase_takes_fewer_frames(fake_clock):
+    """测试低频阶段按低频节拍截图，到点后切换到正常频率"""
+    ops = Mock(spec=ImageOperations)
+    ops.capture_and_find_first = Mock(return_value=(None, OperationResult(success=False)))
+    poller = FramePoller(ops, tick_rate=10, clock=fake_clock, sleep=fake_clock.sleep)
+
+    # 前 2 秒每秒一帧（0s、1s），之后每 0.1 秒一帧（2.0s ~ 2.9s）
+    assert poller.poll(['victory.bmp'], timeout=2.95, slow_seconds=2.0, slow_tick_rate=1) is None
+    stats = poller.stats()
+    assert stats['slow_ticks'] == 2
+    assert stats['ticks'] - stats['slow_ticks'] == 10
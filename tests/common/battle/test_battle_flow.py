@@ -0,0 +1,37 @@
+# tests.common.battle.test_battle_flow - 战斗状态机测试
+
+from yys.common.battle.flow import BattlePhase, BattleStateMachine
+
+
+def test_phase_templates_gate_matching():
+    """测试未声明的阶段不限制模板，声明后只允许该阶段的模板"""
+    machine = BattleStateMachine()
+    machine.declare(BattlePhase.BATTLE_RUNNING, ["battle_end.bmp"])
+    machine.declare(BattlePhase.BATTLE_RUNNING, ["battle_end_loss.bmp"])
+
+    assert machine.templates_for() is None
+    assert machine.allows("challenge.bmp")
+
+    machine.transition_to(BattlePhase.BATTLE_RUNNING, {"round": 1})
+    assert machine.templates_for() == {"battle_end.bmp", "battle_end_loss.bmp"}
+    assert machine.allows("battle_end_loss.bmp")
+    assert not machine.allows("challenge.bmp")
+    assert machine.phase_data == {"round": 1}
+
+
+def test_per_phase_timing():
+    """测试按阶段统计进入次数、帧数和每帧模板数"""
+    machine = BattleStateMachine()
+    machine.record_frame(0.004, 10)
+    machine.transition_to(BattlePhase.BATTLE_RUNNING)
+    machine.record_frame(0.001, 2)
+    machine.record_frame(0.003, 2)
+    machine.transition_to(BattlePhase.IDLE)
+
+    rows = {row['phase']: row for row in machine.report()}
+    assert rows['idle']['entries'] == 2 and rows['idle']['frames'] == 1
+    assert rows['idle']['templates_per_frame'] == 10
+    assert rows['battle_running']['entries'] == 1 and rows['battle_running']['frames'] == 2
+    assert rows['battle_running']['templates_per_frame'] == 2
+    assert rows['battle_running']['match_ms_per_frame'] == 2.0
+    assert rows['battle_running']['seconds'] >= 0
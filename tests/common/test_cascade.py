@@ -0,0 +1,60 @@
+# tests.common.test_cascade - 级联预筛测试
+
+import cv2
+import numpy as np
+
+from win_util.cascade import CascadeStage, DetectorCascade, DownsampledCorrelationStage, PixelSignatureStage
+from win_util.frame import as_frame
+from win_util.resolution import NATIVE_SCALE
+from win_util.template_cache import TemplateEntry
+
+
+def _template(bgr):
+    gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+    hsv_mean = np.array(cv2.mean(cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV))[:3])
+    return TemplateEntry(path="button.bmp", mtime=0.0, bgr=bgr, gray=gray, hsv_mean=hsv_mean)
+
+
+class _CountingStage(CascadeStage):
+    name = "counting"
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def check(self, search_frame, offset, template, similarity, scale) -> bool:
+        self.calls += 1
+        return self.result
+
+
+def test_pixel_signature_and_short_circuit():
+    """测试像素特征点按容差判断（坐标相对整帧），任一级拒绝后不再执行后续各级，并统计拒绝率"""
+    image = np.zeros((60, 80, 3), dtype=np.uint8)
+    image[30, 40] = (20, 120, 240)
+    frame = as_frame(image)
+    template = _template(np.zeros((10, 10, 3), dtype=np.uint8))
+    search_frame = frame.crop(20, 20, 80, 60)
+
+    assert PixelSignatureStage([(40, 30, "1478F0")]).check(search_frame, (20, 20), template, 0.8, NATIVE_SCALE)
+    assert not PixelSignatureStage([(40, 30, "F07814")]).check(search_frame, (20, 20), template, 0.8,
+                                                               NATIVE_SCALE)
+
+    tail = _CountingStage(True)
+    cascade = DetectorCascade([PixelSignatureStage([(40, 30, "F07814")]), tail])
+    assert not cascade.passes("button.bmp", search_frame, (20, 20), template, 0.8, NATIVE_SCALE)
+    assert tail.calls == 0
+    report = cascade.report()
+    assert [(row['stage'], row['evaluated'], row['reject_rate']) for row in report] == [("pixel", 1, 1.0)]
+
+
+def test_downsampled_correlation_rejects_absent_template():
+    """测试下采样后相关系数达不到粗阈值时拒绝，模板出现在区域内时通过"""
+    rng = np.random.default_rng(5)
+    # 模糊后的噪声图，下采样后仍保留结构
+    screen = cv2.GaussianBlur(rng.integers(0, 256, (240, 320, 3), dtype=np.uint8), (0, 0), 2)
+    template = _template(screen[100:180, 120:220].copy())
+    stage = DownsampledCorrelationStage(level=3)
+
+    assert stage.check(as_frame(screen), (0, 0), template, 0.8, NATIVE_SCALE)
+    other = cv2.GaussianBlur(rng.integers(0, 256, (240, 320, 3), dtype=np.uint8), (0, 0), 2)
+    assert not stage.check(as_frame(other), (0, 0), template, 0.8, NATIVE_SCALE)
@@ -0,0 +1,71 @@
+# tests.common.test_dirty_region - 脏区域跟踪测试
+
+import numpy as np
+
+from win_util.dirty_region import DirtyTileTracker
+from win_util.frame import ScreenFrame
+
+
+def _frames():
+    rng = np.random.default_rng(5)
+    first = rng.integers(0, 256, (100, 160, 3), dtype=np.uint8)
+    second = first.copy()
+    # 只改动右下角一个瓦片内的像素
+    second[70:80, 130:140] = 255 - second[70:80, 130:140]
+    # 单个像素、单个通道的变化也要被检测到
+    second[5, 5, 0] = 255 - second[5, 5, 0]
+    return ScreenFrame(first), ScreenFrame(second)
+
+
+def test_update_marks_changed_tiles():
+    """测试只有发生变化的瓦片被标记"""
+    tracker = DirtyTileTracker(tile_size=32)
+    first, second = _frames()
+    assert tracker.update(first) is None
+
+    dirty = tracker.update(second)
+    assert dirty.shape == (4, 5)
+    assert np.argwhere(dirty > 0).tolist() == [[0, 0], [2, 4]]
+    assert not tracker.changed_since(first.frame_id, 32, 0, 120, 100)
+    assert tracker.changed_since(first.frame_id, 100, 50, 160, 100)
+
+
+def test_reuse_or_compute_counts():
+    """测试区域未变化时复用结果，变化时重新计算"""
+    tracker = DirtyTileTracker(tile_size=32)
+    first, second = _frames()
+    calls = []
+
+    def compute(value):
+        calls.append(value)
+        return value
+
+    tracker.update(first)
+    assert tracker.reuse_or_compute('left', first, (32, 0, 96, 64), lambda: compute('a')) == 'a'
+    assert tracker.reuse_or_compute('right', first, (96, 32, 160, 100), lambda: compute('b')) == 'b'
+
+    tracker.update(second)
+    assert tracker.reuse_or_compute('left', second, (32, 0, 96, 64), lambda: compute('c')) == 'a'
+    assert tracker.reuse_or_compute('right', second, (96, 32, 160, 100), lambda: compute('d')) == 'd'
+    # 裁剪出的子区域不参与复用
+    assert tracker.reuse_or_compute('left', second.crop(32, 0, 96, 64), (32, 0, 96, 64), lambda: compute('e')) == 'e'
+
+    assert calls == ['a', 'b', 'd', 'e']
+    assert (tracker.reused, tracker.recomputed) == (1, 3)
+
+
+def test_gradual_drift_marks_tiles_dirty():
+    """测试每帧变化都低于阈值的渐变画面，累计超过阈值后仍会重新计算"""
+    tracker = DirtyTileTracker(tile_size=32)
+    calls = []
+    results = []
+    for i in range(30):
+        level = round(232 * i / 29)
+        frame = ScreenFrame(np.full((64, 64, 3), level, dtype=np.uint8))
+        tracker.update(frame)
+        results.append(tracker.reuse_or_compute('fade', frame, (0, 0, 64, 64),
+                                                lambda: calls.append(level) or level))
+
+    # 每帧约变化 8，低于阈值；与最近一次重新计算时的画面相差不会超过阈值
+    assert len(calls) > 1
+    assert all(abs(result - round(232 * i / 29)) <= tracker.threshold for i, result in enumerate(results))
@@ -0,0 +1,84 @@
+# tests.common.test_fft_matching - FFT 相关测试
+
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from win_util import fft_matching
+from win_util.fft_matching import (clear_fft_decisions, correlate, correlate_batch, fft_correlation,
+                                   fft_decisions, should_use_fft)
+from win_util.frame import ScreenFrame
+from win_util.template_cache import TemplateEntry
+
+
+def _make_template(bgr):
+    return TemplateEntry(path="memory", mtime=0.0, bgr=bgr,
+                         gray=cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY), hsv_mean=np.zeros(3))
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(4)
+    screen = cv2.GaussianBlur(rng.integers(0, 256, (200, 300, 3), dtype=np.uint8), (0, 0), 2)
+    # 纯色区域：cv2.matchTemplate 在此处输出 0
+    screen[150:200, 0:100] = 90
+    return ScreenFrame(screen)
+
+
+@pytest.mark.parametrize("region", [(0, 0, 300, 200), (40, 20, 260, 190)])
+def test_fft_correlation_same_as_match_template(frame, region):
+    """测试 FFT 相关系数图与 cv2.matchTemplate 一致（含子区域）"""
+    template = _make_template(np.asarray(frame)[60:92, 120:170].copy())
+    search = frame.crop(*region)
+
+    expected = cv2.matchTemplate(search.gray, template.gray, cv2.TM_CCOEFF_NORMED)
+    actual = fft_correlation(search, template)
+
+    assert actual.shape == expected.shape
+    assert cv2.norm(actual, expected, cv2.NORM_INF) < 1e-3
+    assert cv2.minMaxLoc(actual)[3] == cv2.minMaxLoc(expected)[3] == (120 - region[0], 60 - region[1])
+
+
+def test_should_use_fft(frame):
+    """测试只在大区域、非极小模板时选择 FFT"""
+    template = _make_template(np.asarray(frame)[60:92, 120:170].copy())
+    tiny = _make_template(np.asarray(frame)[60:66, 120:126].copy())
+
+    assert should_use_fft(frame, template)
+    assert not should_use_fft(frame.crop(0, 0, 100, 100), template)
+    assert not should_use_fft(frame, tiny)
+
+
+def test_correlate_batch_shares_frame_spectrum(frame):
+    """测试批量相关时帧频谱只计算一次"""
+    templates = [_make_template(np.asarray(frame)[y:y + 30, 50:90].copy()) for y in (10, 40, 70)]
+    results = correlate_batch(frame, templates)
+
+    assert len(results) == 3
+    assert frame.gray_spectrum is frame.gray_spectrum
+    for (y, template), result in zip(zip((10, 40, 70), templates), results):
+        assert cv2.minMaxLoc(result)[3] == (50, y)
+
+
+def test_correlate_probes_once_and_never_picks_slower_fft(frame, monkeypatch):
+    """测试首次相关时实测耗时，FFT 更慢时之后固定使用空间域"""
+    template = _make_template(np.asarray(frame)[60:92, 120:170].copy())
+    calls = []
+
+    def slow_fft(search_frame, tpl):
+        calls.append(1)
+        time.sleep(0.05)
+        return fft_correlation(search_frame, tpl)
+
+    clear_fft_decisions()
+    monkeypatch.setattr(fft_matching, "fft_correlation", slow_fft)
+    expected = cv2.matchTemplate(frame.gray, template.gray, cv2.TM_CCOEFF_NORMED)
+    assert cv2.norm(correlate(frame, template), expected, cv2.NORM_INF) < 1e-3
+    assert list(fft_decisions().values()) == [False]
+
+    probed = len(calls)
+    correlate(frame, template)
+    assert len(calls) == probed
+    clear_fft_decisions()
@@ -0,0 +1,85 @@
+# tests.common.test_frame - 截图帧派生产物测试
+
+import cv2
+import numpy as np
+import pytest
+
+from win_util.frame import ScreenFrame, as_frame
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    return ScreenFrame(rng.integers(0, 256, (60, 80, 3), dtype=np.uint8))
+
+
+def test_frame_is_ndarray(frame):
+    """测试 ScreenFrame 可以直接当作 numpy 图像使用"""
+    assert isinstance(frame, np.ndarray)
+    assert frame.shape == (60, 80, 3)
+    assert frame.frame_id is not None
+
+
+def test_gray_is_memoized(frame):
+    """测试灰度图只计算一次"""
+    gray = frame.gray
+    assert gray is frame.gray
+    assert np.array_equal(gray, cv2.cvtColor(np.asarray(frame), cv2.COLOR_BGR2GRAY))
+
+
+def test_crop_shares_parent_products(frame):
+    """测试子区域直接复用父帧的灰度图和 HSV 图"""
+    sub = frame.crop(10, 5, 50, 45)
+
+    assert sub.shape == (40, 40, 3)
+    assert sub.frame_id == frame.frame_id
+    assert np.shares_memory(sub.gray, frame.gray)
+    assert np.array_equal(sub.hsv, cv2.cvtColor(np.asarray(sub), cv2.COLOR_BGR2HSV))
+
+
+def test_slice_does_not_inherit_products(frame):
+    """测试普通切片不会继承父帧缓存"""
+    _ = frame.gray
+    sliced = frame[0:10, 0:10]
+    assert sliced.frame_id is None
+    assert sliced.gray.shape == (10, 10)
+
+
+def test_pyramid_levels(frame):
+    """测试金字塔下采样图按层级缓存"""
+    level1 = frame.gray_pyramid(1)
+    assert level1.shape == (30, 40)
+    assert level1 is frame.gray_pyramid(1)
+    assert frame.pyramid(2).shape == (15, 20, 3)
+
+
+def test_hsv_integral_box_sum(frame):
+    """测试 HSV 积分图的区域和"""
+    integral = frame.hsv_integral
+    box = integral[20, 30] - integral[10, 30] - integral[20, 10] + integral[10, 10]
+    assert np.allclose(box, cv2.sumElems(frame.hsv[10:20, 10:30])[:3])
+
+
+def test_as_frame_keeps_existing_frame(frame):
+    """测试 as_frame 不会重复包装"""
+    assert as_frame(frame) is frame
+    assert as_frame(None) is None
+    assert isinstance(as_frame(np.zeros((2, 2, 3), dtype=np.uint8)), ScreenFrame)
+
+
+def test_probe_pixels_and_find_color(frame):
+    """测试批量像素比较（含容差、越界）和行优先的颜色查找"""
+    image = np.asarray(frame).copy()
+    image[10, 20] = (10, 20, 30)
+    image[10, 5] = (200, 200, 200)
+    image[40, 70] = (10, 20, 30)
+    probe = ScreenFrame(image)
+
+    matched = probe.probe_pixels([20, 20, 99], [10, 10, 10], [(10, 20, 30), (14, 20, 30), (10, 20, 30)], [0, 3, 0])
+    assert matched.tolist() == [True, False, False]
+    assert probe.probe_pixels([20], [10], [(14, 20, 30)], 4).tolist() == [True]
+
+    mask = cv2.inRange(image, np.array([10, 20, 30], np.uint8), np.array([10, 20, 30], np.uint8))
+    expected = cv2.findNonZero(mask)[0, 0]
+    assert probe.find_color((10, 20, 30)) == (int(expected[0]), int(expected[1]))
+    assert probe.crop(30, 30, 80, 60).find_color((10, 20, 30)) == (40, 10)
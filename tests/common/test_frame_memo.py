@@ -0,0 +1,46 @@
+# tests.common.test_frame_memo - 帧内匹配备忘测试
+
+import numpy as np
+
+from win_util.frame import as_frame
+from win_util.frame_memo import FrameMatchMemo
+
+
+def test_memo_deduplicates_within_frame():
+    """测试同一帧内相同查找只计算一次（包括未找到的结果），换帧后重新计算"""
+    memo = FrameMatchMemo()
+    frame = as_frame(np.zeros((40, 60, 3), dtype=np.uint8))
+    memo.reset(frame)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return None
+
+    key = ('best', 'yys/images/ready.bmp', 0, 0, 60, 40, 0.8, 0)
+    assert memo.get_or_compute(frame, key, compute) is None
+    assert memo.get_or_compute(frame, key, compute) is None
+    assert len(calls) == 1
+
+    next_frame = as_frame(np.zeros((40, 60, 3), dtype=np.uint8))
+    memo.reset(next_frame)
+    memo.get_or_compute(next_frame, key, compute)
+    assert len(calls) == 2
+
+    stats = memo.stats()
+    assert stats['frames'] == 2
+    assert stats['lookups'] == 3
+    assert stats['deduplicated'] == 1
+
+
+def test_memo_ignores_other_images():
+    """测试非当前截图（如裁剪出的子区域）不参与备忘"""
+    memo = FrameMatchMemo()
+    frame = as_frame(np.zeros((40, 60, 3), dtype=np.uint8))
+    memo.reset(frame)
+    crop = frame.crop(10, 10, 30, 30)
+    calls = []
+    for _ in range(2):
+        memo.get_or_compute(crop, 'key', lambda: calls.append(1))
+    assert len(calls) == 2
+    assert memo.stats()['lookups'] == 0
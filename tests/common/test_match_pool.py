@@ -0,0 +1,47 @@
+# tests.common.test_match_pool - 找图线程池测试
+
+import threading
+import time
+
+from win_util.match_pool import MatchPool
+
+
+def test_map_keeps_job_order():
+    """测试并行执行后结果仍按任务顺序返回"""
+    pool = MatchPool(max_workers=4)
+
+    def slow_square(n):
+        # 越靠前的任务越慢，保证完成顺序与任务顺序不同
+        time.sleep(0.01 * (5 - n))
+        return n * n
+
+    assert pool.map(slow_square, [0, 1, 2, 3, 4]) == [0, 1, 4, 9, 16]
+    pool.shutdown()
+
+
+def test_first_respects_priority():
+    """测试低优先级任务先完成时，仍返回高优先级的命中结果"""
+    pool = MatchPool(max_workers=4)
+
+    def job(n):
+        if n == 1:
+            time.sleep(0.05)
+        return n if n in (1, 3) else None
+
+    assert pool.first(job, [0, 1, 2, 3], accept=lambda r: r is not None) == (1, 1)
+    assert pool.first(job, [0, 2], accept=lambda r: r is not None) is None
+    pool.shutdown()
+
+
+def test_single_worker_runs_in_caller_thread():
+    """测试单线程时在调用线程中串行执行，命中后不再执行后续任务"""
+    pool = MatchPool(max_workers=1)
+    called = []
+
+    def job(n):
+        called.append((n, threading.current_thread()))
+        return n == 1
+
+    assert pool.first(job, [0, 1, 2]) == (1, True)
+    assert [n for n, _ in called] == [0, 1]
+    assert all(t is threading.current_thread() for _, t in called)
@@ -0,0 +1,30 @@
+# tests.common.test_match_profiler - 模板耗时统计测试
+
+import csv
+import json
+
+from win_util.match_profiler import MatchProfiler
+
+
+def test_report_and_dump(tmp_path):
+    """测试按模板汇总调用次数、命中率和分位数，未调用的模板以 0 次列出，并输出 JSON/CSV"""
+    profiler = MatchProfiler()
+    for i in range(1, 21):
+        profiler.record("yys/images/ready.bmp", i / 1000, 1000, hit=i % 4 == 0)
+    profiler.record("yys/images/victory.bmp", 0.5, 500_000, hit=False)
+
+    rows = profiler.report(templates=["yys/images/victory.bmp", "yys/images/never.bmp"])
+    assert [row['template'] for row in rows] == ["yys/images/victory.bmp", "yys/images/ready.bmp",
+                                                 "yys/images/never.bmp"]
+    ready = rows[1]
+    assert ready['calls'] == 20
+    assert ready['hit_rate'] == 0.25
+    assert ready['p50_ms'] == 11.0
+    assert ready['p95_ms'] == 20.0
+    assert ready['mean_search_pixels'] == 1000
+    assert rows[2]['calls'] == 0
+
+    json_path = profiler.dump("TestScript", directory=tmp_path)
+    assert len(json.loads(json_path.read_text(encoding='utf-8'))['templates']) == 2
+    with open(json_path.with_suffix(".csv"), encoding='utf-8-sig') as f:
+        assert next(csv.DictReader(f))['template'] == "yys/images/victory.bmp"
@@ -0,0 +1,153 @@
+# tests.common.test_matching - 匹配打分测试
+
+import cv2
+import numpy as np
+import pytest
+
+from win_util.frame import ScreenFrame
+from win_util.matching import auto_pyramid_level, best_match, collect_matches, non_max_suppression, pyramid_match
+from win_util.template_cache import TemplateEntry
+
+
+def _make_template(bgr):
+    return TemplateEntry(
+        path="memory",
+        mtime=0.0,
+        bgr=bgr,
+        gray=cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY),
+        hsv_mean=cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV).reshape(-1, 3).astype(np.float64).mean(axis=0),
+    )
+
+
+def _loop_scores(screen, template, result, similarity):
+    """逐个候选位置计算合成相似度的参考实现"""
+    h, w = template.height, template.width
+    matches = []
+    for y, x in zip(*np.nonzero(result >= similarity)):
+        roi_hsv = cv2.cvtColor(screen[y:y + h, x:x + w], cv2.COLOR_BGR2HSV)
+        color_diff = np.linalg.norm(template.hsv_mean - roi_hsv.reshape(-1, 3).astype(np.float64).mean(axis=0))
+        score = 0.7 * result[y, x] + 0.3 * max(0.0, 1.0 - color_diff / 180.0)
+        if score >= similarity:
+            matches.append((x + w // 2, y + h // 2, score))
+    matches.sort(key=lambda m: m[2], reverse=True)
+    return matches
+
+
+@pytest.fixture
+def scene():
+    rng = np.random.default_rng(1)
+    screen = rng.integers(0, 256, (120, 160, 3), dtype=np.uint8)
+    template = _make_template(screen[40:60, 70:100].copy())
+    return ScreenFrame(screen), template
+
+
+def test_collect_matches_same_as_loop(scene):
+    """测试向量化打分与逐点打分结果一致"""
+    frame, template = scene
+    result = cv2.matchTemplate(frame.gray, template.gray, cv2.TM_CCOEFF_NORMED)
+
+    expected = _loop_scores(np.asarray(frame), template, result, 0.2)
+    actual = collect_matches(frame, template, result, 0.2)
+
+    assert [m[:2] for m in actual] == [m[:2] for m in expected]
+    assert np.allclose([m[2] for m in actual], [m[2] for m in expected])
+    assert actual[0][:2] == (85, 50)
+
+
+def test_collect_matches_with_offset(scene):
+    """测试搜索子区域时坐标映射回整帧"""
+    frame, template = scene
+    sub = frame.crop(50, 30, 130, 90)
+    result = cv2.matchTemplate(sub.gray, template.gray, cv2.TM_CCOEFF_NORMED)
+
+    matches = collect_matches(sub, template, result, 0.9, offset=(50, 30))
+    assert matches[0][:2] == (85, 50)
+    assert abs(matches[0][2] - 1.0) < 1e-6
+
+
+def test_nms_returns_each_instance_once():
+    """测试非极大值抑制后每个目标只返回一次"""
+    rng = np.random.default_rng(2)
+    # 模糊后的噪声图，目标周围一圈像素的相关系数都很高
+    screen = cv2.GaussianBlur(rng.integers(0, 256, (120, 200, 3), dtype=np.uint8), (0, 0), 3)
+    patch = screen[10:30, 10:40].copy()
+    screen[70:90, 140:170] = patch
+    frame = ScreenFrame(screen)
+    template = _make_template(patch)
+    result = cv2.matchTemplate(frame.gray, template.gray, cv2.TM_CCOEFF_NORMED)
+
+    raw = collect_matches(frame, template, result, 0.3)
+    merged = collect_matches(frame, template, result, 0.3, nms_iou=0.3)
+
+    assert len(merged) < len(raw)
+    assert sorted(m[:2] for m in merged[:2]) == [(25, 20), (155, 80)]
+    assert merged[0][:2] == raw[0][:2]
+
+
+def test_max_results_limits_output(scene):
+    """测试 max_results 只返回得分最高的前 k 个"""
+    frame, template = scene
+    result = cv2.matchTemplate(frame.gray, template.gray, cv2.TM_CCOEFF_NORMED)
+
+    top = collect_matches(frame, template, result, 0.1, max_results=1)
+    assert len(top) == 1
+    assert top[0][:2] == (85, 50)
+
+
+def test_non_max_suppression_overlap():
+    """测试重叠矩形被抑制，不重叠的保留"""
+    xs = np.array([0, 2, 50])
+    ys = np.array([0, 1, 0])
+    scores = np.array([0.8, 0.9, 0.85])
+
+    keep = non_max_suppression(xs, ys, scores, 20, 20, 0.3)
+    assert keep.tolist() == [1, 2]
+
+
+@pytest.mark.parametrize("similarity", [0.1, 0.3, 0.6, 0.9])
+def test_best_match_same_as_full_enumeration(scene, similarity):
+    """测试最佳匹配快速路径与全量枚举的第一名一致"""
+    frame, template = scene
+    result = cv2.matchTemplate(frame.gray, template.gray, cv2.TM_CCOEFF_NORMED)
+
+    expected = collect_matches(frame, template, result, similarity)
+    actual = best_match(frame, template, result, similarity, top_n=4)
+
+    assert actual == expected[0]
+
+
+def test_best_match_not_found(scene):
+    """测试没有候选达到阈值时返回 None"""
+    frame, template = scene
+    result = cv2.matchTemplate(frame.gray, template.gray, cv2.TM_CCOEFF_NORMED)
+    assert best_match(frame, template, result, 1.01) is None
+
+
+@pytest.mark.parametrize("level", [1, 2])
+def test_pyramid_match_same_as_full_resolution(level):
+    """测试金字塔粗到精匹配与原分辨率匹配找到同一位置"""
+    rng = np.random.default_rng(3)
+    # 模糊后的噪声图，下采样后仍保留结构
+    screen = cv2.GaussianBlur(rng.integers(0, 256, (240, 320, 3), dtype=np.uint8), (0, 0), 2)
+    frame = ScreenFrame(screen)
+    template = _make_template(screen[100:148, 180:244].copy())
+    result = cv2.matchTemplate(frame.gray, template.gray, cv2.TM_CCOEFF_NORMED)
+
+    expected = best_match(frame, template, result, 0.8)
+    actual = pyramid_match(frame, template, 0.8, level)
+
+    assert actual[:2] == expected[:2] == (212, 124)
+    assert abs(actual[2] - expected[2]) < 1e-4
+    assert pyramid_match(frame, template, 1.01, level) is None
+
+
+def test_auto_pyramid_level_only_for_large_regions():
+    """测试只有接近全屏的搜索自动使用金字塔，层级受模板尺寸限制"""
+    large = _make_template(np.zeros((40, 60, 3), dtype=np.uint8))
+    medium = _make_template(np.zeros((20, 60, 3), dtype=np.uint8))
+    small = _make_template(np.zeros((15, 30, 3), dtype=np.uint8))
+
+    assert auto_pyramid_level(large, 640 * 360, 640 * 360) == 2
+    assert auto_pyramid_level(medium, 640 * 360, 640 * 360) == 1
+    assert auto_pyramid_level(small, 640 * 360, 640 * 360) == 0
+    assert auto_pyramid_level(large, 200 * 100, 640 * 360) == 0
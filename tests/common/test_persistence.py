@@ -0,0 +1,99 @@
+# tests.common.test_persistence - JSON 持久化公共部分测试
+
+import threading
+
+from win_util.persistence import JsonStore, percentile
+
+
+class _CounterStore(JsonStore):
+    store_name = "计数"
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.counts = {}
+
+    def get(self, key):
+        self._ensure_loaded()
+        with self._lock:
+            return self.counts.get(key, 0)
+
+    def add(self, key):
+        self._ensure_loaded()
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+            self._dirty = True
+
+    def _decode(self, data):
+        return {key: int(value) for key, value in data.items()}
+
+    def _merge(self, loaded):
+        for key, value in loaded.items():
+            self.counts[key] = self.counts.get(key, 0) + value
+
+    def _encode(self):
+        return dict(sorted(self.counts.items()))
+
+
+def test_store_merges_saved_data_and_skips_clean_saves(tmp_path):
+    """测试首次使用时与文件合并、没有变化时不写文件、文件损坏时从空开始"""
+    path = tmp_path / "sub" / "counts.json"
+    store = _CounterStore(path)
+    assert not store.save()
+    store.add("a")
+    assert store.save() and not store.save()
+
+    reloaded = _CounterStore(path)
+    reloaded.add("a")
+    assert reloaded.counts == {"a": 2}
+
+    path.write_text("{", encoding="utf-8")
+    broken = _CounterStore(path)
+    broken.add("b")
+    assert broken.counts == {"b": 1}
+
+
+def test_concurrent_use_waits_for_load(tmp_path):
+    """测试加载过程中其他线程访问时等待合并完成，而不是看到空数据"""
+    path = tmp_path / "counts.json"
+    path.write_text('{"a": 3}', encoding="utf-8")
+    decoding, release = threading.Event(), threading.Event()
+
+    class SlowStore(_CounterStore):
+        def _decode(self, data):
+            decoding.set()
+            release.wait(5)
+            return super()._decode(data)
+
+    store = SlowStore(path)
+    results = []
+    loader = threading.Thread(target=lambda: results.append(store.get("a")))
+    loader.start()
+    assert decoding.wait(5)
+    reader = threading.Thread(target=lambda: results.append(store.get("a")))
+    reader.start()
+    reader.join(0.1)
+    release.set()
+    loader.join(5)
+    reader.join(5)
+    assert results == [3, 3]
+
+
+def test_failed_save_keeps_previous_file(tmp_path):
+    """测试写入中途失败时保留原文件，不留下临时文件"""
+    path = tmp_path / "counts.json"
+    store = _CounterStore(path)
+    store.add("a")
+    assert store.save()
+
+    store.counts["b"] = object()
+    store._dirty = True
+    assert not store.save()
+    assert _CounterStore(path).get("a") == 1
+    assert [p.name for p in tmp_path.iterdir()] == ["counts.json"]
+
+
+def test_percentile():
+    """测试分位数取样本而不插值，没有样本时为 0"""
+    assert percentile([], 0.5) == 0.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.5) == 3.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.99) == 4.0
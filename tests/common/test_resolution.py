@@ -0,0 +1,40 @@
+# tests.common.test_resolution - 分辨率归一化测试
+
+import cv2
+import numpy as np
+
+from win_util.resolution import (REFERENCE_CLIENT_SIZE, CoordinateMapper, ScaledTemplateStore,
+                                 detect_client_scale)
+
+
+def test_detect_client_scale():
+    """测试接近基准尺寸时视为原始分辨率，否则按宽高分别缩放"""
+    assert detect_client_scale(*REFERENCE_CLIENT_SIZE).is_native
+    assert detect_client_scale(1140, 640).is_native
+
+    scale = detect_client_scale(1707, 962)
+    assert not scale.is_native
+    assert scale.to_client(569, 320) == (854, 480)
+    assert scale.to_reference(854, 480) == (569, 320)
+    # 区域向外取整，映射回基准坐标后仍覆盖原区域
+    region = scale.region_to_client(101, 33, 507, 211)
+    x0, y0, x1, y1 = scale.region_to_reference(*region)
+    assert x0 <= 101 and y0 <= 33 and x1 >= 507 and y1 >= 211
+
+
+def test_scaled_template_store(tmp_path):
+    """测试缩放模板写入缓存目录、尺寸正确且重复获取时复用"""
+    source = tmp_path / "button.bmp"
+    cv2.imwrite(str(source), np.full((40, 60, 3), 128, dtype=np.uint8))
+    store = ScaledTemplateStore(tmp_path / "cache")
+    scale = detect_client_scale(REFERENCE_CLIENT_SIZE[0] // 2, REFERENCE_CLIENT_SIZE[1] // 2)
+
+    scaled = store.resolve(str(source), scale)
+    assert scaled != str(source)
+    assert cv2.imread(scaled).shape == (20, 30, 3)
+    assert store.prebuild(scale, [str(source)]) == 0
+
+    mapper = CoordinateMapper(store)
+    assert mapper.template_path(str(source)) == str(source)
+    mapper.update(scale.width, scale.height)
+    assert mapper.template_path(str(source)) == scaled
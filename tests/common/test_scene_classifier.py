@@ -0,0 +1,35 @@
+# tests.common.test_scene_classifier - 场景缩略图分类测试
+
+import cv2
+import numpy as np
+
+from win_util.frame import as_frame
+from win_util.resolution import NATIVE_SCALE
+from yys.common.scene_classifier import SceneThumbnailClassifier
+
+
+def test_classifier_ranks_matching_scene_first(tmp_path):
+    """测试画面中与场景图一致的区域排在最前，置信度接近 1，读取失败或没有区域的图片不注册"""
+    rng = np.random.default_rng(0)
+    home = rng.integers(0, 256, (24, 36, 3), dtype=np.uint8)
+    battle = rng.integers(0, 256, (24, 36, 3), dtype=np.uint8)
+    cv2.imwrite(str(tmp_path / "home.bmp"), home)
+    cv2.imwrite(str(tmp_path / "battle.bmp"), battle)
+    cv2.imwrite(str(tmp_path / "other.bmp"), rng.integers(0, 256, (24, 36, 3), dtype=np.uint8))
+
+    classifier = SceneThumbnailClassifier()
+    assert classifier.add("home", str(tmp_path / "home.bmp"), (10, 10, 46, 34))
+    assert classifier.add("battle", str(tmp_path / "battle.bmp"), (150, 100, 186, 124))
+    # 与 battle 共用区域的场景图：区域只裁剪一次，各自与该区域比较
+    assert classifier.add("other", str(tmp_path / "other.bmp"), (150, 100, 186, 124))
+    assert not classifier.add("missing", str(tmp_path / "missing.bmp"), (0, 0, 10, 10))
+    assert not classifier.add("no_region", str(tmp_path / "home.bmp"), None)
+
+    frame = np.zeros((200, 300, 3), dtype=np.uint8)
+    frame[100:124, 150:186] = battle
+    ranked = classifier.classify(as_frame(frame), NATIVE_SCALE)
+
+    assert ranked[0][:2] == ("battle", str(tmp_path / "battle.bmp")) and ranked[0][2] > 0.99
+    assert sorted(scene for scene, _, _ in ranked[1:]) == ["home", "other"]
+    assert all(confidence < 0.5 for _, _, confidence in ranked[1:])
+    assert classifier.region(str(tmp_path / "battle.bmp")) == (150, 100, 186, 124)
@@ -0,0 +1,51 @@
+# tests.common.test_scene_fingerprint - 场景像素指纹测试
+
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from win_util.frame import as_frame
+from win_util.resolution import detect_client_scale
+from yys.common.scene_fingerprint import SceneFingerprintIndex
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+BATTLING = "yys/common/images/scene/battling.bmp"
+
+
+def _screenshot(relative_path):
+    """读取示例截图（兼容中文路径）"""
+    bgr = cv2.imdecode(np.fromfile(str(PROJECT_ROOT / relative_path), dtype=np.uint8), cv2.IMREAD_COLOR)
+    return as_frame(bgr), detect_client_scale(bgr.shape[1], bgr.shape[0])
+
+
+def _locate(frame, template):
+    """完整模板匹配得到场景图左上角"""
+    result = cv2.matchTemplate(np.asarray(frame), template, cv2.TM_CCOEFF_NORMED)
+    _, score, _, anchor = cv2.minMaxLoc(result)
+    assert score > 0.8
+    return anchor
+
+
+def test_fingerprint_learned_from_screenshot_matches_other_screenshots(tmp_path):
+    """测试在示例截图上学习战斗界面指纹：同一截图和其他战斗截图命中，非战斗截图未命中，持久化后可重新加载"""
+    template = cv2.imread(str(PROJECT_ROOT / BATTLING))
+    soul_battle, scale = _screenshot("yys/soul_raid/images/example/御魂_战斗.png")
+    abyss_battle, _ = _screenshot("yys/abyss_shadows/images/example/战斗画面.png")
+    team, _ = _screenshot("yys/soul_raid/images/example/御魂_组队界面.png")
+    scenes = {"battling": [BATTLING]}
+
+    index = SceneFingerprintIndex(path=tmp_path / "fingerprints.json")
+    assert index.learn("battling", BATTLING, template, _locate(soul_battle, template), soul_battle, scale)
+    fingerprint = index.get(BATTLING)
+    # 采样点的颜色来自画面，且与场景图一致（不会落在抠图背景上）
+    for (x, y), color in zip(fingerprint.points, fingerprint.colors):
+        assert max(abs(int(a) - b) for a, b in zip(template[y, x], color)) <= index.tolerance
+
+    assert index.match(soul_battle, scale, scenes) == [("battling", BATTLING)]
+    assert index.match(abyss_battle, scale, scenes) == [("battling", BATTLING)]
+    assert index.match(team, scale, scenes) == []
+
+    assert index.save()
+    reloaded = SceneFingerprintIndex(path=tmp_path / "fingerprints.json")
+    assert reloaded.get(BATTLING) == fingerprint
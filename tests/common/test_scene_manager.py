@@ -2,9 +2,17 @@ import os
 import shutil
 import tempfile
 import unittest
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
+import cv2
+import numpy as np
+
+from win_util.frame import as_frame
+from win_util.resolution import NATIVE_SCALE
+from win_util.template_cache import get_template_cache
+from yys.common.scene_fingerprint import SceneFingerprintIndex
 from yys.common.scene_manager import SceneManager, SceneDetectionResult
+from yys.common.scene_telemetry import TransitionTelemetry
 
 
 class TestSceneManager(unittest.TestCase):
@@ -75,6 +83,85 @@ class TestSceneManager(unittest.TestCase):
         # 测试不可达场景
         self.assertFalse(manager.is_reachable("shop", "home"))
 
+    def test_shortest_path_memoized_and_invalidated(self):
+        """测试最短路径、可达场景列表，以及注册新跳转后路由失效重算"""
+        manager = SceneManager(self.mock_hwnd, Mock())
+        manager.transition_telemetry = TransitionTelemetry(path=None)
+        manager.register_transition("home", "exploration", "btn1")
+        manager.register_transition("exploration", "soul", "btn2")
+
+        self.assertEqual(manager.get_shortest_path("home", "soul"),
+                         [("home", "exploration", "btn1"), ("exploration", "soul", "btn2")])
+        self.assertEqual(manager.get_reachable_scenes("home"), {"exploration", "soul"})
+        self.assertIsNone(manager.get_shortest_path("soul", "home"))
+
+        manager.register_transition("home", "soul", "btn3")
+        self.assertEqual(manager.get_shortest_path("home", "soul"), [("home", "soul", "btn3")])
+
+    def test_route_prefers_measured_faster_edges(self):
+        """测试按实测耗时和失败率规划路径，耗时记录持久化后可重新加载"""
+        path = os.path.join(self.test_dir, "transitions.json")
+        manager = SceneManager(self.mock_hwnd, Mock())
+        manager.transition_telemetry = TransitionTelemetry(path=path)
+        manager.register_transition("exploration", "home", "to_home")
+        manager.register_transition("exploration", "town", "to_town")
+        manager.register_transition("town", "home", "town_to_home")
+        self.assertEqual(len(manager.get_shortest_path("exploration", "home")), 1)
+
+        # 直接回庭院要经过加载界面，且偶尔失败
+        manager.transition_telemetry.record("exploration", "home", 9.0, True)
+        manager.transition_telemetry.record("exploration", "home", 0.0, False)
+        manager.transition_telemetry.record("exploration", "town", 1.0, True)
+        manager.transition_telemetry.record("town", "home", 1.5, True)
+        self.assertEqual([step[1] for step in manager.get_shortest_path("exploration", "home")], ["town", "home"])
+
+        self.assertTrue(manager.transition_telemetry.save())
+        reloaded = TransitionTelemetry(path=path)
+        self.assertAlmostEqual(reloaded.expected_cost("exploration", "home"),
+                               manager.transition_telemetry.expected_cost("exploration", "home"))
+
+    def test_route_memo_survives_small_cost_changes(self):
+        """测试边权小幅波动不重新规划，耗时样本随记录一起持久化"""
+        path = os.path.join(self.test_dir, "transitions.json")
+        manager = SceneManager(self.mock_hwnd, Mock())
+        manager.transition_telemetry = telemetry = TransitionTelemetry(path=path)
+        manager.register_transition("home", "exploration", "btn1")
+
+        self.assertTrue(telemetry.record("home", "exploration", 1.0, True))
+        routes = manager._routes_from("home")
+        for seconds in (1.1, 0.95, 1.05):
+            self.assertFalse(telemetry.record("home", "exploration", seconds, True))
+        self.assertIs(manager._routes_from("home"), routes)
+        self.assertEqual(telemetry.routing_cost("home", "exploration"), 1.0)
+
+        # 失败使预期代价明显上升，重新规划
+        self.assertTrue(telemetry.record("home", "exploration", 0.0, False))
+        self.assertIsNot(manager._routes_from("home"), routes)
+
+        self.assertTrue(telemetry.save())
+        reloaded = TransitionTelemetry(path=path)
+        self.assertEqual(reloaded.report(), telemetry.report())
+        self.assertEqual(len(reloaded.get("home", "exploration").samples), 4)
+
+    def test_route_change_replans_affected_sources_only(self):
+        """测试跳转边权变化后只重新规划受影响的源场景"""
+        manager = SceneManager(self.mock_hwnd, Mock())
+        manager.transition_telemetry = TransitionTelemetry(path=None)
+        manager.register_transition("home", "exploration", "btn1")
+        manager.register_transition("exploration", "soul", "btn2")
+        manager.register_transition("town", "shop", "btn3")
+        home_routes = manager._routes_from("home")
+        town_routes = manager._routes_from("town")
+
+        manager._record_transition("exploration", "soul", 9.0, True)
+        self.assertIs(manager._routes_from("town"), town_routes)
+        self.assertIsNot(manager._routes_from("home"), home_routes)
+
+        exploration_routes = manager._routes_from("exploration")
+        manager._record_transition("town", "shop", 0.5, True)
+        self.assertIs(manager._routes_from("exploration"), exploration_routes)
+        self.assertIsNot(manager._routes_from("town"), town_routes)
+
     def test_register_scene(self):
         """测试注册单个场景"""
         manager = SceneManager(self.mock_hwnd, Mock())
@@ -163,6 +250,98 @@ class TestSceneManager(unittest.TestCase):
         # 验证通用跳转被注册
         self.assertIn("home", manager.global_transitions)
 
+    def test_detect_tries_last_scene_and_neighbours_first(self):
+        """测试识别时先尝试上次场景，再尝试其相邻场景，确认后立即停止"""
+        controller = Mock()
+        tried = []
+
+        def find_pic(screenshot, image_path, *args):
+            tried.append(image_path)
+            return (10, 10) if image_path == "battle.bmp" else (-1, -1)
+
+        controller.bg_find_pic.side_effect = find_pic
+        controller.image_finder.template_cache.get.return_value = None
+        manager = SceneManager(self.mock_hwnd, controller)
+        manager.fingerprints = SceneFingerprintIndex(path=None)
+        for name in ("shop", "home", "explore", "battle"):
+            manager.register_scene(name, [f"{name}.bmp"])
+        manager.register_transition("home", "battle", "btn.bmp")
+        manager.current_scene = "home"
+
+        result = manager.detect_current_scene()
+
+        self.assertEqual(result.scene_name, "battle")
+        self.assertEqual(tried, ["home.bmp", "battle.bmp"])
+        self.assertEqual(manager.current_scene, "battle")
+        self.assertEqual(manager.detection_stats()['mean_templates_tried'], 2)
+
+    def test_classifier_uses_learned_anchor_and_skips_verified_candidates(self):
+        """测试没有固定区域的场景图按指纹学到的位置参与分类，验证未通过的候选不再整帧重复匹配"""
+        rng = np.random.default_rng(7)
+        images = {}
+        for name in ("home", "battle"):
+            images[name] = cv2.GaussianBlur(rng.integers(0, 256, (30, 40, 3), dtype=np.uint8), (0, 0), 1)
+            cv2.imwrite(os.path.join(self.test_dir, f"{name}.bmp"), images[name])
+        frame = np.zeros((200, 300, 3), dtype=np.uint8)
+        frame[60:90, 100:140] = images["battle"]
+        frame = as_frame(frame)
+
+        calls = []
+        visible = {"battle": True}
+
+        def find_pic(screenshot, image_path, x0, y0, x1, y1):
+            calls.append((os.path.basename(image_path), x1 - x0 < 300))
+            if image_path.endswith("battle.bmp") and visible["battle"]:
+                return 120, 75
+            return -1, -1
+
+        controller = Mock()
+        controller.bg_find_pic.side_effect = find_pic
+        controller.image_finder.template_cache = get_template_cache()
+        controller.image_finder.mapper.scale = NATIVE_SCALE
+        manager = SceneManager(self.mock_hwnd, controller)
+        manager.fingerprints = SceneFingerprintIndex(path=None)
+        for name in ("home", "battle"):
+            manager.register_scene(name, [os.path.join(self.test_dir, f"{name}.bmp")])
+        self.assertEqual(len(manager.classifier), 0)
+
+        # 首次整帧匹配确认后，指纹学到的位置同步到分类器
+        self.assertEqual(manager.detect_current_scene(frame).scene_name, "battle")
+        self.assertEqual(manager.classifier.region(os.path.join(self.test_dir, "battle.bmp")), (100, 60, 140, 90))
+
+        # 之后只在分类结果的区域附近验证
+        manager.fingerprints.enabled = False
+        calls.clear()
+        self.assertEqual(manager.detect_current_scene(frame).scene_name, "battle")
+        self.assertEqual(calls, [("battle.bmp", True)])
+
+        # 验证未通过时回退的整帧匹配跳过已验证的候选
+        visible["battle"] = False
+        calls.clear()
+        self.assertIsNone(manager.detect_current_scene(frame))
+        self.assertEqual(calls, [("battle.bmp", True), ("home.bmp", False)])
+
+    @patch("yys.common.scene_manager.bg_left_click_with_range")
+    def test_goto_scene_polls_until_target_and_records_latency(self, mock_click):
+        """测试跳转后轮询到目标场景即继续，并按边记录耗时和失败次数"""
+        controller = Mock()
+        controller.bg_find_pic_by_cache.return_value = (100, 100)
+        manager = SceneManager(self.mock_hwnd, controller)
+        manager.scene_graph = {"home": {"exploration": "btn1.bmp"}, "exploration": {"soul": "btn2.bmp"}}
+        manager.scene_images = {"home": [], "exploration": [], "soul": []}
+        home, exploration = SceneDetectionResult("home", "", (0, 0)), SceneDetectionResult("exploration", "", (0, 0))
+        # 点击后前两次轮询仍未进入 exploration；之后一直停留在 exploration
+        manager.detect_current_scene = Mock(side_effect=[home, None, home, exploration] + [exploration] * 20)
+
+        self.assertTrue(manager.goto_scene("exploration", poll_interval=0.01))
+        self.assertFalse(manager.goto_scene("soul", hop_timeout=0.05, poll_interval=0.01))
+
+        self.assertEqual(mock_click.call_count, 2)
+        edge = manager.transition_telemetry.get("home", "exploration")
+        self.assertEqual((edge.attempts, edge.failures), (1, 0))
+        self.assertLess(edge.mean_seconds, 1.0)
+        self.assertEqual(manager.transition_telemetry.get("exploration", "soul").failures, 1)
+
 
 if __name__ == '__main__':
     unittest.main()
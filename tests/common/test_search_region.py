@@ -0,0 +1,41 @@
+# tests.common.test_search_region - 搜索区域学习测试
+
+from win_util.search_region import SearchRegionLearner
+
+
+def test_suggest_after_min_matches():
+    """测试命中次数达到阈值后才给出学习区域，区域为外接矩形加边距并限制在请求区域内"""
+    learner = SearchRegionLearner(path=None, margin=10, min_matches=2)
+    learner.record("yys/images/ready.bmp", 100, 200, 180, 250)
+    assert learner.suggest("yys/images/ready.bmp", 0, 0, 1154, 680) is None
+
+    learner.record("yys/images/ready.bmp", 104, 198, 184, 248)
+    assert learner.suggest("yys/images/ready.bmp", 0, 0, 1154, 680) == (90, 188, 194, 260)
+    assert learner.suggest("yys/images/ready.bmp", 120, 0, 1154, 680) == (120, 188, 194, 260)
+    # 学习区域无法缩小请求区域时不使用
+    assert learner.suggest("yys/images/ready.bmp", 95, 190, 190, 255) is None
+
+
+def test_stats_counts_skipped_area():
+    """测试命中/回退计数和跳过面积统计"""
+    learner = SearchRegionLearner(path=None)
+    learner.note_hit(1000, 100)
+    learner.note_fallback(1000, 100)
+
+    stats = learner.stats()
+    assert (stats['hits'], stats['fallbacks']) == (1, 1)
+    assert stats['skipped_pixels'] == 900
+    assert stats['searched_pixels'] == 1200
+
+
+def test_save_and_load(tmp_path):
+    """测试学习区域持久化后可在新实例中加载，路径统一为相对项目根目录"""
+    path = tmp_path / "regions.json"
+    learner = SearchRegionLearner(path=path, min_matches=1)
+    learner.record("yys/images/ready.bmp", 10, 20, 30, 40)
+    assert learner.save()
+    assert not learner.save()
+
+    restored = SearchRegionLearner(path=path, min_matches=1)
+    region = restored.get_region("yys/images/ready.bmp")
+    assert (region.x0, region.y0, region.x1, region.y1, region.matches) == (10, 20, 30, 40, 1)
@@ -0,0 +1,53 @@
+# tests.common.test_template_bundle - 模板预编译包测试
+
+import os
+
+import cv2
+import numpy as np
+
+from win_util.template_bundle import TemplateBundle, build_bundle
+
+
+def _write(path, value, shape=(12, 16, 3)):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    image = np.full(shape, value, dtype=np.uint8)
+    image[2:6, 3:9] = (10, 200, 60)
+    cv2.imwrite(str(path), image)
+    return image
+
+
+def test_bundle_round_trip(tmp_path):
+    """测试打包后读取的模板与直接解码一致，调试目录不参与打包"""
+    scene_dir = tmp_path / "yys" / "scene"
+    home = _write(scene_dir / "home.bmp", 90)
+    _write(scene_dir / "battle.bmp", 150, shape=(20, 8, 3))
+    _write(tmp_path / "yys" / "debug" / "ignored.bmp", 0)
+    output = tmp_path / "cache" / "templates.npz"
+
+    assert build_bundle(tmp_path / "yys", output, project_root=tmp_path) == 2
+    bundle = TemplateBundle.load(output, root=tmp_path)
+    template = bundle.get(str(scene_dir / "home.bmp"))
+    assert np.array_equal(template.bgr, home)
+    assert np.array_equal(template.gray, cv2.cvtColor(home, cv2.COLOR_BGR2GRAY))
+    assert np.allclose(template.hsv_mean, cv2.mean(cv2.cvtColor(home, cv2.COLOR_BGR2HSV))[:3])
+    assert bundle.get(str(scene_dir / "battle.bmp")).gray.shape == (20, 8)
+    assert sorted(bundle.listdir(str(scene_dir))) == ["battle.bmp", "home.bmp"]
+    assert bundle.get(str(tmp_path / "yys" / "debug" / "ignored.bmp")) is None
+
+
+def test_bundle_stale_entries(tmp_path):
+    """测试模板被修改或目录中增删文件后对应数据不再使用"""
+    scene_dir = tmp_path / "yys" / "scene"
+    _write(scene_dir / "home.bmp", 90)
+    output = tmp_path / "templates.npz"
+    build_bundle(tmp_path / "yys", output, project_root=tmp_path)
+    bundle = TemplateBundle.load(output, root=tmp_path)
+
+    mtime = os.stat(scene_dir / "home.bmp").st_mtime
+    os.utime(scene_dir / "home.bmp", (mtime + 10, mtime + 10))
+    assert bundle.get(str(scene_dir / "home.bmp")) is None
+    assert bundle.stats()['stale'] == 1
+
+    _write(scene_dir / "explore.bmp", 30)
+    os.utime(scene_dir, (mtime + 10, mtime + 10))
+    assert bundle.listdir(str(scene_dir)) is None
@@ -0,0 +1,73 @@
+# tests.common.test_template_cache - 模板缓存测试
+
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from win_util.template_cache import TemplateCache
+
+
+def _write_template(path, color, size=(20, 30)):
+    img = np.zeros((size[0], size[1], 3), dtype=np.uint8)
+    img[:, :] = color
+    cv2.imwrite(str(path), img)
+    return str(path)
+
+
+@pytest.fixture
+def template_path(tmp_path):
+    return _write_template(tmp_path / "tpl.bmp", (10, 120, 200))
+
+
+def test_get_decodes_once(template_path):
+    """测试模板只解码一次，后续访问命中缓存"""
+    cache = TemplateCache()
+    first = cache.get(template_path)
+    second = cache.get(template_path)
+
+    assert first is second
+    assert first.gray.shape == (20, 30)
+    assert first.hsv_mean.shape == (3,)
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['hits'] == 1
+
+
+def test_missing_file_returns_none(tmp_path):
+    """测试不存在的模板返回 None"""
+    cache = TemplateCache()
+    assert cache.get(str(tmp_path / "missing.bmp")) is None
+    assert len(cache) == 0
+
+
+def test_mtime_invalidation(template_path):
+    """测试模板文件变更后重新加载"""
+    cache = TemplateCache(check_interval=0)
+    old = cache.get(template_path)
+
+    _write_template(template_path, (200, 10, 10))
+    stat = os.stat(template_path)
+    os.utime(template_path, (stat.st_atime, stat.st_mtime + 10))
+
+    new = cache.get(template_path)
+    assert new is not old
+    assert not np.array_equal(new.bgr, old.bgr)
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_lru_eviction(tmp_path):
+    """测试超出内存上限时淘汰最久未使用的模板"""
+    paths = [_write_template(tmp_path / f"tpl_{i}.bmp", (i, i, i)) for i in range(3)]
+    entry_bytes = TemplateCache().get(paths[0]).nbytes
+    cache = TemplateCache(max_bytes=entry_bytes * 2)
+
+    cache.get(paths[0])
+    cache.get(paths[1])
+    cache.get(paths[0])
+    cache.get(paths[2])
+
+    assert paths[0] in cache
+    assert paths[1] not in cache
+    assert paths[2] in cache
+    assert cache.stats()['evictions'] == 1
@@ -24,4 +24,22 @@ def mock_env(mock_image_provider) -> "MockEnvironment":
 def mock_image_provider() -> "FileImageProvider":
     """Mock 图片提供者 fixture"""
     from tests.common.providers.file_image_provider import FileImageProvider
-    return FileImageProvider(base_folder=str(TEST_DATA_BASE))
\ No newline at end of file
+    return FileImageProvider(base_folder=str(TEST_DATA_BASE))
+
+class FakeClock:
+    """可控时钟：sleep 只推进时间，不真正等待"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_clock() -> FakeClock:
+    """可控时钟 fixture，替换轮询器的计时和休眠"""
+    return FakeClock()
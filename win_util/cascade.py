@@ -0,0 +1,163 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from win_util.frame import ScreenFrame
+from win_util.matching import coarse_gray_threshold, effective_pyramid_level
+from win_util.resolution import ClientScale
+from win_util.template_cache import TemplateEntry
+
+# 下采样相关预筛的默认放宽量：只做拒绝判断，比金字塔匹配的粗阈值（PYRAMID_COARSE_SLACK）更紧，
+# 示例截图上 1/4、1/8 下采样时不产生漏检
+CASCADE_COARSE_SLACK = 0.1
+
+# 像素特征点默认容差（各通道最大差值）
+DEFAULT_PROBE_TOLERANCE = 16
+
+
+class CascadeStage(ABC):
+    """
+    级联检测中的一级预筛
+
+    在完整的 matchTemplate + 颜色打分之前执行，返回 False 表示目标不可能出现，直接跳过后续各级。
+    """
+
+    name: str = "stage"
+
+    @abstractmethod
+    def check(self, search_frame: ScreenFrame, offset: Tuple[int, int], template: TemplateEntry,
+              similarity: float, scale: ClientScale) -> bool:
+        """
+        :param search_frame: 搜索区域（实际客户区坐标）
+        :param offset: 搜索区域在整帧中的左上角坐标
+        :param template: 模板
+        :param similarity: 合成相似度阈值
+        :param scale: 当前缩放比例，用于把基准坐标映射到实际客户区
+        :return: 是否通过
+        """
+
+
+class PixelSignatureStage(CascadeStage):
+    """像素特征点：若干固定位置的像素颜色必须全部在容差内（一次向量化比较）"""
+
+    name = "pixel"
+
+    def __init__(self, probes: Sequence[Tuple[int, int, str]], tolerance: int = DEFAULT_PROBE_TOLERANCE):
+        """
+        :param probes: [(x, y, 'BBGGRR'), ...]，基准坐标 + 十六进制 BGR 颜色（与 bg_check_pixel_color 相同）
+        :param tolerance: 各通道允许的最大差值
+        """
+        self.points = np.array([(x, y) for x, y, _ in probes], dtype=np.int64).reshape(-1, 2)
+        self.colors = np.array([[int(c.lstrip('#')[i:i + 2], 16) for i in (0, 2, 4)] for _, _, c in probes],
+                               dtype=np.int16).reshape(-1, 3)
+        self.tolerance = tolerance
+
+    def check(self, search_frame, offset, template, similarity, scale) -> bool:
+        if not len(self.points):
+            return True
+        xs, ys = self.points[:, 0], self.points[:, 1]
+        if not scale.is_native:
+            xs, ys = np.round(xs * scale.sx).astype(np.int64), np.round(ys * scale.sy).astype(np.int64)
+        xs, ys = xs - offset[0], ys - offset[1]
+        # 特征点不在搜索区域内时无法判断，不拒绝
+        inside = (xs >= 0) & (ys >= 0) & (xs < search_frame.width) & (ys < search_frame.height)
+        if not inside.all():
+            return True
+        return bool(search_frame.probe_pixels(xs, ys, self.colors, self.tolerance).all())
+
+
+class DownsampledCorrelationStage(CascadeStage):
+    """下采样相关：在 1/2^level 的灰度金字塔上做相关，最大值低于粗阈值时拒绝"""
+
+    name = "downsampled"
+
+    def __init__(self, level: int = 2, slack: float = CASCADE_COARSE_SLACK):
+        """
+        :param level: 金字塔层级（模板过小时自动降低）
+        :param slack: 粗阈值放宽量
+        """
+        self.level = level
+        self.slack = slack
+
+    def check(self, search_frame, offset, template, similarity, scale) -> bool:
+        level = effective_pyramid_level(template, self.level)
+        if level <= 0:
+            return True
+        coarse_frame = search_frame.gray_pyramid(level)
+        coarse_template = template.gray_pyramid(level)
+        if coarse_frame.shape[0] < coarse_template.shape[0] or coarse_frame.shape[1] < coarse_template.shape[1]:
+            return True
+        coarse = cv2.matchTemplate(coarse_frame, coarse_template, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, _ = cv2.minMaxLoc(coarse)
+        return max_val >= coarse_gray_threshold(similarity, self.slack)
+
+
+@dataclass
+class StageStats:
+    """某个模板在某一级的统计"""
+    evaluated: int = 0
+    rejected: int = 0
+    seconds: float = 0.0
+
+
+class DetectorCascade:
+    """
+    级联检测器
+
+    按顺序执行各级预筛（应把最便宜的放在前面），任一级拒绝即短路，不再做完整匹配。
+    按模板和级别统计拒绝率与耗时，据此调整每个模板的级联顺序。
+    """
+
+    def __init__(self, stages: Sequence[CascadeStage]):
+        """
+        :param stages: 预筛列表，按执行顺序
+        """
+        self.stages: List[CascadeStage] = list(stages)
+        self._stats: Dict[Tuple[str, str], StageStats] = {}
+        self._lock = threading.Lock()
+
+    def passes(self, template_path: str, search_frame: ScreenFrame, offset: Tuple[int, int],
+               template: TemplateEntry, similarity: float, scale: ClientScale) -> bool:
+        """
+        依次执行各级预筛
+
+        :return: 全部通过返回 True，需要继续完整匹配
+        """
+        for stage in self.stages:
+            start = time.perf_counter()
+            passed = stage.check(search_frame, offset, template, similarity, scale)
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stats = self._stats.get((template_path, stage.name))
+                if stats is None:
+                    stats = self._stats[(template_path, stage.name)] = StageStats()
+                stats.evaluated += 1
+                stats.rejected += not passed
+                stats.seconds += elapsed
+            if not passed:
+                return False
+        return True
+
+    def report(self) -> List[Dict[str, object]]:
+        """按模板、级联顺序输出每一级的执行次数、拒绝率和平均耗时"""
+        order = {stage.name: i for i, stage in enumerate(self.stages)}
+        with self._lock:
+            items = sorted(self._stats.items(), key=lambda item: (item[0][0], order.get(item[0][1], 0)))
+            return [{
+                'template': template_path,
+                'stage': stage_name,
+                'evaluated': stats.evaluated,
+                'rejected': stats.rejected,
+                'reject_rate': stats.rejected / stats.evaluated if stats.evaluated else 0.0,
+                'mean_us': stats.seconds * 1e6 / stats.evaluated if stats.evaluated else 0.0,
+            } for (template_path, stage_name), stats in items]
+
+    def reset_stats(self) -> None:
+        """重置统计"""
+        with self._lock:
+            self._stats.clear()
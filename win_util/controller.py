@@ -2,9 +2,11 @@ import time
 from typing import TYPE_CHECKING, Optional, Tuple
 
 from win_util.image import ImageFinder, ImageMatchConfig
+from win_util.match_pool import MatchJob
 from win_util.keyboard import KeyboardController
 from win_util.mouse import MouseController
 from win_util.ocr import CommonOcr
+from win_util.resolution import CoordinateMapper
 
 if TYPE_CHECKING:
     from tests.common.environment.base import GameEnvironment
@@ -29,11 +31,14 @@ class WinController:
         self.hwnd = hwnd
         self._env = env
 
+        # 找图与点击共享同一个坐标归一化层，脚本中的坐标均为基准分辨率坐标
+        self.mapper = CoordinateMapper()
+
         # 优先使用 GameEnvironment，否则使用 hwnd
         # 注意：keyboard 暂不支持 GameEnvironment，仅传入 hwnd
-        self.image_finder: ImageFinder = ImageFinder(env=env, hwnd=hwnd)
+        self.image_finder: ImageFinder = ImageFinder(env=env, hwnd=hwnd, mapper=self.mapper)
         self.keyboard: KeyboardController = KeyboardController(hwnd)
-        self.mouse: MouseController = MouseController(env=env, hwnd=hwnd)
+        self.mouse: MouseController = MouseController(env=env, hwnd=hwnd, mapper=self.mapper)
         self.ocr: CommonOcr = CommonOcr()
 
     # 前缀 -> 组件映射（按优先级排序）
@@ -41,6 +46,10 @@ class WinController:
         ('bg_find_', 'image_finder'),
         ('crop_', 'image_finder'),
         ('update_', 'image_finder'),
+        ('probe_pixels', 'image_finder'),
+        ('check_pixels', 'image_finder'),
+        ('get_pixel_color', 'image_finder'),
+        ('find_color', 'image_finder'),
         ('bg_left', 'mouse'),
         ('bg_right', 'mouse'),
         ('bg_swipe', 'mouse'),
@@ -75,9 +84,10 @@ class WinController:
         """
         return self.image_finder.bg_find_pic_by_cache(small_picture_path, x0, y0, x1, y1, similarity)
     
-    def find_images_all(self, small_picture_path: str, x0=0, y0=0, x1=99999, y1=99999, similarity=0.8):
+    def find_images_all(self, small_picture_path: str, x0=0, y0=0, x1=99999, y1=99999, similarity=0.8,
+                        max_results: Optional[int] = None):
         """
-        在指定区域内查找所有匹配的图片
+        在指定区域内查找所有匹配的图片（同一目标只返回一次）
 
         :param small_picture_path: 小图路径
         :param x0: 区域左上角x坐标
@@ -85,9 +95,11 @@ class WinController:
         :param x1: 区域右下角x坐标
         :param y1: 区域右下角y坐标
         :param similarity: 相似度阈值
+        :param max_results: 最多返回数量，None 表示不限制
         :return: 匹配的坐标点列表
         """
-        return self.image_finder.bg_find_pic_all_by_cache(small_picture_path, x0, y0, x1, y1, similarity)
+        return self.image_finder.bg_find_pic_all_by_cache(small_picture_path, x0, y0, x1, y1, similarity,
+                                                          max_results=max_results)
     
     def find_image_with_timeout(self, small_picture_path: str, timeout=3, x0=0, y0=0, x1=99999, y1=99999, similarity=0.8):
         """
@@ -175,7 +187,11 @@ class WinController:
         :param case_sensitive: 是否区分大小写
         :return: 文本位置
         """
-        return self.ocr.find_text_position(img, target_text, similarity_threshold, case_sensitive)
+        position = self.ocr.find_text_position(img, target_text, similarity_threshold, case_sensitive)
+        if position and img is self.image_finder.screenshot_cache:
+            # 整帧截图上的识别结果映射回基准坐标，便于直接点击
+            return self.mapper.scale.to_reference(*position)
+        return position
     
     def find_text_positions(self, img, target_text, similarity_threshold=0.3, case_sensitive=False):
         """
@@ -187,7 +203,11 @@ class WinController:
         :param case_sensitive: 是否区分大小写
         :return: 所有匹配文本的位置列表
         """
-        return self.ocr.find_text_positions(img, target_text, similarity_threshold, case_sensitive)
+        positions = self.ocr.find_text_positions(img, target_text, similarity_threshold, case_sensitive)
+        scale = self.mapper.scale
+        if scale.is_native or img is not self.image_finder.screenshot_cache:
+            return positions
+        return [(*scale.to_reference(x, y), similarity) for x, y, similarity in positions]
     
     # 便捷方法
     def find_and_click(self, image_path: str, x0=0, y0=0, x1=99999, y1=99999, similarity=0.8, 
@@ -246,10 +266,10 @@ class WinController:
         :param y_range: 点击随机范围y轴
         :return: 点击是否成功
         """
-        for image_path in image_paths:
-            point = self.find_image(image_path, x0=x0, y0=y0, x1=x1, y1=y1, similarity=similarity)
-            if point and point != (-1, -1):
-                return self.mouse.bg_left_click(point, x_range=x_range, y_range=y_range)
+        jobs = [MatchJob(image_path, x0, y0, x1, y1, similarity) for image_path in image_paths]
+        point, job = self.image_finder.bg_find_pic_first_by_cache(jobs)
+        if job is not None:
+            return self.mouse.bg_left_click(point, x_range=x_range, y_range=y_range)
         return False
 
     def wait_for_image_disappear(self, image_path: str, timeout: float = 10,
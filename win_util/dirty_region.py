@@ -0,0 +1,163 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from win_util.frame import ScreenFrame
+
+# 脏区域检测的瓦片边长（像素）
+DEFAULT_TILE_SIZE = 32
+
+# 任一通道差值超过该值的像素视为发生变化
+DEFAULT_DIFF_THRESHOLD = 10
+
+
+class DirtyTileTracker:
+    """
+    按瓦片跟踪截图的变化区域，并缓存可复用的匹配结果
+
+    每个瓦片保存一份基准像素（该瓦片最后一次被标记为变化时的截图内容），
+    每次更新截图时与基准逐像素比较，超过阈值的瓦片标记为变化并更新基准，
+    记录每个瓦片最后一次变化时的帧编号。与基准而不是上一帧比较，
+    渐变、淡入淡出这类每帧变化都低于阈值的画面也会在累计超过阈值时被标记。
+    某个匹配结果计算之后，只要其搜索区域覆盖的瓦片都没有再变化，下一帧就可以直接复用。
+    """
+
+    def __init__(self, tile_size: int = DEFAULT_TILE_SIZE, threshold: int = DEFAULT_DIFF_THRESHOLD):
+        """
+        :param tile_size: 瓦片边长
+        :param threshold: 像素变化阈值
+        """
+        self.tile_size = tile_size
+        self.threshold = threshold
+        self.enabled = True
+        self._previous: Optional[ScreenFrame] = None
+        self._baseline: Optional[np.ndarray] = None
+        self._changed_at: Optional[np.ndarray] = None
+        self._results: Dict[Hashable, Tuple[int, Any]] = {}
+        self._lock = threading.Lock()
+
+        self.frames = 0
+        self.dirty_tiles = 0
+        self.total_tiles = 0
+        self.reused = 0
+        self.recomputed = 0
+
+    @property
+    def current_frame_id(self) -> Optional[int]:
+        return None if self._previous is None else self._previous.frame_id
+
+    def update(self, frame: ScreenFrame) -> Optional[np.ndarray]:
+        """
+        记录新截图，计算与各瓦片基准相比发生变化的瓦片
+
+        :param frame: 新截图
+        :return: 瓦片网格上的变化掩码（非 0 表示变化），首帧或尺寸变化时返回 None
+        """
+        if not self.enabled or frame is None:
+            return None
+
+        tiles_y = -(-frame.height // self.tile_size)
+        tiles_x = -(-frame.width // self.tile_size)
+        with self._lock:
+            self._previous = frame
+            self.frames += 1
+            baseline = self._baseline
+            if baseline is None or baseline.shape != frame.shape or self._changed_at is None:
+                # 首帧或分辨率变化：所有旧结果失效，以本帧作为全部瓦片的基准
+                self._baseline = np.array(frame, copy=True)
+                self._changed_at = np.full((tiles_y, tiles_x), frame.frame_id, dtype=np.int32)
+                self._results.clear()
+                return None
+
+        diff = cv2.absdiff(np.asarray(frame), baseline)
+        _, changed = cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY)
+        # 补齐到瓦片整数倍后按面积插值缩放到瓦片网格：瓦片内只要有一个变化像素，结果就大于 0
+        changed = cv2.cvtColor(changed, cv2.COLOR_BGR2GRAY).astype(np.float32)
+        changed = cv2.copyMakeBorder(changed, 0, tiles_y * self.tile_size - frame.height,
+                                     0, tiles_x * self.tile_size - frame.width, cv2.BORDER_CONSTANT, value=0)
+        dirty = cv2.resize(changed, (tiles_x, tiles_y), interpolation=cv2.INTER_AREA)
+        dirty_mask = (dirty > 0).astype(np.uint8)
+        if cv2.countNonZero(dirty_mask):
+            # 只有变化的瓦片更新基准，未变化的瓦片继续与旧基准比较，缓慢漂移会逐帧累计
+            pixel_mask = cv2.resize(dirty_mask, (tiles_x * self.tile_size, tiles_y * self.tile_size),
+                                    interpolation=cv2.INTER_NEAREST)[:frame.height, :frame.width]
+            with self._lock:
+                np.copyto(baseline, np.asarray(frame), where=pixel_mask[:, :, None].astype(bool))
+        with self._lock:
+            self._changed_at[dirty > 0] = frame.frame_id
+            self.dirty_tiles += cv2.countNonZero(dirty)
+            self.total_tiles += tiles_x * tiles_y
+        return dirty
+
+    def changed_since(self, frame_id: int, x0: int, y0: int, x1: int, y1: int) -> bool:
+        """
+        判断区域内是否有瓦片在指定帧之后发生过变化
+
+        :param frame_id: 结果计算时的帧编号
+        :param x0, y0, x1, y1: 区域（已限制在截图范围内）
+        """
+        if self._changed_at is None or x0 >= x1 or y0 >= y1:
+            return True
+        t = self.tile_size
+        region = self._changed_at[y0 // t:-(-y1 // t), x0 // t:-(-x1 // t)]
+        _, last_changed, _, _ = cv2.minMaxLoc(np.ascontiguousarray(region))
+        return last_changed > frame_id
+
+    def reuse_or_compute(self, key: Hashable, frame: Any, region: Tuple[int, int, int, int],
+                         compute: Callable[[], Any]) -> Any:
+        """
+        区域未变化时复用上次结果，否则重新计算并缓存
+
+        :param key: 结果缓存键（模板、区域、阈值等）
+        :param frame: 当前截图，只有最近一次 update 的截图本身才参与复用（其裁剪子区域不参与）
+        :param region: 搜索区域（已限制在截图范围内）
+        :param compute: 重新计算的函数
+        """
+        if not self.enabled or frame is None or frame is not self._previous:
+            return compute()
+        frame_id = frame.frame_id
+
+        cached = self._results.get(key)
+        if cached is not None and cached[0] <= frame_id and not self.changed_since(cached[0], *region):
+            with self._lock:
+                self.reused += 1
+            return cached[1]
+
+        result = compute()
+        with self._lock:
+            self.recomputed += 1
+            # 只在截图仍是最新帧时写入，避免并发更新后缓存过期结果
+            if frame is self._previous:
+                self._results[key] = (frame_id, result)
+        return result
+
+    def stats(self) -> Dict[str, float]:
+        """获取统计信息"""
+        with self._lock:
+            total = self.reused + self.recomputed
+            return {
+                'frames': self.frames,
+                'dirty_tile_ratio': self.dirty_tiles / self.total_tiles if self.total_tiles else 0.0,
+                'reused': self.reused,
+                'recomputed': self.recomputed,
+                'reuse_ratio': self.reused / total if total else 0.0,
+            }
+
+    def reset_stats(self) -> None:
+        """重置计数器（不清除缓存结果）"""
+        with self._lock:
+            self.frames = 0
+            self.dirty_tiles = 0
+            self.total_tiles = 0
+            self.reused = 0
+            self.recomputed = 0
+
+    def clear(self) -> None:
+        """清除上一帧、瓦片基准和所有缓存结果"""
+        with self._lock:
+            self._previous = None
+            self._baseline = None
+            self._changed_at = None
+            self._results.clear()
@@ -2,11 +2,12 @@ import random
 import threading
 import time
 from abc import ABC
-from typing import Callable, Optional
+from typing import Callable, List, Optional
 
 from loguru import logger
 
 from win_util.image import ImageFinder, ImageMatchConfig
+from win_util.match_pool import MatchJob
 from win_util.ocr import CommonOcr
 
 
@@ -178,20 +179,21 @@ class EventBaseScript(ABC):
         if self.image_finder is None:
             return None
 
-        # 遍历已注册的图像匹配配置
-        for image_match_config in self._image_event_match_configs:
-            res = self.image_finder.bg_find_pic_by_config(image_match_config)
-
-            if res is None:
-                continue
-
-            point = res[0]
-            if point is not None and point != (-1, -1):
+        # 当前需要匹配的模板并行匹配，按注册顺序（优先级）依次触发
+        jobs = self._active_match_jobs()
+        # 匹配耗时只计到首个命中结果产出为止，不含事件回调
+        start = time.perf_counter()
+        first_match = None
+        try:
+            for job, point in self.image_finder.iter_find_pic(self.image_finder.screenshot_cache, jobs):
+                if first_match is None:
+                    first_match = time.perf_counter()
                 # 短暂延迟避免事件过于频繁
                 time.sleep(EVENT_TRIGGER_DELAY)
-                image_path = res[1]
-                if self._event_manager.trigger_event(image_path, point):
-                    return image_path
+                if self._event_manager.trigger_event(job.image_path, point):
+                    return job.image_path
+        finally:
+            self._on_frame_matched((first_match or time.perf_counter()) - start, len(jobs))
 
         # OCR 功能暂时禁用（性能问题）
         # 未来可通过以下方式启用：
@@ -204,6 +206,19 @@ class EventBaseScript(ABC):
 
         return None
 
+    def _active_match_jobs(self) -> List[MatchJob]:
+        """本帧需要匹配的任务，默认为所有已注册配置的模板，子类可按当前状态缩小范围"""
+        return [job for config in self._image_event_match_configs for job in config.to_jobs()]
+
+    def _on_frame_matched(self, seconds: float, templates: int) -> None:
+        """每帧匹配完成后调用，子类可覆盖用于统计
+
+        Args:
+            seconds: 本帧匹配耗时（秒）
+            templates: 本帧匹配的模板数
+        """
+        pass
+
     # ==================== 脚本控制方法 ====================
 
     def pause(self) -> None:
@@ -227,25 +242,64 @@ class EventBaseScript(ABC):
         """主循环：执行初始化后持续运行直到被 stop"""
         self.on_run()
 
-        while not self._stop_threading_event.is_set():
-            self.pause_point()
-            self.before_iteration()
+        try:
+            while not self._stop_threading_event.is_set():
+                self.pause_point()
+                self.before_iteration()
 
-            # 更新截图缓存（如有）
-            if self.image_finder is not None:
-                self.image_finder.update_screenshot_cache()
+                # 更新截图缓存（如有）
+                if self.image_finder is not None:
+                    self.image_finder.update_screenshot_cache()
 
-            # 触发图像匹配事件
-            self._trigger_event_from_screenshot_cache()
+                # 触发图像匹配事件
+                self._trigger_event_from_screenshot_cache()
 
-            # 随机休眠，避免 CPU 占用过高
-            random_sleep(LOOP_SLEEP_MIN, LOOP_SLEEP_MAX)
+                # 随机休眠，避免 CPU 占用过高
+                random_sleep(LOOP_SLEEP_MIN, LOOP_SLEEP_MAX)
 
-            # 每轮循环结束调用扩展钩子
-            self.after_iteration()
+                # 每轮循环结束调用扩展钩子
+                self.after_iteration()
+        finally:
+            self._save_match_state()
 
         self._stop_threading_event.clear()
 
+    def _save_match_state(self) -> None:
+        """脚本结束时持久化找图过程中学习到的数据并输出统计"""
+        if self.image_finder is None:
+            return
+        memo = self.image_finder.match_memo.stats()
+        if memo['deduplicated']:
+            logger.info(f"帧内备忘: 去重 {memo['deduplicated']} / {memo['lookups']} 次查找 ({memo['dedup_ratio']:.1%})，"
+                        f"平均每帧 {memo['deduplicated_per_frame']:.2f} 次，单帧最多 {memo['max_deduplicated_per_frame']} 次")
+        dirty = self.image_finder.dirty_tracker.stats()
+        if dirty['reused'] or dirty['recomputed']:
+            logger.info(f"区域差分: 变化瓦片占比 {dirty['dirty_tile_ratio']:.1%}，匹配复用 {dirty['reused']} 次，"
+                        f"重新计算 {dirty['recomputed']} 次 ({dirty['reuse_ratio']:.1%} 复用)")
+
+        # 级联预筛各级拒绝率，用于调整各模板的级联顺序
+        cascades = {id(c.cascade): c.cascade for c in self._image_event_match_configs if c.cascade is not None}
+        for cascade in cascades.values():
+            for row in cascade.report():
+                logger.info(f"级联预筛: {row['template']} [{row['stage']}] 执行 {row['evaluated']} 次，"
+                            f"拒绝率 {row['reject_rate']:.1%}，平均 {row['mean_us']:.0f}us")
+
+        # 各模板的调用次数、耗时和命中率
+        profile_path = self.image_finder.profiler.dump(self.__class__.__name__, templates=self._registered_templates())
+        if profile_path is not None:
+            logger.info(f"模板耗时报告已保存: {profile_path}")
+
+        learner = self.image_finder.region_learner
+        learner.save()
+        stats = learner.stats()
+        if stats['hits'] or stats['fallbacks']:
+            logger.info(f"学习搜索区域: 命中 {stats['hits']} 次，回退 {stats['fallbacks']} 次，"
+                        f"跳过像素 {stats['skipped_pixels']} ({stats['skipped_ratio']:.1%})")
+
+    def _registered_templates(self) -> List[str]:
+        """所有已注册图像匹配事件的模板路径"""
+        return [path for config in self._image_event_match_configs for path in config.target_image_path_list]
+
     # ==================== 扩展钩子方法 ====================
 
     def on_run(self) -> None:
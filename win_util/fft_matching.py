@@ -0,0 +1,173 @@
+import threading
+import time
+from typing import Dict, List, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from win_util.frame import ScreenFrame
+from win_util.template_cache import TemplateEntry
+
+# 搜索区域面积不低于整帧的该比例时才使用 FFT：FFT 总是对整帧频谱做逆变换，小区域用空间域更划算
+FFT_MIN_REGION_RATIO = 0.5
+
+# 模板面积不低于该值时才使用 FFT，极小模板空间域匹配本身就很快
+FFT_MIN_TEMPLATE_AREA = 64
+
+# 通过尺寸初筛后，首次遇到某个模板和搜索区域组合时两种方式各计时若干次，取最短耗时比较
+FFT_PROBE_RUNS = 2
+
+# FFT 至少比空间域快该倍数才选择 FFT，避免计时噪声导致退化
+FFT_MIN_SPEEDUP = 1.1
+
+# 离差平方和低于该值的窗口视为纯色区域（只差一个像素、一个灰度级的窗口约为 1），相关系数置 0
+FLAT_WINDOW_EPSILON = 0.5
+
+# 浮点误差导致 |相关系数| 略大于 1 时截断为 ±1，超过该值视为数值噪声置 0（与 cv2.matchTemplate 一致）
+MAX_CORRELATION_OVERSHOOT = 1.125
+
+
+# (模板路径, 修改时间, 模板尺寸, 搜索区域尺寸, 整帧尺寸) -> 是否使用 FFT
+_ProbeKey = Tuple[str, float, int, int, int, int, int, int]
+_fft_decisions: Dict[_ProbeKey, bool] = {}
+_fft_decisions_lock = threading.Lock()
+
+
+def should_use_fft(search_frame: ScreenFrame, template: TemplateEntry) -> bool:
+    """
+    根据模板和搜索区域尺寸判断是否值得尝试 FFT（必要条件，最终由 correlate 的计时探测决定）
+
+    空间域 matchTemplate 的耗时与搜索区域面积成正比，并且每次调用都要重新变换搜索区域；
+    FFT 路径的帧频谱每帧只算一次，每个模板只需一次正变换、一次频谱相乘和一次逆变换，
+    耗时基本只取决于整帧尺寸。
+
+    :return: True 表示使用 FFT
+    """
+    if template.width * template.height < FFT_MIN_TEMPLATE_AREA:
+        return False
+    root = search_frame if search_frame._parent is None else search_frame._parent
+    return search_frame.width * search_frame.height >= FFT_MIN_REGION_RATIO * root.width * root.height
+
+
+def fft_correlation(search_frame: ScreenFrame, template: TemplateEntry) -> np.ndarray:
+    """
+    用频域乘法计算归一化相关系数图，结果与 cv2.matchTemplate(TM_CCOEFF_NORMED) 一致（浮点误差内）
+
+    分子：整帧频谱与零均值模板频谱共轭相乘后逆变换；
+    分母：窗口离差平方和（盒式滤波求和）与模板离差范数之积。
+
+    :param search_frame: 搜索区域（可以是整帧的子区域）
+    :param template: 模板
+    :return: 形状为 (H - h + 1, W - w + 1) 的 float32 相关系数图
+    """
+    h, w = template.height, template.width
+    rows, cols = search_frame.height - h + 1, search_frame.width - w + 1
+
+    tpl = template.gray.astype(np.float32)
+    tpl -= cv2.mean(tpl)[0]
+    tpl_norm = float(np.sqrt(np.dot(tpl.ravel(), tpl.ravel())))
+    if tpl_norm < 1.0:
+        # 纯色模板没有结构信息，交给空间域处理
+        return cv2.matchTemplate(search_frame.gray, template.gray, cv2.TM_CCOEFF_NORMED)
+
+    # ---------- 分子：频域相乘 ----------
+    ox, oy = search_frame._offset if search_frame._parent is not None else (0, 0)
+    frame_spectrum = search_frame.gray_spectrum
+    padded = np.zeros(frame_spectrum.shape, dtype=np.float32)
+    padded[:h, :w] = tpl
+    product = cv2.mulSpectrums(frame_spectrum, cv2.dft(padded, nonzeroRows=h), 0, conjB=True)
+    numerator = cv2.idft(product, flags=cv2.DFT_SCALE | cv2.DFT_REAL_OUTPUT,
+                         nonzeroRows=oy + rows)[oy:oy + rows, ox:ox + cols]
+
+    # ---------- 分母：窗口离差平方和 Σx² - (Σx)² / n ----------
+    n = h * w
+    centered = search_frame.gray_centered
+    sums = cv2.boxFilter(centered, cv2.CV_32F, (w, h), anchor=(0, 0), normalize=False,
+                         borderType=cv2.BORDER_CONSTANT)[:rows, :cols]
+    sq_sums = cv2.sqrBoxFilter(centered, cv2.CV_32F, (w, h), anchor=(0, 0), normalize=False,
+                               borderType=cv2.BORDER_CONSTANT)[:rows, :cols]
+    sqdev = cv2.subtract(sq_sums, cv2.multiply(sums, sums, scale=1.0 / n))
+    # 纯色窗口的分母加上极大值，使其相关系数趋近 0
+    _, flat = cv2.threshold(sqdev, FLAT_WINDOW_EPSILON, 1e30, cv2.THRESH_BINARY_INV)
+    denominator = cv2.sqrt(cv2.add(sqdev, flat))
+
+    result = cv2.divide(numerator, denominator, scale=1.0 / tpl_norm)
+    _, result = cv2.threshold(result, MAX_CORRELATION_OVERSHOOT, 0, cv2.THRESH_TOZERO_INV)
+    np.clip(result, -1.0, 1.0, out=result)
+    return result
+
+
+def _probe_key(search_frame: ScreenFrame, template: TemplateEntry) -> _ProbeKey:
+    root = search_frame if search_frame._parent is None else search_frame._parent
+    return (template.path, template.mtime, template.width, template.height,
+            search_frame.width, search_frame.height, root.width, root.height)
+
+
+def _spatial_correlation(search_frame: ScreenFrame, template: TemplateEntry) -> np.ndarray:
+    return cv2.matchTemplate(search_frame.gray, template.gray, cv2.TM_CCOEFF_NORMED)
+
+
+def _best_time(fn, search_frame: ScreenFrame, template: TemplateEntry) -> Tuple[float, np.ndarray]:
+    best, result = float('inf'), None
+    for _ in range(FFT_PROBE_RUNS):
+        start = time.perf_counter()
+        result = fn(search_frame, template)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def probe_fft(search_frame: ScreenFrame, template: TemplateEntry) -> Tuple[bool, np.ndarray]:
+    """
+    实测 FFT 与空间域的耗时并记住选择
+
+    帧频谱在计时前先算好：同一帧上的所有模板共享频谱，不应计入单个模板的耗时。
+
+    :return: (是否使用 FFT, 本次计算得到的相关系数图)
+    """
+    search_frame.gray_spectrum
+    fft_seconds, fft_result = _best_time(fft_correlation, search_frame, template)
+    spatial_seconds, spatial_result = _best_time(_spatial_correlation, search_frame, template)
+    use_fft = fft_seconds * FFT_MIN_SPEEDUP < spatial_seconds
+    with _fft_decisions_lock:
+        _fft_decisions[_probe_key(search_frame, template)] = use_fft
+    return use_fft, fft_result if use_fft else spatial_result
+
+
+def fft_decisions() -> Dict[_ProbeKey, bool]:
+    """已探测的模板和搜索区域组合及其选择"""
+    with _fft_decisions_lock:
+        return dict(_fft_decisions)
+
+
+def clear_fft_decisions() -> None:
+    """清除探测结果（下次遇到时重新计时）"""
+    with _fft_decisions_lock:
+        _fft_decisions.clear()
+
+
+def correlate(search_frame: ScreenFrame, template: TemplateEntry) -> np.ndarray:
+    """
+    计算灰度归一化相关系数图，自动在空间域 matchTemplate 和 FFT 之间选择
+
+    尺寸初筛通过后，每个模板和搜索区域组合首次出现时实测两种方式的耗时，
+    之后固定使用较快的一种；FFT 没有明显更快时使用空间域，FFT 路径不会比空间域更慢。
+
+    :return: 形状为 (H - h + 1, W - w + 1) 的相关系数图
+    """
+    if not should_use_fft(search_frame, template):
+        return _spatial_correlation(search_frame, template)
+    use_fft = _fft_decisions.get(_probe_key(search_frame, template))
+    if use_fft is None:
+        return probe_fft(search_frame, template)[1]
+    if use_fft:
+        return fft_correlation(search_frame, template)
+    return _spatial_correlation(search_frame, template)
+
+
+def correlate_batch(search_frame: ScreenFrame, templates: Sequence[TemplateEntry]) -> List[np.ndarray]:
+    """
+    对同一帧批量计算多个模板的相关系数图，帧频谱只计算一次
+
+    :return: 与模板顺序一致的相关系数图列表
+    """
+    return [correlate(search_frame, template) for template in templates]
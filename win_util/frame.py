@@ -0,0 +1,237 @@
+import itertools
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+_frame_id_counter = itertools.count(1)
+
+
+class ScreenFrame(np.ndarray):
+    """
+    单帧截图及其派生产物
+
+    本身就是 BGR 格式的 numpy 数组，可以直接交给 cv2 / OCR 使用，
+    同时按需计算并缓存灰度图、HSV 图、金字塔下采样图和积分图，
+    同一帧上的所有找图、OCR 调用共享这些产物，每种转换每帧只做一次。
+
+    通过 crop() 得到的子区域会记录父帧和偏移，其灰度图、HSV 图直接从父帧切片获得。
+    """
+
+    frame_id: Optional[int]
+
+    def __new__(cls, image: np.ndarray, frame_id: Optional[int] = None) -> 'ScreenFrame':
+        """
+        :param image: BGR 图像
+        :param frame_id: 帧编号，为 None 时自动分配
+        """
+        obj = np.asarray(image).view(cls)
+        obj.frame_id = next(_frame_id_counter) if frame_id is None else frame_id
+        return obj
+
+    def __array_finalize__(self, obj: Any) -> None:
+        # 切片、拷贝等派生出的数组不继承缓存产物，避免误用父帧结果
+        self.frame_id = None
+        self._products: Dict[Hashable, Any] = {}
+        self._lock = threading.RLock()
+        self._parent: Optional['ScreenFrame'] = None
+        self._offset: Tuple[int, int] = (0, 0)
+
+    # ==================== 基础信息 ====================
+
+    @property
+    def width(self) -> int:
+        return self.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.shape[0]
+
+    def _memo(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        value = self._products.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            value = self._products.get(key)
+            if value is None:
+                value = factory()
+                self._products[key] = value
+            return value
+
+    def _parent_slice(self, product: np.ndarray) -> np.ndarray:
+        x, y = self._offset
+        return product[y:y + self.height, x:x + self.width]
+
+    # ==================== 派生产物 ====================
+
+    @property
+    def gray(self) -> np.ndarray:
+        """灰度图"""
+        if self._parent is not None:
+            return self._parent_slice(self._parent.gray)
+        return self._memo('gray', lambda: cv2.cvtColor(np.asarray(self), cv2.COLOR_BGR2GRAY))
+
+    @property
+    def hsv(self) -> np.ndarray:
+        """HSV 图"""
+        if self._parent is not None:
+            return self._parent_slice(self._parent.hsv)
+        return self._memo('hsv', lambda: cv2.cvtColor(np.asarray(self), cv2.COLOR_BGR2HSV))
+
+    def pyramid(self, level: int) -> np.ndarray:
+        """
+        BGR 金字塔下采样图
+
+        :param level: 层级，0 为原图，每升一级宽高减半
+        """
+        if level <= 0:
+            return np.asarray(self)
+        return self._memo(('pyramid', level), lambda: cv2.pyrDown(self.pyramid(level - 1)))
+
+    def gray_pyramid(self, level: int) -> np.ndarray:
+        """
+        灰度金字塔下采样图
+
+        :param level: 层级，0 为原灰度图，每升一级宽高减半
+        """
+        if level <= 0:
+            return self.gray
+        if self._parent is not None:
+            # 子区域直接从父帧的金字塔切片，边界按层级缩放（可能有 1 像素误差）
+            x, y = self._offset
+            scale = 1 << level
+            return self._parent.gray_pyramid(level)[y // scale:(y + self.height) // scale,
+                                                    x // scale:(x + self.width) // scale]
+        return self._memo(('gray_pyramid', level), lambda: cv2.pyrDown(self.gray_pyramid(level - 1)))
+
+    @property
+    def hsv_integral(self) -> np.ndarray:
+        """HSV 三通道积分图，形状为 (h+1, w+1, 3)"""
+        return self._memo('hsv_integral', lambda: cv2.integral(self.hsv, sdepth=cv2.CV_64F))
+
+    @property
+    def gray_integral(self) -> Tuple[np.ndarray, np.ndarray]:
+        """灰度积分图和平方积分图，形状均为 (h+1, w+1)"""
+        return self._memo('gray_integral', lambda: cv2.integral2(self.gray, sdepth=cv2.CV_64F,
+                                                                 sqdepth=cv2.CV_64F))
+
+    @property
+    def gray_centered(self) -> np.ndarray:
+        """减去全帧均值的 float32 灰度图，子区域从父帧切片"""
+        if self._parent is not None:
+            return self._parent_slice(self._parent.gray_centered)
+
+        def build() -> np.ndarray:
+            gray = self.gray.astype(np.float32)
+            gray -= cv2.mean(gray)[0]
+            return gray
+
+        return self._memo('gray_centered', build)
+
+    @property
+    def gray_spectrum(self) -> np.ndarray:
+        """
+        灰度图频谱（gray_centered 补零到最优 DFT 尺寸，CCS 压缩格式）
+
+        同一帧上所有模板的 FFT 相关共享这一次正变换，子区域直接返回父帧的频谱。
+        """
+        if self._parent is not None:
+            return self._parent.gray_spectrum
+
+        def build() -> np.ndarray:
+            padded = np.zeros((cv2.getOptimalDFTSize(self.height), cv2.getOptimalDFTSize(self.width)),
+                              dtype=np.float32)
+            padded[:self.height, :self.width] = self.gray_centered
+            return cv2.dft(padded, nonzeroRows=self.height)
+
+        return self._memo('gray_spectrum', build)
+
+    def hsv_box_means(self, xs: np.ndarray, ys: np.ndarray, w: int, h: int) -> np.ndarray:
+        """
+        基于 HSV 积分图批量计算矩形区域的 HSV 均值，每个区域 O(1)
+
+        :param xs: 各区域左上角 x 坐标（相对本帧）
+        :param ys: 各区域左上角 y 坐标（相对本帧）
+        :param w: 区域宽度
+        :param h: 区域高度
+        :return: 形状为 (N, 3) 的 HSV 均值
+        """
+        root = self
+        if self._parent is not None:
+            root = self._parent
+            xs = xs + self._offset[0]
+            ys = ys + self._offset[1]
+        integral = root.hsv_integral
+        sums = (integral[ys + h, xs + w] - integral[ys, xs + w]
+                - integral[ys + h, xs] + integral[ys, xs])
+        return sums / float(w * h)
+
+    # ==================== 像素探测 ====================
+
+    def probe_pixels(self, xs: np.ndarray, ys: np.ndarray, colors: np.ndarray, tolerance) -> np.ndarray:
+        """
+        批量比较像素颜色（一次向量化运算）
+
+        :param xs: 像素 x 坐标（相对本帧），形状 (N,)
+        :param ys: 像素 y 坐标（相对本帧），形状 (N,)
+        :param colors: 期望的 BGR 颜色，形状 (N, 3)
+        :param tolerance: 各通道允许的最大差值，标量或形状 (N,)
+        :return: 形状 (N,) 的布尔数组，坐标超出本帧的为 False
+        """
+        xs = np.asarray(xs, dtype=np.intp).reshape(-1)
+        ys = np.asarray(ys, dtype=np.intp).reshape(-1)
+        colors = np.asarray(colors, dtype=np.int16).reshape(-1, 3)
+        tolerance = np.broadcast_to(np.asarray(tolerance, dtype=np.int16), xs.shape)
+        inside = (xs >= 0) & (ys >= 0) & (xs < self.width) & (ys < self.height)
+        matched = np.zeros(xs.shape, dtype=bool)
+        pixels = np.asarray(self)[ys[inside], xs[inside]].astype(np.int16)
+        diff = np.abs(pixels - colors[inside])
+        matched[inside] = (diff <= tolerance[inside, None]).all(axis=1)
+        return matched
+
+    def find_color(self, color: Tuple[int, int, int], tolerance: int = 0) -> Optional[Tuple[int, int]]:
+        """
+        查找第一个（行优先）颜色在容差内的像素
+
+        :param color: BGR 颜色
+        :param tolerance: 各通道允许的最大差值
+        :return: (x, y)（相对本帧），未找到返回 None
+        """
+        lower = np.array([max(0, c - tolerance) for c in color], dtype=np.uint8)
+        upper = np.array([min(255, c + tolerance) for c in color], dtype=np.uint8)
+        points = cv2.findNonZero(cv2.inRange(np.asarray(self), lower, upper))
+        if points is None:
+            return None
+        x, y = points[0, 0]
+        return int(x), int(y)
+
+    # ==================== 裁剪 ====================
+
+    def crop(self, x0: int = 0, y0: int = 0, x1: int = 99999, y1: int = 99999) -> 'ScreenFrame':
+        """
+        裁剪子区域（限制在图像范围内），子区域共享父帧的灰度图和 HSV 图
+
+        :return: 子区域 ScreenFrame，区域无效时返回自身
+        """
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(self.width, x1), min(self.height, y1)
+        if x0 >= x1 or y0 >= y1:
+            return self
+        if (x0, y0, x1, y1) == (0, 0, self.width, self.height):
+            return self
+
+        sub = self[y0:y1, x0:x1]
+        sub.frame_id = self.frame_id
+        root = self if self._parent is None else self._parent
+        base_x, base_y = self._offset
+        sub._parent = root
+        sub._offset = (base_x + x0, base_y + y0)
+        return sub
+
+
+def as_frame(image: Optional[np.ndarray]) -> Optional[ScreenFrame]:
+    """将普通图像包装为 ScreenFrame，已经是 ScreenFrame 时原样返回"""
+    if image is None or isinstance(image, ScreenFrame):
+        return image
+    return ScreenFrame(image)
@@ -0,0 +1,87 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# 结果为 None（未找到）也需要缓存，用哨兵区分「未缓存」
+_MISSING = object()
+
+
+class FrameMatchMemo:
+    """
+    帧内匹配结果备忘
+
+    同一轮循环中，事件扫描命中后回调、场景跳转等往往会在同一张截图上用相同的模板、
+    区域和阈值再找一次。以（帧编号, 模板, 区域, 阈值）为键缓存结果，
+    直到下一次 update_screenshot_cache，重复查找只是一次字典查询。
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self._frame: Optional[Any] = None
+        self._results: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+
+        self.frames = 0
+        self.lookups = 0
+        self.deduplicated = 0
+        self.max_deduplicated_per_frame = 0
+        self._frame_deduplicated = 0
+
+    def reset(self, frame: Any) -> None:
+        """
+        切换到新截图，丢弃上一帧的所有结果
+
+        :param frame: 新截图，只有该截图本身参与备忘（其裁剪子区域不参与）
+        """
+        with self._lock:
+            self._frame = frame
+            self._results.clear()
+            self.frames += 1
+            self._frame_deduplicated = 0
+
+    def get_or_compute(self, frame: Any, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        当前帧已有相同查找时直接返回结果，否则计算并缓存
+
+        :param frame: 查找使用的截图
+        :param key: 模板、区域、阈值等（帧由 frame 本身区分）
+        :param compute: 计算函数
+        """
+        if not self.enabled or frame is None or frame is not self._frame:
+            return compute()
+
+        with self._lock:
+            self.lookups += 1
+            result = self._results.get(key, _MISSING)
+            if result is not _MISSING:
+                self.deduplicated += 1
+                self._frame_deduplicated += 1
+                self.max_deduplicated_per_frame = max(self.max_deduplicated_per_frame, self._frame_deduplicated)
+                return result
+
+        result = compute()
+        with self._lock:
+            # 计算期间截图已更新时不写入
+            if frame is self._frame:
+                self._results[key] = result
+        return result
+
+    def stats(self) -> Dict[str, float]:
+        """获取统计信息"""
+        with self._lock:
+            return {
+                'frames': self.frames,
+                'lookups': self.lookups,
+                'deduplicated': self.deduplicated,
+                'dedup_ratio': self.deduplicated / self.lookups if self.lookups else 0.0,
+                'deduplicated_per_frame': self.deduplicated / self.frames if self.frames else 0.0,
+                'max_deduplicated_per_frame': self.max_deduplicated_per_frame,
+            }
+
+    def reset_stats(self) -> None:
+        """重置计数器（不清除当前帧结果）"""
+        with self._lock:
+            self.frames = 0
+            self.lookups = 0
+            self.deduplicated = 0
+            self.max_deduplicated_per_frame = 0
+            self._frame_deduplicated = 0
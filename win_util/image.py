@@ -2,7 +2,7 @@ import time
 from ctypes import windll
 from dataclasses import dataclass
 from pathlib import Path
-from typing import TYPE_CHECKING, List, Tuple, Union, Any, Optional
+from typing import TYPE_CHECKING, Iterator, List, Sequence, Tuple, Union, Any, Optional
 
 import cv2
 import numpy as np
@@ -11,6 +11,18 @@ import win32ui
 from PIL import ImageGrab
 from loguru import logger
 
+from win_util.cascade import DetectorCascade
+from win_util.dirty_region import DirtyTileTracker
+from win_util.fft_matching import correlate
+from win_util.frame import ScreenFrame, as_frame
+from win_util.frame_memo import FrameMatchMemo
+from win_util.match_profiler import MatchProfiler
+from win_util.match_pool import MatchJob, MatchPool
+from win_util.matching import DEFAULT_NMS_IOU, auto_pyramid_level, best_match, collect_matches, pyramid_match
+from win_util.resolution import CoordinateMapper
+from win_util.search_region import SearchRegionLearner, get_search_region_learner
+from win_util.template_cache import TemplateCache, get_template_cache
+
 if TYPE_CHECKING:
     from tests.common.environment.base import GameEnvironment
 
@@ -71,14 +83,21 @@ class ScreenCapture:
         if self.hwnd is None:
             raise ValueError("请在初始化时传入 hwnd 或 env 参数")
 
+        # 按实际窗口边框计算客户区在整窗截图中的偏移，不依赖固定的边框尺寸
         client_rect = win32gui.GetClientRect(self.hwnd)
-        client_width = client_rect[2] - client_rect[0] + 8
-        client_height = client_rect[3] - client_rect[1] + 31
-
-        x0 = max(x0, client_rect[0]) + 8
-        y0 = max(y0, client_rect[1]) + 31
-        x1 = min(x1 + 8, client_width)
-        y1 = min(y1 + 31, client_height)
+        window_rect = win32gui.GetWindowRect(self.hwnd)
+        client_origin = win32gui.ClientToScreen(self.hwnd, (0, 0))
+        border_x = client_origin[0] - window_rect[0]
+        border_y = client_origin[1] - window_rect[1]
+        window_width = window_rect[2] - window_rect[0]
+        window_height = window_rect[3] - window_rect[1]
+        client_width = client_rect[2] - client_rect[0]
+        client_height = client_rect[3] - client_rect[1]
+
+        x0 = max(x0, 0) + border_x
+        y0 = max(y0, 0) + border_y
+        x1 = min(x1, client_width) + border_x
+        y1 = min(y1, client_height) + border_y
 
         if x0 >= x1 or y0 >= y1:
             raise ValueError(f"无效区域: ({x0}, {y0}) - ({x1}, {y1})")
@@ -87,7 +106,7 @@ class ScreenCapture:
         mfc_dc = win32ui.CreateDCFromHandle(hwnd_dc)
         save_dc = mfc_dc.CreateCompatibleDC()
         save_bitmap = win32ui.CreateBitmap()
-        save_bitmap.CreateCompatibleBitmap(mfc_dc, client_width, client_height)
+        save_bitmap.CreateCompatibleBitmap(mfc_dc, window_width, window_height)
         save_dc.SelectObject(save_bitmap)
 
         windll.user32.PrintWindow(self.hwnd, save_dc.GetSafeHdc(), 2)
@@ -139,12 +158,11 @@ class ColorDetector:
     def find_color(x0: int, y0: int, x1: int, y1: int, color_hex: str) -> Tuple[int, int]:
         color = ColorDetector.hex2rgb(color_hex)
         img = np.array(ImageGrab.grab((x0, y0, x1, y1)))
-        for i in range(img.shape[0]):
-            for j in range(img.shape[1]):
-                if tuple(img[i, j]) == color:
-                    return x0 + j, y0 + i
-        logger.debug("没找到point")
-        return -1, -1
+        point = ScreenFrame(img).find_color(color)
+        if point is None:
+            logger.debug("没找到point")
+            return -1, -1
+        return x0 + point[0], y0 + point[1]
 
     @staticmethod
     def bg_get_pixel_color(hwnd: int, x: int, y: int) -> Union[str, None]:
@@ -192,7 +210,14 @@ class ImageMatchConfig:
     """多模板匹配配置"""
 
     def __init__(self, target_image_path_list: Union[List[str], str],
-                 x0=0, y0=0, x1=99999, y1=99999, similarity=0.8):
+                 x0=0, y0=0, x1=99999, y1=99999, similarity=0.8, pyramid_level: Optional[int] = None,
+                 cascade: Optional[DetectorCascade] = None):
+        """
+        :param pyramid_level: 金字塔粗匹配层级，None 表示按搜索区域和模板尺寸自动选择（接近全屏时开启），
+                              0 表示关闭，1 为 1/2 下采样，2 为 1/4 下采样
+        :param cascade: 级联预筛（可选），完整匹配前依次执行像素特征、下采样相关等廉价检查，
+                        任一级拒绝即视为未找到
+        """
         self.target_image_path_list: List[str] = (
             [target_image_path_list] if isinstance(target_image_path_list, str)
             else target_image_path_list
@@ -202,6 +227,8 @@ class ImageMatchConfig:
         self.x1 = x1
         self.y1 = y1
         self.similarity = similarity
+        self.pyramid_level = pyramid_level
+        self.cascade = cascade
 
     def __hash__(self):
         return hash(tuple(self.target_image_path_list))
@@ -214,6 +241,12 @@ class ImageMatchConfig:
     def __str__(self):
         return f"{self.target_image_path_list} {self.x0} {self.y0} {self.x1} {self.y1} {self.similarity}"
 
+    def to_jobs(self) -> List[MatchJob]:
+        """按模板顺序展开为找图任务"""
+        return [MatchJob(path, self.x0, self.y0, self.x1, self.y1, self.similarity, self.pyramid_level,
+                         self.cascade)
+                for path in self.target_image_path_list]
+
 
 @dataclass
 class ImageMatchResult:
@@ -247,157 +280,388 @@ class ImageFinder:
     2. hwnd 模式（向后兼容）：传入 hwnd 参数，使用原生 win32 调用
     """
 
-    def __init__(self, env: Optional['GameEnvironment'] = None, hwnd: Optional[int] = None):
+    def __init__(self, env: Optional['GameEnvironment'] = None, hwnd: Optional[int] = None,
+                 mapper: Optional[CoordinateMapper] = None):
         """
         初始化图像查找器
 
         :param env: GameEnvironment 实例，用于抽象接口调用
         :param hwnd: 窗口句柄，用于原生 win32 调用（向后兼容）
+        :param mapper: 坐标归一化层，与 MouseController 共享；为 None 时自动创建
         """
         self._env = env
         self.hwnd = hwnd
+        self.mapper: CoordinateMapper = mapper or CoordinateMapper()
         self.screenshot_capture = ScreenCapture(hwnd=hwnd, env=env)
-        self.screenshot_cache: Optional[np.ndarray] = None  # 初始化为 None
+        self.template_cache: TemplateCache = get_template_cache()
+        self.match_pool: MatchPool = MatchPool()
+        self.region_learner: SearchRegionLearner = get_search_region_learner()
+        self.dirty_tracker: DirtyTileTracker = DirtyTileTracker()
+        self.match_memo: FrameMatchMemo = FrameMatchMemo()
+        self.profiler: MatchProfiler = MatchProfiler()
+        self.screenshot_cache: Optional[ScreenFrame] = None  # 初始化为 None
         self.update_screenshot_cache()  # 第一次调用可能会失败，但会设置 screenshot_cache
 
-    def update_screenshot_cache(self):
+    def update_screenshot_cache(self) -> Optional[ScreenFrame]:
+        """
+        重新截图并更新缓存
+
+        同时检测客户区缩放比例，清空上一帧的匹配备忘，并与上一帧做瓦片级差分，供匹配结果复用判断
+
+        :return: 新的 ScreenFrame，其灰度图、HSV 图等派生产物在本帧内只计算一次
+        """
         try:
-            self.screenshot_cache = self.screenshot_capture.capture_window_region()
+            self.screenshot_cache = as_frame(self.screenshot_capture.capture_window_region())
+            # 客户区尺寸变化时重新计算缩放比例（同一尺寸只检测一次）
+            self.mapper.update(self.screenshot_cache.width, self.screenshot_cache.height)
+            # 帧内备忘只对当前截图有效
+            self.match_memo.reset(self.screenshot_cache)
+            # 与上一帧做瓦片级差分，未变化区域内的匹配结果可直接复用
+            self.dirty_tracker.update(self.screenshot_cache)
             return self.screenshot_cache
         except Exception as e:
             logger.exception(f"更新截图缓存失败: {e}")
             return self.screenshot_cache
 
+    def set_match_workers(self, max_workers: int) -> None:
+        """
+        设置多模板并行匹配的线程数
+
+        :param max_workers: 线程数，1 表示串行匹配
+        """
+        self.match_pool.resize(max_workers)
+
     def crop_screenshot_cache(self, x0=0, y0=0, x1=99999, y1=99999):
-        """从截图缓存中裁剪指定区域"""
+        """从截图缓存中裁剪指定区域（基准坐标）"""
         if self.screenshot_cache is None:
             self.update_screenshot_cache()
         
+        x0, y0, x1, y1 = self.mapper.scale.region_to_client(x0, y0, x1, y1)
         h, w = self.screenshot_cache.shape[:2]
-        # 限制裁剪区域在图像范围内
-        x0 = max(0, x0)
-        y0 = max(0, y0)
-        x1 = min(w, x1)
-        y1 = min(h, y1)
-        
         # 确保裁剪区域有效
-        if x0 >= x1 or y0 >= y1:
+        if max(0, x0) >= min(w, x1) or max(0, y0) >= min(h, y1):
             logger.warning(f"无效的裁剪区域: ({x0}, {y0}) - ({x1}, {y1}), 图像尺寸: ({w}, {h})")
             return self.screenshot_cache
-        
-        return self.screenshot_cache[y0:y1, x0:x1]
+
+        # 子区域与整帧共享灰度图等派生产物
+        return as_frame(self.screenshot_cache).crop(x0, y0, x1, y1)
+
+    def probe_pixels_by_cache(self, probes: Sequence[Tuple], tolerance: int = 0) -> List[bool]:
+        """
+        在缓存截图上批量检查像素颜色（一次向量化运算，不重新截图）
+
+        :param probes: [(x, y, 'BBGGRR'), ...] 或 [(x, y, 'BBGGRR', tolerance), ...]，
+                       基准坐标 + 十六进制 BGR 颜色（与 bg_check_pixel_color 相同）
+        :param tolerance: 未单独指定容差的探测点使用的容差（各通道最大差值）
+        :return: 与 probes 顺序一致的结果，超出截图范围的为 False
+        """
+        if self.screenshot_cache is None or not probes:
+            return [False] * len(probes)
+        scale = self.mapper.scale
+        points = [scale.to_client(probe[0], probe[1]) for probe in probes]
+        colors = [ColorDetector.hex2rgb(probe[2]) for probe in probes]
+        tolerances = [probe[3] if len(probe) > 3 else tolerance for probe in probes]
+        xs, ys = zip(*points)
+        return self.screenshot_cache.probe_pixels(xs, ys, colors, tolerances).tolist()
+
+    def check_pixels_by_cache(self, probes: Sequence[Tuple], tolerance: int = 0) -> bool:
+        """缓存截图上所有探测点的颜色是否都在容差内，参数同 probe_pixels_by_cache"""
+        return all(self.probe_pixels_by_cache(probes, tolerance))
+
+    def get_pixel_color_by_cache(self, x: int, y: int) -> Optional[str]:
+        """
+        从缓存截图读取像素颜色
+
+        :return: 十六进制 BGR 颜色（与 bg_get_pixel_color 格式相同），超出截图范围返回 None
+        """
+        if self.screenshot_cache is None:
+            return None
+        x, y = self.mapper.scale.to_client(x, y)
+        if not (0 <= x < self.screenshot_cache.width and 0 <= y < self.screenshot_cache.height):
+            return None
+        b, g, r = self.screenshot_cache[y, x][:3]
+        return f"{b:02X}{g:02X}{r:02X}"
+
+    def find_color_by_cache(self, x0: int, y0: int, x1: int, y1: int, color_bgr: str,
+                            tolerance: int = 0) -> Tuple[int, int]:
+        """
+        在缓存截图的指定区域内查找第一个（行优先）颜色匹配的像素
+
+        :param color_bgr: 十六进制 BGR 颜色
+        :param tolerance: 各通道允许的最大差值
+        :return: (x, y) 基准坐标，未找到返回 (-1, -1)
+        """
+        if self.screenshot_cache is None:
+            return -1, -1
+        scale = self.mapper.scale
+        cx0, cy0, cx1, cy1 = scale.region_to_client(x0, y0, x1, y1)
+        cx0, cy0 = max(0, cx0), max(0, cy0)
+        cx1, cy1 = min(cx1, self.screenshot_cache.width), min(cy1, self.screenshot_cache.height)
+        if cx0 >= cx1 or cy0 >= cy1:
+            return -1, -1
+        region = self.screenshot_cache.crop(cx0, cy0, cx1, cy1)
+        point = region.find_color(ColorDetector.hex2rgb(color_bgr), tolerance)
+        if point is None:
+            return -1, -1
+        return scale.to_reference(cx0 + point[0], cy0 + point[1])
 
     def bg_find_pic_by_cache(self, small_picture_path, x0=0, y0=0, x1=99999, y1=99999, similarity=0.8) -> Tuple[int, int]:
         """直接截图匹配图片"""
         return self.bg_find_pic(self.screenshot_cache, small_picture_path, x0, y0, x1, y1, similarity)
 
-    def bg_find_pic_all_by_cache(self, small_picture_path, x0=0, y0=0, x1=99999, y1=99999, similarity=0.8) -> List[Tuple[int, int, float]]:
+    def bg_find_pic_all_by_cache(self, small_picture_path, x0=0, y0=0, x1=99999, y1=99999, similarity=0.8,
+                                 nms_iou: Optional[float] = DEFAULT_NMS_IOU,
+                                 max_results: Optional[int] = None) -> List[Tuple[int, int, float]]:
         """直接截图匹配图片，返回所有匹配结果"""
-        return self.bg_find_pic_all(self.screenshot_cache, small_picture_path, x0, y0, x1, y1, similarity)
+        return self.bg_find_pic_all(self.screenshot_cache, small_picture_path, x0, y0, x1, y1, similarity,
+                                    nms_iou=nms_iou, max_results=max_results)
 
-    def bg_find_pic_all(self, screenshot: Optional[Any], small_img_path, x0=0, y0=0, x1=99999, y1=99999, similarity=0.8) -> List[Tuple[int, int, float]]:
+    def _prepare_region(self, screenshot: Optional[Any], small_img_path, x0=0, y0=0, x1=99999, y1=99999):
         """
-        在给定截图中匹配图片，返回所有大于相似度阈值的结果（按相似度降序排序）
-        :return List[Tuple[x, y, similarity]]
+        加载模板并裁剪搜索区域
+
+        :return: (template, search_frame, (x0, y0))，无法匹配时返回 None
         """
         if screenshot is None:
-            return []
+            return None
 
-        small_img_path = to_project_path(small_img_path)
-        small_img = cv2.imread(small_img_path)
-        if small_img is None:
-            return []
+        template = self.template_cache.get(self.mapper.template_path(to_project_path(small_img_path)))
+        if template is None:
+            return None
 
-        big_img = screenshot
-        if x0 or y0 or x1 < 99999 or y1 < 99999:
-            h_img, w_img = big_img.shape[:2]
-            x1 = min(x1, w_img)
-            y1 = min(y1, h_img)
-            big_img = big_img[y0:y1, x0:x1]
-
-        # ---------- 灰度结构匹配 ----------
-        big_gray = cv2.cvtColor(big_img, cv2.COLOR_BGR2GRAY)
-        small_gray = cv2.cvtColor(small_img, cv2.COLOR_BGR2GRAY)
-
-        result = cv2.matchTemplate(
-            big_gray,
-            small_gray,
-            cv2.TM_CCOEFF_NORMED
-        )
+        h_img, w_img = screenshot.shape[:2]
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(x1, w_img), min(y1, h_img)
+        if x1 - x0 < template.width or y1 - y0 < template.height:
+            return None
 
-        h, w = small_img.shape[:2]
-        matches = []
+        if isinstance(screenshot, ScreenFrame):
+            search_frame = screenshot.crop(x0, y0, x1, y1)
+        else:
+            # 非缓存截图：只对搜索区域做颜色空间转换
+            search_frame = ScreenFrame(screenshot[y0:y1, x0:x1])
+        return template, search_frame, (x0, y0)
 
-        # 找到所有大于阈值的匹配位置
-        loc = np.where(result >= similarity)
-        for pt in zip(*loc[::-1]):
-            x = x0 + pt[0]
-            y = y0 + pt[1]
-            roi = screenshot[y:y+h, x:x+w]
-            if roi.size == 0:
-                continue
+    def _prepare_match(self, screenshot: Optional[Any], small_img_path, x0=0, y0=0, x1=99999, y1=99999):
+        """
+        加载模板、裁剪搜索区域并计算灰度相关系数图
+
+        :return: (template, search_frame, result, (x0, y0))，无法匹配时返回 None
+        """
+        region = self._prepare_region(screenshot, small_img_path, x0, y0, x1, y1)
+        if region is None:
+            return None
+        template, search_frame, offset = region
+
+        # ---------- 灰度结构匹配（大区域自动走 FFT，帧频谱每帧只算一次） ----------
+        result = correlate(search_frame, template)
+        return template, search_frame, result, offset
+
+    def bg_find_pic_all(self, screenshot: Optional[Any], small_img_path, x0=0, y0=0, x1=99999, y1=99999, similarity=0.8,
+                        nms_iou: Optional[float] = DEFAULT_NMS_IOU,
+                        max_results: Optional[int] = None) -> List[Tuple[int, int, float]]:
+        """
+        在给定截图中匹配图片，返回所有大于相似度阈值的结果（按相似度降序排序）
 
-            # ---------- 颜色相似度 ----------
-            tpl_hsv = cv2.cvtColor(small_img, cv2.COLOR_BGR2HSV)
-            roi_hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
+        默认做非极大值抑制，同一个目标只返回得分最高的一个位置
+        :param nms_iou: 非极大值抑制 IoU 阈值，None 表示返回所有超过阈值的像素位置
+        :param max_results: 最多返回数量（top-k），None 表示不限制
+        :return List[Tuple[x, y, similarity]]
+        """
+        if screenshot is None:
+            return []
+        key = ('all', small_img_path, x0, y0, x1, y1, similarity, nms_iou, max_results)
+        return list(self.match_memo.get_or_compute(
+            screenshot, key,
+            lambda: self._find_all(screenshot, small_img_path, x0, y0, x1, y1, similarity, nms_iou, max_results)))
+
+    def _find_all(self, screenshot: Any, small_img_path, x0, y0, x1, y1, similarity, nms_iou,
+                  max_results) -> List[Tuple[int, int, float]]:
+        """bg_find_pic_all 的实际查找（区域为基准坐标）"""
+        start = time.perf_counter()
+        scale = self.mapper.scale
+        h_img, w_img = screenshot.shape[:2]
+        x0, y0, x1, y1 = scale.region_to_client(x0, y0, x1, y1)
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(x1, w_img), min(y1, h_img)
+
+        def compute() -> List[Tuple[int, int, float]]:
+            prepared = self._prepare_match(screenshot, small_img_path, x0, y0, x1, y1)
+            if prepared is None:
+                return []
+            template, search_frame, result, offset = prepared
+
+            # ---------- 颜色相似度 + 合成相似度（积分图向量化） ----------
+            return collect_matches(search_frame, template, result, similarity, offset=offset,
+                                   nms_iou=nms_iou, max_results=max_results)
+
+        key = ('all', small_img_path, x0, y0, x1, y1, similarity, nms_iou, max_results)
+        matches = self.dirty_tracker.reuse_or_compute(key, screenshot, (x0, y0, x1, y1), compute)
+        self.profiler.record(small_img_path, time.perf_counter() - start,
+                             max(0, x1 - x0) * max(0, y1 - y0), bool(matches))
+        if scale.is_native:
+            return matches
+        return [(*scale.to_reference(x, y), score) for x, y, score in matches]
+
+    def bg_find_pic_best(self, screenshot: Optional[Any], small_img_path, x0=0, y0=0, x1=99999, y1=99999,
+                         similarity=0.8, pyramid_level: Optional[int] = None,
+                         cascade: Optional[DetectorCascade] = None) -> Optional[Tuple[int, int, float]]:
+        """
+        在给定截图中只查找最佳匹配（不枚举全部候选）
 
-            color_diff = np.linalg.norm(
-                tpl_hsv.mean(axis=(0, 1)) - roi_hsv.mean(axis=(0, 1))
-            )
-            color_score = max(0.0, 1.0 - color_diff / 180.0)
+        同一帧内相同的查找直接返回备忘结果；搜索区域自上次匹配以来没有变化时复用上次结果；
+        否则优先在该模板学习到的搜索区域内查找，未命中再回退到完整的请求区域。
 
-            # ---------- 合成相似度 ----------
-            gray_score = result[pt[1], pt[0]]
-            final_score = 0.7 * gray_score + 0.3 * color_score
+        :param pyramid_level: 金字塔粗匹配层级，None 表示搜索区域接近全屏时自动开启，
+                              0 表示直接在原分辨率匹配，1 为 1/2，2 为 1/4
+        :param cascade: 级联预筛，任一级拒绝时不做完整匹配，直接返回 None
+        :return: (x, y, similarity)，未找到返回 None
+        """
+        if screenshot is None:
+            return None
+        key = ('best', small_img_path, x0, y0, x1, y1, similarity, pyramid_level, cascade)
+        return self.match_memo.get_or_compute(
+            screenshot, key,
+            lambda: self._find_best(screenshot, small_img_path, x0, y0, x1, y1, similarity, pyramid_level,
+                                    cascade))
+
+    def _find_best(self, screenshot: Any, small_img_path, x0, y0, x1, y1, similarity,
+                   pyramid_level, cascade) -> Optional[Tuple[int, int, float]]:
+        """bg_find_pic_best 的实际查找（区域为基准坐标）"""
+        start = time.perf_counter()
+        scale = self.mapper.scale
+        h_img, w_img = screenshot.shape[:2]
+        x0, y0, x1, y1 = scale.region_to_client(x0, y0, x1, y1)
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(x1, w_img), min(y1, h_img)
+
+        key = ('best', small_img_path, x0, y0, x1, y1, similarity, pyramid_level, cascade)
+        match = self.dirty_tracker.reuse_or_compute(
+            key, screenshot, (x0, y0, x1, y1),
+            lambda: self._find_best_with_cascade(screenshot, small_img_path, x0, y0, x1, y1,
+                                                 similarity, pyramid_level, cascade))
+        self.profiler.record(small_img_path, time.perf_counter() - start,
+                             max(0, x1 - x0) * max(0, y1 - y0), match is not None)
+        if match is None or scale.is_native:
+            return match
+        return (*scale.to_reference(match[0], match[1]), match[2])
+
+    def _find_best_with_cascade(self, screenshot: Any, small_img_path, x0, y0, x1, y1, similarity,
+                                pyramid_level, cascade: Optional[DetectorCascade]) -> Optional[Tuple[int, int, float]]:
+        """先执行级联预筛（实际客户区坐标），全部通过后再做完整匹配"""
+        if cascade is not None:
+            region = self._prepare_region(screenshot, small_img_path, x0, y0, x1, y1)
+            if region is None:
+                return None
+            template, search_frame, offset = region
+            if not cascade.passes(small_img_path, search_frame, offset, template, similarity, self.mapper.scale):
+                return None
+        return self._find_best_with_learned_region(screenshot, small_img_path, x0, y0, x1, y1,
+                                                   similarity, pyramid_level)
+
+    def _find_best_with_learned_region(self, screenshot: Any, small_img_path, x0, y0, x1, y1, similarity,
+                                       pyramid_level) -> Optional[Tuple[int, int, float]]:
+        """先在学习区域内查找最佳匹配，未命中再回退到完整区域（均为实际客户区坐标）"""
+        requested_area = max(0, x1 - x0) * max(0, y1 - y0)
+
+        # 学习区域以基准坐标保存，不同分辨率之间通用
+        scale = self.mapper.scale
+        learned = self.region_learner.suggest(small_img_path, *scale.region_to_reference(x0, y0, x1, y1))
+        if learned is not None and not scale.is_native:
+            lx0, ly0, lx1, ly1 = scale.region_to_client(*learned)
+            learned = (max(x0, lx0), max(y0, ly0), min(x1, lx1), min(y1, ly1))
+        if learned is not None:
+            found = self._search_best(screenshot, small_img_path, *learned, similarity, pyramid_level)
+            learned_area = (learned[2] - learned[0]) * (learned[3] - learned[1])
+            if found is not None:
+                self.region_learner.note_hit(requested_area, learned_area)
+                return self._learn_match(small_img_path, *found)
+            self.region_learner.note_fallback(requested_area, learned_area)
+
+        found = self._search_best(screenshot, small_img_path, x0, y0, x1, y1, similarity, pyramid_level)
+        if found is None:
+            return None
+        return self._learn_match(small_img_path, *found)
 
-            if final_score >= similarity:
-                center_x = x + w // 2
-                center_y = y + h // 2
-                matches.append((center_x, center_y, final_score))
+    def _search_best(self, screenshot: Any, small_img_path, x0, y0, x1, y1, similarity, pyramid_level):
+        """
+        在指定区域内查找最佳匹配
 
-        # 按相似度降序排序
-        matches.sort(key=lambda m: m[2], reverse=True)
+        :return: (template, (x, y, similarity))，未找到返回 None
+        """
+        region = self._prepare_region(screenshot, small_img_path, x0, y0, x1, y1)
+        if region is None:
+            return None
+        template, search_frame, offset = region
+        if pyramid_level is None:
+            h_img, w_img = screenshot.shape[:2]
+            pyramid_level = auto_pyramid_level(template, search_frame.width * search_frame.height, w_img * h_img)
+        if pyramid_level > 0:
+            match = pyramid_match(search_frame, template, similarity, pyramid_level, offset=offset)
+        else:
+            # 灰度结构匹配（大区域自动走 FFT，帧频谱每帧只算一次）
+            match = best_match(search_frame, template, correlate(search_frame, template), similarity, offset=offset)
+        if match is None:
+            return None
+        return template, match
 
-        return matches
+    def _learn_match(self, small_img_path, template, match: Tuple[int, int, float]) -> Tuple[int, int, float]:
+        """把匹配框记入搜索区域学习器"""
+        left, top = match[0] - template.width // 2, match[1] - template.height // 2
+        box = self.mapper.scale.region_to_reference(left, top, left + template.width, top + template.height)
+        self.region_learner.record(small_img_path, *box)
+        return match
 
     def bg_find_pic(self, screenshot: Optional[Any], small_img_path, x0=0, y0=0, x1=99999, y1=99999, similarity=0.8) -> Tuple[int, int]:
         """
         在给定截图中匹配图片（增强版，支持灰度和颜色特征）
         :return (x, y)
         """
-        matches = self.bg_find_pic_all(screenshot, small_img_path, x0, y0, x1, y1, similarity)
+        match = self.bg_find_pic_best(screenshot, small_img_path, x0, y0, x1, y1, similarity)
         
-        if not matches:
+        if match is None:
             return -1, -1
         
-        center_x, center_y, final_score = matches[0]
+        center_x, center_y, final_score = match
         
         # 调试模式保存图片
         if self.screenshot_capture.save_source_img and final_score >= 0.6:
-            small_img_path = to_project_path(small_img_path)
-            small_img = cv2.imread(small_img_path)
-            if small_img is not None:
-                h, w = small_img.shape[:2]
-                big_img = screenshot
-                if x0 or y0 or x1 < 99999 or y1 < 99999:
-                    h_img, w_img = big_img.shape[:2]
-                    x1 = min(x1, w_img)
-                    y1 = min(y1, h_img)
-                    big_img = big_img[y0:y1, x0:x1]
-                
-                small_img_name = Path(small_img_path).stem
-                small_img_dir = debug_img_base_dir / small_img_name
-                small_img_dir.mkdir(parents=True, exist_ok=True)
-                debug_img = big_img.copy()
-                cv2.rectangle(debug_img, (center_x - w//2 - x0, center_y - h//2 - y0), 
-                             (center_x - w//2 - x0 + w, center_y - h//2 - y0 + h), (0, 255, 0), 1)
-                match_text = f"{final_score:.2f}/{similarity}@({center_x},{center_y})"
-                cv2.putText(debug_img, match_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
-                cv2.imwrite(str(small_img_dir / f"{final_score >= similarity}_result.png"), debug_img)
+            self._save_debug_match(screenshot, small_img_path, (x0, y0, x1, y1), match, similarity)
         
         logger.debug(f"匹配成功: {Path(small_img_path).stem} | 位置: ({center_x},{center_y}) | 相似度: {final_score:.4f}")
         return center_x, center_y
 
+    def _save_debug_match(self, screenshot: Optional[Any], small_img_path, region: Tuple[int, int, int, int],
+                          match: Tuple[int, int, float], similarity: float) -> None:
+        """
+        保存匹配调试图：裁剪搜索区域并画出匹配框
+
+        区域和匹配结果均为基准坐标，统一换算到截图（实际客户区）坐标后再裁剪和绘制。
+        """
+        frame = screenshot if screenshot is not None else self.screenshot_cache
+        template = self.template_cache.get(to_project_path(small_img_path))
+        if frame is None or template is None:
+            return
+        scale = self.mapper.scale
+        h_img, w_img = frame.shape[:2]
+        x0, y0, x1, y1 = scale.region_to_client(*region)
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(x1, w_img), min(y1, h_img)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        center_x, center_y, final_score = match
+        left, top = center_x - template.width // 2, center_y - template.height // 2
+        bx0, by0, bx1, by1 = scale.region_to_client(left, top, left + template.width, top + template.height)
+
+        small_img_dir = debug_img_base_dir / Path(small_img_path).stem
+        small_img_dir.mkdir(parents=True, exist_ok=True)
+        debug_img = np.ascontiguousarray(frame[y0:y1, x0:x1]).copy()
+        cv2.rectangle(debug_img, (bx0 - x0, by0 - y0), (bx1 - x0, by1 - y0), (0, 255, 0), 1)
+        match_text = f"{final_score:.2f}/{similarity}@({center_x},{center_y})"
+        cv2.putText(debug_img, match_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+        cv2.imwrite(str(small_img_dir / f"{final_score >= similarity}_result.png"), debug_img)
+
     def find_image(self, screenshot: Optional[Any], small_img_path: str, x0: int = 0, y0: int = 0,
                    x1: int = 99999, y1: int = 99999, similarity: float = 0.8) -> ImageMatchResult:
         """
@@ -412,12 +676,12 @@ class ImageFinder:
         Returns:
             ImageMatchResult 对象，包含匹配位置、图片路径和相似度
         """
-        matches = self.bg_find_pic_all(screenshot, small_img_path, x0, y0, x1, y1, similarity)
+        match = self.bg_find_pic_best(screenshot, small_img_path, x0, y0, x1, y1, similarity)
 
-        if not matches:
+        if match is None:
             return ImageMatchResult(point=(-1, -1), image_path=small_img_path, similarity=0.0)
 
-        center_x, center_y, final_score = matches[0]
+        center_x, center_y, final_score = match
         logger.debug(f"匹配成功: {Path(small_img_path).stem} | 位置: ({center_x},{center_y}) | 相似度: {final_score:.4f}")
         return ImageMatchResult(point=(center_x, center_y), image_path=small_img_path, similarity=final_score)
 
@@ -437,12 +701,54 @@ class ImageFinder:
             time.sleep(0.2)
         return -1, -1
 
-    def bg_find_pic_by_config(self, image_match_config: ImageMatchConfig) -> tuple:
-        for target_image_path in image_match_config.target_image_path_list:
-            point = self.bg_find_pic_by_cache(target_image_path, image_match_config.x0,
-                                     image_match_config.y0,
-                                     image_match_config.x1, image_match_config.y1,
-                                     image_match_config.similarity)
-            if point is not None and point[0] != -1 and point[1] != -1:
-                return point, target_image_path
+    def bg_find_pic_batch(self, screenshot: Optional[Any],
+                          jobs: Sequence[MatchJob]) -> List[Optional[Tuple[int, int, float]]]:
+        """
+        在同一张截图上并行执行多个找图任务
+
+        :param jobs: 找图任务列表
+        :return: 与任务顺序一致的最佳匹配列表，未找到的为 None
+        """
+        return self.match_pool.map(lambda job: self._find_job(screenshot, job), jobs)
+
+    def iter_find_pic(self, screenshot: Optional[Any],
+                      jobs: Sequence[MatchJob]) -> Iterator[Tuple[MatchJob, Tuple[int, int]]]:
+        """
+        并行执行多个找图任务，按任务顺序（优先级）逐个产出命中结果
+
+        调用方提前结束迭代时，尚未开始的任务会被取消。
+
+        :return: (命中的任务, (x, y)) 迭代器
+        """
+        for index, match in self.match_pool.iter_ordered(lambda job: self._find_job(screenshot, job), jobs):
+            if match is None:
+                continue
+            center_x, center_y, final_score = match
+            logger.debug(f"匹配成功: {Path(jobs[index].image_path).stem} | 位置: ({center_x},{center_y}) | 相似度: {final_score:.4f}")
+            yield jobs[index], (center_x, center_y)
+
+    def bg_find_pic_first(self, screenshot: Optional[Any],
+                          jobs: Sequence[MatchJob]) -> Tuple[Tuple[int, int], Optional[MatchJob]]:
+        """
+        并行执行多个找图任务，返回优先级最高的命中结果
+
+        :return: ((x, y), 命中的任务)，全部未命中返回 ((-1, -1), None)
+        """
+        for job, point in self.iter_find_pic(screenshot, jobs):
+            return point, job
         return (-1, -1), None
+
+    def bg_find_pic_first_by_cache(self, jobs: Sequence[MatchJob]) -> Tuple[Tuple[int, int], Optional[MatchJob]]:
+        """使用缓存截图并行执行多个找图任务，返回优先级最高的命中结果"""
+        return self.bg_find_pic_first(self.screenshot_cache, jobs)
+
+    def _find_job(self, screenshot: Optional[Any], job: MatchJob) -> Optional[Tuple[int, int, float]]:
+        return self.bg_find_pic_best(screenshot, job.image_path, job.x0, job.y0, job.x1, job.y1, job.similarity,
+                                     pyramid_level=job.pyramid_level, cascade=job.cascade)
+
+    def bg_find_pic_by_config(self, image_match_config: ImageMatchConfig) -> tuple:
+        """按配置中的模板顺序查找，多模板时并行匹配"""
+        point, job = self.bg_find_pic_first_by_cache(image_match_config.to_jobs())
+        if job is None:
+            return (-1, -1), None
+        return point, job.image_path
@@ -0,0 +1,124 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Generic, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+if TYPE_CHECKING:
+    from win_util.cascade import DetectorCascade
+
+# 默认匹配线程数（cv2.matchTemplate 会释放 GIL，多线程可以真正并行）
+DEFAULT_MATCH_WORKERS = max(1, min(4, os.cpu_count() or 1))
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+@dataclass(frozen=True)
+class MatchJob:
+    """单个找图任务：模板 + 搜索区域 + 相似度阈值 + 金字塔层级 + 级联预筛"""
+    image_path: str
+    x0: int = 0
+    y0: int = 0
+    x1: int = 99999
+    y1: int = 99999
+    similarity: float = 0.8
+    pyramid_level: Optional[int] = None
+    cascade: Optional['DetectorCascade'] = None
+
+
+class MatchPool(Generic[T, R]):
+    """
+    找图线程池
+
+    把一组任务分发到多个工作线程，对同一帧并行匹配，结果按任务顺序（即优先级顺序）返回。
+    工作线程数为 1 时直接在调用线程中串行执行，不创建线程池。
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MATCH_WORKERS):
+        """
+        :param max_workers: 工作线程数
+        """
+        self._max_workers = max(1, max_workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    def resize(self, max_workers: int) -> None:
+        """
+        调整工作线程数，旧线程池在当前任务完成后释放
+
+        :param max_workers: 新的工作线程数
+        """
+        max_workers = max(1, max_workers)
+        with self._lock:
+            if max_workers == self._max_workers:
+                return
+            self._max_workers = max_workers
+            old, self._executor = self._executor, None
+        if old is not None:
+            old.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        """关闭线程池"""
+        with self._lock:
+            old, self._executor = self._executor, None
+        if old is not None:
+            old.shutdown(wait=True)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers,
+                                                    thread_name_prefix="match")
+            return self._executor
+
+    def iter_ordered(self, fn: Callable[[T], R], jobs: Sequence[T]) -> Iterator[Tuple[int, R]]:
+        """
+        并行执行任务，按任务顺序逐个产出结果
+
+        调用方提前结束迭代时，尚未开始的任务会被取消。
+
+        :param fn: 任务函数
+        :param jobs: 任务列表（顺序即优先级）
+        :return: (任务下标, 结果) 迭代器
+        """
+        if self._max_workers == 1 or len(jobs) <= 1:
+            for index, job in enumerate(jobs):
+                yield index, fn(job)
+            return
+
+        executor = self._get_executor()
+        futures: List[Future] = [executor.submit(fn, job) for job in jobs]
+        try:
+            for index, future in enumerate(futures):
+                yield index, future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def map(self, fn: Callable[[T], R], jobs: Sequence[T]) -> List[R]:
+        """
+        并行执行所有任务
+
+        :return: 与任务顺序一致的结果列表
+        """
+        return [result for _, result in self.iter_ordered(fn, jobs)]
+
+    def first(self, fn: Callable[[T], R], jobs: Sequence[T],
+              accept: Callable[[R], bool] = bool) -> Optional[Tuple[int, R]]:
+        """
+        按优先级返回第一个满足条件的结果
+
+        只要更高优先级的任务都已完成且未命中，就立即返回，不等待低优先级任务。
+
+        :param accept: 判断结果是否命中
+        :return: (任务下标, 结果)，全部未命中返回 None
+        """
+        for index, result in self.iter_ordered(fn, jobs):
+            if accept(result):
+                return index, result
+        return None
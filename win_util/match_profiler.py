@@ -0,0 +1,145 @@
+import csv
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Deque, Dict, Iterable, List, Optional
+
+from win_util.persistence import percentile
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# 模板耗时报告输出目录（本地文件，不纳入版本管理）
+DEFAULT_PROFILE_DIR = _PROJECT_ROOT / "logs" / "match_profile"
+
+# 每个模板保留的最近耗时样本数，用于计算分位数
+LATENCY_SAMPLE_SIZE = 1024
+
+REPORT_FIELDS = ['template', 'calls', 'hits', 'hit_rate', 'total_ms', 'mean_ms', 'p50_ms', 'p95_ms',
+                 'mean_search_pixels']
+
+
+@dataclass
+class TemplateProfile:
+    """单个模板的累计匹配开销"""
+    calls: int = 0
+    hits: int = 0
+    total_seconds: float = 0.0
+    search_pixels: int = 0
+    samples: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLE_SIZE), repr=False)
+
+
+class MatchProfiler:
+    """
+    按模板统计找图开销
+
+    记录每个模板的调用次数、累计/中位/P95 耗时、搜索面积和命中率，
+    脚本结束时输出 JSON 和 CSV，用于找出从未命中的模板和最耗时的全屏模板。
+    每次记录只是一次计数和一次定长队列追加，可以常开。
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self._profiles: Dict[str, TemplateProfile] = {}
+        self._keys: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def _key(self, template_path: str) -> str:
+        """模板路径统一为相对项目根目录的 posix 路径"""
+        key = self._keys.get(template_path)
+        if key is None:
+            path = Path(os.path.normpath(template_path))
+            try:
+                key = path.relative_to(_PROJECT_ROOT).as_posix()
+            except ValueError:
+                key = path.as_posix()
+            self._keys[template_path] = key
+        return key
+
+    def record(self, template_path: str, seconds: float, search_area: int, hit: bool) -> None:
+        """
+        记录一次匹配
+
+        :param template_path: 模板路径
+        :param seconds: 耗时（秒）
+        :param search_area: 搜索区域面积（像素）
+        :param hit: 是否找到
+        """
+        if not self.enabled:
+            return
+        key = self._key(template_path)
+        with self._lock:
+            profile = self._profiles.get(key)
+            if profile is None:
+                profile = self._profiles[key] = TemplateProfile()
+            profile.calls += 1
+            profile.hits += hit
+            profile.total_seconds += seconds
+            profile.search_pixels += search_area
+            profile.samples.append(seconds)
+
+    def report(self, templates: Optional[Iterable[str]] = None) -> List[Dict[str, object]]:
+        """
+        生成报告，按累计耗时降序
+
+        :param templates: 额外列出的模板路径，本次运行中从未调用的也会以 0 次出现在报告中
+        :return: 每个模板一行
+        """
+        with self._lock:
+            profiles = {key: (p.calls, p.hits, p.total_seconds, p.search_pixels, sorted(p.samples))
+                        for key, p in self._profiles.items()}
+        for path in templates or ():
+            profiles.setdefault(self._key(path), (0, 0, 0.0, 0, []))
+
+        rows = []
+        for key, (calls, hits, total, pixels, samples) in profiles.items():
+            rows.append({
+                'template': key,
+                'calls': calls,
+                'hits': hits,
+                'hit_rate': round(hits / calls, 4) if calls else 0.0,
+                'total_ms': round(total * 1000, 3),
+                'mean_ms': round(total * 1000 / calls, 3) if calls else 0.0,
+                'p50_ms': round(percentile(samples, 0.5) * 1000, 3),
+                'p95_ms': round(percentile(samples, 0.95) * 1000, 3),
+                'mean_search_pixels': pixels // calls if calls else 0,
+            })
+        rows.sort(key=lambda row: (-row['total_ms'], row['template']))
+        return rows
+
+    def dump(self, name: str = "script", directory: Path = DEFAULT_PROFILE_DIR,
+             templates: Optional[Iterable[str]] = None) -> Optional[Path]:
+        """
+        输出 JSON 和 CSV 报告
+
+        :param name: 文件名前缀（通常为脚本名）
+        :param directory: 输出目录
+        :param templates: 参见 report
+        :return: JSON 文件路径，没有任何记录时不输出并返回 None
+        """
+        rows = self.report(templates)
+        if not any(row['calls'] for row in rows):
+            return None
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        stem = directory / f"{name}_{time.strftime('%Y%m%d_%H%M%S', time.localtime(self.started_at))}"
+
+        json_path = stem.with_suffix(".json")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({'started_at': self.started_at, 'stopped_at': time.time(), 'templates': rows},
+                      f, indent=2, ensure_ascii=False)
+        with open(stem.with_suffix(".csv"), 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        return json_path
+
+    def reset(self) -> None:
+        """清空所有记录，开始新一轮统计"""
+        with self._lock:
+            self._profiles.clear()
+            self.started_at = time.time()
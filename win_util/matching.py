@@ -0,0 +1,305 @@
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from win_util.frame import ScreenFrame
+from win_util.template_cache import TemplateEntry
+
+# 合成相似度权重：灰度结构 0.7 + 颜色 0.3
+GRAY_WEIGHT = 0.7
+COLOR_WEIGHT = 0.3
+
+# HSV 均值差归一化尺度
+HSV_DIFF_SCALE = 180.0
+
+# 多目标匹配默认的非极大值抑制 IoU 阈值，同一目标周围重叠度超过该值的结果会被合并
+DEFAULT_NMS_IOU = 0.3
+
+# 最佳匹配快速路径首轮参与颜色打分的候选数量
+DEFAULT_BEST_MATCH_CANDIDATES = 16
+
+# 金字塔粗匹配：下采样后相关系数会降低，粗阈值在换算出的灰度下限基础上再放宽该值
+PYRAMID_COARSE_SLACK = 0.2
+
+# 金字塔粗匹配保留的峰值数量，每个峰值在原分辨率的小窗口内精匹配
+DEFAULT_PYRAMID_PEAKS = 4
+
+# 下采样后模板的最小边长，小于该值时自动降低层级
+MIN_PYRAMID_TEMPLATE_SIZE = 8
+
+# 未指定金字塔层级时，搜索区域面积不小于整帧该比例即自动使用金字塔匹配
+AUTO_PYRAMID_REGION_RATIO = 0.5
+
+# 自动使用金字塔匹配时的期望层级（再按模板尺寸限制）
+AUTO_PYRAMID_LEVEL = 2
+
+
+def color_scores(roi_hsv_means: np.ndarray, template: TemplateEntry) -> np.ndarray:
+    """
+    颜色相似度：候选区域与模板 HSV 均值的距离归一化到 [0, 1]
+
+    :param roi_hsv_means: 候选区域 HSV 均值，形状 (N, 3)
+    :param template: 模板
+    :return: 颜色相似度，形状 (N,)
+    """
+    color_diff = np.linalg.norm(roi_hsv_means - template.hsv_mean, axis=1)
+    return np.maximum(0.0, 1.0 - color_diff / HSV_DIFF_SCALE)
+
+
+def fuse_scores(gray_scores: np.ndarray, roi_hsv_means: np.ndarray, template: TemplateEntry) -> np.ndarray:
+    """
+    合成灰度相似度和颜色相似度
+
+    :param gray_scores: 灰度相关系数，形状 (N,)
+    :param roi_hsv_means: 候选区域 HSV 均值，形状 (N, 3)
+    :param template: 模板
+    :return: 合成相似度，形状 (N,)
+    """
+    return GRAY_WEIGHT * gray_scores + COLOR_WEIGHT * color_scores(roi_hsv_means, template)
+
+
+def coarse_gray_threshold(similarity: float, slack: float = PYRAMID_COARSE_SLACK) -> float:
+    """
+    下采样相关系数的粗阈值：按合成相似度换算出的灰度下限（颜色得分取上界 1）再放宽 slack
+
+    :param similarity: 合成相似度阈值
+    :param slack: 放宽量，抵消下采样导致的相关系数下降
+    """
+    return (similarity - COLOR_WEIGHT) / GRAY_WEIGHT - slack
+
+
+def score_locations(search_frame: ScreenFrame, template: TemplateEntry, result: np.ndarray,
+                    xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    """
+    对相关系数图上的指定位置计算合成相似度（颜色部分基于积分图，无 Python 循环）
+
+    :param search_frame: 搜索区域
+    :param template: 模板
+    :param result: matchTemplate 输出的相关系数图
+    :param xs: 候选位置 x（相对搜索区域）
+    :param ys: 候选位置 y（相对搜索区域）
+    :return: 合成相似度，形状 (N,)
+    """
+    roi_means = search_frame.hsv_box_means(xs, ys, template.width, template.height)
+    return fuse_scores(result[ys, xs].astype(np.float64), roi_means, template)
+
+
+def extract_peaks(shape: Tuple[int, int], xs: np.ndarray, ys: np.ndarray, scores: np.ndarray) -> np.ndarray:
+    """
+    提取得分图上的局部极大值（3x3 邻域），把同一目标周围的一簇候选压缩为少量峰值
+
+    :param shape: 得分图形状
+    :param xs: 候选位置 x
+    :param ys: 候选位置 y
+    :param scores: 候选得分
+    :return: 布尔掩码，标记哪些候选是局部极大值
+    """
+    score_map = np.full(shape, -np.inf, dtype=np.float32)
+    score_map[ys, xs] = scores
+    dilated = cv2.dilate(score_map, np.ones((3, 3), dtype=np.uint8))
+    return score_map[ys, xs] >= dilated[ys, xs]
+
+
+def non_max_suppression(xs: np.ndarray, ys: np.ndarray, scores: np.ndarray, w: int, h: int,
+                        iou_threshold: float, max_results: Optional[int] = None) -> np.ndarray:
+    """
+    对同尺寸矩形做贪心非极大值抑制
+
+    :param xs: 矩形左上角 x
+    :param ys: 矩形左上角 y
+    :param scores: 得分
+    :param w: 矩形宽度
+    :param h: 矩形高度
+    :param iou_threshold: IoU 超过该值的低分矩形被抑制
+    :param max_results: 最多保留数量，None 表示不限制
+    :return: 保留下来的下标，按得分降序
+    """
+    order = np.argsort(-scores, kind='stable')
+    area = float(w * h)
+    keep = []
+    while order.size > 0:
+        best = order[0]
+        keep.append(best)
+        if max_results is not None and len(keep) >= max_results:
+            break
+        rest = order[1:]
+        inter = (np.maximum(0, w - np.abs(xs[rest] - xs[best]))
+                 * np.maximum(0, h - np.abs(ys[rest] - ys[best])))
+        iou = inter / (2 * area - inter)
+        order = rest[iou <= iou_threshold]
+    return np.asarray(keep, dtype=np.intp)
+
+
+def collect_matches(search_frame: ScreenFrame, template: TemplateEntry, result: np.ndarray,
+                    similarity: float, offset: Tuple[int, int] = (0, 0),
+                    nms_iou: Optional[float] = None,
+                    max_results: Optional[int] = None) -> List[Tuple[int, int, float]]:
+    """
+    收集所有合成相似度不低于阈值的匹配，按相似度降序排序
+
+    :param search_frame: 搜索区域
+    :param template: 模板
+    :param result: matchTemplate 输出的相关系数图
+    :param similarity: 相似度阈值
+    :param offset: 搜索区域在整帧中的左上角坐标
+    :param nms_iou: 非极大值抑制 IoU 阈值，None 表示返回所有像素级结果
+    :param max_results: 最多返回数量，None 表示不限制
+    :return: [(center_x, center_y, similarity), ...]
+    """
+    ys, xs = np.nonzero(result >= similarity)
+    if xs.size == 0:
+        return []
+
+    scores = score_locations(search_frame, template, result, xs, ys)
+    keep = scores >= similarity
+    xs, ys, scores = xs[keep], ys[keep], scores[keep]
+
+    if nms_iou is not None and xs.size > 1:
+        peaks = extract_peaks(result.shape, xs, ys, scores)
+        xs, ys, scores = xs[peaks], ys[peaks], scores[peaks]
+        order = non_max_suppression(xs, ys, scores, template.width, template.height, nms_iou, max_results)
+    else:
+        # 稳定排序，相似度相同时保持行优先顺序
+        order = np.argsort(-scores, kind='stable')[:max_results]
+    center_xs = xs[order] + offset[0] + template.width // 2
+    center_ys = ys[order] + offset[1] + template.height // 2
+    return list(zip(center_xs.tolist(), center_ys.tolist(), scores[order].tolist()))
+
+
+def best_match(search_frame: ScreenFrame, template: TemplateEntry, result: np.ndarray, similarity: float,
+               offset: Tuple[int, int] = (0, 0),
+               top_n: int = DEFAULT_BEST_MATCH_CANDIDATES) -> Optional[Tuple[int, int, float]]:
+    """
+    只取最佳匹配的快速路径
+
+    先用 minMaxLoc 判断是否有候选，再只对相关系数最高的 top_n 个位置做颜色打分。
+    由于颜色得分不超过 1，合成相似度不超过 0.7 * gray + 0.3，
+    若剩余候选的灰度上界已无法超过当前最佳，则结果与全量枚举完全一致；否则扩大候选范围重新打分。
+
+    :param search_frame: 搜索区域
+    :param template: 模板
+    :param result: matchTemplate 输出的相关系数图
+    :param similarity: 相似度阈值
+    :param offset: 搜索区域在整帧中的左上角坐标
+    :param top_n: 首轮打分的候选数量
+    :return: (center_x, center_y, similarity)，没有达到阈值的匹配时返回 None
+    """
+    _, max_val, _, _ = cv2.minMaxLoc(result)
+    if max_val < similarity:
+        return None
+
+    ys, xs = np.nonzero(result >= similarity)
+    gray = result[ys, xs]
+    if gray.size > top_n:
+        # 行优先顺序保证得分相同时与全量枚举选中同一位置
+        top = np.sort(np.argpartition(-gray, top_n)[:top_n])
+        scores = score_locations(search_frame, template, result, xs[top], ys[top])
+        best = int(np.argmax(scores))
+        best_score = float(scores[best])
+        next_gray = float(-np.partition(-gray, top_n)[top_n])
+        bound = max(best_score, similarity)
+        if GRAY_WEIGHT * next_gray + COLOR_WEIGHT < bound:
+            if best_score < similarity:
+                return None
+            return (int(xs[top[best]]) + offset[0] + template.width // 2,
+                    int(ys[top[best]]) + offset[1] + template.height // 2,
+                    best_score)
+        # 上界无法排除剩余候选：只保留仍有可能胜出的位置
+        keep = GRAY_WEIGHT * gray + COLOR_WEIGHT >= bound
+        xs, ys = xs[keep], ys[keep]
+
+    scores = score_locations(search_frame, template, result, xs, ys)
+    best = int(np.argmax(scores))
+    if scores[best] < similarity:
+        return None
+    return (int(xs[best]) + offset[0] + template.width // 2,
+            int(ys[best]) + offset[1] + template.height // 2,
+            float(scores[best]))
+
+
+def effective_pyramid_level(template: TemplateEntry, level: int) -> int:
+    """
+    根据模板尺寸限制金字塔层级，保证下采样后的模板仍有足够细节
+
+    :param template: 模板
+    :param level: 期望层级
+    :return: 实际可用层级，0 表示不使用金字塔
+    """
+    while level > 0 and min(template.width, template.height) >> level < MIN_PYRAMID_TEMPLATE_SIZE:
+        level -= 1
+    return level
+
+
+def auto_pyramid_level(template: TemplateEntry, region_area: int, frame_area: int) -> int:
+    """
+    未指定层级时自动选择金字塔层级：只有接近全屏的搜索才值得先做粗匹配，
+    学习区域等小范围搜索直接在原分辨率匹配
+
+    :param template: 模板
+    :param region_area: 搜索区域面积
+    :param frame_area: 整帧面积
+    :return: 层级，0 表示不使用金字塔
+    """
+    if region_area < AUTO_PYRAMID_REGION_RATIO * frame_area:
+        return 0
+    return effective_pyramid_level(template, AUTO_PYRAMID_LEVEL)
+
+
+def pyramid_match(search_frame: ScreenFrame, template: TemplateEntry, similarity: float, level: int,
+                  offset: Tuple[int, int] = (0, 0),
+                  max_peaks: int = DEFAULT_PYRAMID_PEAKS) -> Optional[Tuple[int, int, float]]:
+    """
+    由粗到精的金字塔匹配
+
+    先在 1/2^level 下采样的帧上用同样下采样的模板做相关，取若干粗峰值，
+    再只在每个峰值附近的原分辨率小窗口内做精匹配和颜色打分。
+    粗匹配阈值按合成相似度换算出的灰度下限再放宽 PYRAMID_COARSE_SLACK，降低漏检。
+
+    :param search_frame: 搜索区域
+    :param template: 模板
+    :param similarity: 相似度阈值
+    :param level: 金字塔层级（1 为 1/2，2 为 1/4）
+    :param offset: 搜索区域在整帧中的左上角坐标
+    :param max_peaks: 参与精匹配的粗峰值数量
+    :return: (center_x, center_y, similarity)，没有达到阈值的匹配时返回 None
+    """
+    level = effective_pyramid_level(template, level)
+    if level <= 0:
+        result = cv2.matchTemplate(search_frame.gray, template.gray, cv2.TM_CCOEFF_NORMED)
+        return best_match(search_frame, template, result, similarity, offset=offset)
+
+    coarse_frame = search_frame.gray_pyramid(level)
+    coarse_template = template.gray_pyramid(level)
+    if (coarse_frame.shape[0] < coarse_template.shape[0]
+            or coarse_frame.shape[1] < coarse_template.shape[1]):
+        return None
+    coarse = cv2.matchTemplate(coarse_frame, coarse_template, cv2.TM_CCOEFF_NORMED)
+
+    coarse_threshold = coarse_gray_threshold(similarity)
+    ys, xs = np.nonzero(coarse >= coarse_threshold)
+    if xs.size == 0:
+        return None
+    scores = coarse[ys, xs]
+    if xs.size > 1:
+        peaks = extract_peaks(coarse.shape, xs, ys, scores)
+        xs, ys, scores = xs[peaks], ys[peaks], scores[peaks]
+        order = non_max_suppression(xs, ys, scores, coarse_template.shape[1], coarse_template.shape[0],
+                                    0.0, max_peaks)
+        xs, ys = xs[order], ys[order]
+
+    # 粗坐标量化误差 + 下采样对齐误差，窗口四周各留 2 个粗像素
+    scale = 1 << level
+    pad = 2 * scale
+    best = None
+    for x, y in zip((xs * scale).tolist(), (ys * scale).tolist()):
+        wx0, wy0 = max(0, x - pad), max(0, y - pad)
+        window = search_frame.crop(wx0, wy0, x + template.width + pad, y + template.height + pad)
+        if window.width < template.width or window.height < template.height:
+            continue
+        result = cv2.matchTemplate(window.gray, template.gray, cv2.TM_CCOEFF_NORMED)
+        match = best_match(window, template, result, similarity,
+                           offset=(offset[0] + wx0, offset[1] + wy0))
+        if match is not None and (best is None or match[2] > best[2]):
+            best = match
+    return best
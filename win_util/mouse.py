@@ -5,6 +5,8 @@ import win32api
 import win32con
 from loguru import logger
 
+from win_util.resolution import CoordinateMapper
+
 if TYPE_CHECKING:
     from tests.common.environment.base import GameEnvironment
 
@@ -18,15 +20,18 @@ class MouseController:
     2. hwnd 模式（向后兼容）：传入 hwnd 参数，使用原生 win32 调用
     """
 
-    def __init__(self, env: Optional['GameEnvironment'] = None, hwnd: Optional[int] = None):
+    def __init__(self, env: Optional['GameEnvironment'] = None, hwnd: Optional[int] = None,
+                 mapper: Optional[CoordinateMapper] = None):
         """
         初始化鼠标控制器
 
         :param env: GameEnvironment 实例，用于抽象接口调用
         :param hwnd: 窗口句柄，用于原生 win32 调用（向后兼容）
+        :param mapper: 坐标归一化层，点击坐标按基准分辨率给出，发送前映射到实际客户区
         """
         self._env = env
         self.hwnd = hwnd
+        self.mapper: CoordinateMapper = mapper or CoordinateMapper()
 
     def bg_left_click(self, *point, x_range=0, y_range=0) -> bool:
         """
@@ -54,6 +59,7 @@ class MouseController:
 
         if x_range >= 0 or y_range >= 0:
             logger.debug(f"在基准点 {point} 周围随机点击: x={x_pos}, y={y_pos}")
+        x_pos, y_pos = self.mapper.scale.to_client(x_pos, y_pos)
 
         # 优先使用 GameEnvironment 接口
         if self._env is not None:
@@ -98,6 +104,10 @@ class MouseController:
         """
         import time
 
+        scale = self.mapper.scale
+        start_x, start_y = scale.to_client(start_x, start_y)
+        end_x, end_y = scale.to_client(end_x, end_y)
+
         if self._env is not None:
             # 使用 GameEnvironment 接口的贝塞尔滑动
             points = self._generate_bezier_points(
@@ -2,6 +2,8 @@ import cv2
 import easyocr
 from loguru import logger
 
+from win_util.frame import ScreenFrame
+
 DEFAULT_SIMILARITY_THRESHOLD = 0.3
 
 
@@ -35,7 +37,8 @@ class CommonOcr:
 
         h, w = img.shape[:2]
 
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        # 缓存帧复用本帧已计算的灰度图
+        gray = img.gray if isinstance(img, ScreenFrame) else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
         # 放大用于OCR
         fx, fy = 2.0, 2.0
         gray_resized = cv2.resize(gray, None, fx=fx, fy=fy, interpolation=cv2.INTER_CUBIC)
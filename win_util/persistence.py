@@ -0,0 +1,103 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, List, Optional
+
+from loguru import logger
+
+
+def percentile(sorted_samples: List[float], q: float) -> float:
+    """
+    已排序样本的分位数（取不超过 q 位置的样本，不插值）
+
+    :param sorted_samples: 升序排列的样本
+    :param q: 分位数，0 ~ 1
+    :return: 没有样本时返回 0
+    """
+    if not sorted_samples:
+        return 0.0
+    return sorted_samples[min(len(sorted_samples) - 1, int(q * len(sorted_samples)))]
+
+
+class JsonStore:
+    """
+    本地 JSON 文件持久化的公共部分
+
+    首次使用时加载（与本次运行已有的数据合并），有变化时才保存，读写失败只记录警告。
+    加载在 _lock 内完成，合并之后才标记为已加载，其他线程不会看到加载到一半的数据；
+    保存先写临时文件再替换，写入中途崩溃不会截断已有文件。
+    子类实现 _decode / _merge / _encode，并在修改数据后将 _dirty 置为 True；
+    访问数据前调用 _ensure_loaded（不能在持有 _lock 时调用），修改数据时持有 _lock。
+    """
+
+    # 日志中的数据名称
+    store_name = "数据"
+
+    def __init__(self, path: Optional[Path]):
+        """
+        :param path: 持久化文件路径，为 None 时不读写文件
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._loaded = path is None
+        self._dirty = False
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if not self._loaded:
+                self._load_locked()
+
+    def _decode(self, data: Any) -> Any:
+        """将文件内容解析为待合并的数据，格式错误时抛出异常（持有锁）"""
+        raise NotImplementedError
+
+    def _merge(self, loaded: Any) -> None:
+        """将解析出的数据与本次运行已有的数据合并（持有锁）"""
+        raise NotImplementedError
+
+    def _encode(self) -> Any:
+        """生成要写入文件的数据（持有锁）"""
+        raise NotImplementedError
+
+    def load(self) -> None:
+        """从持久化文件加载数据，文件不存在或损坏时从空开始"""
+        with self._lock:
+            self._load_locked()
+
+    def _load_locked(self) -> None:
+        if self.path is not None and Path(self.path).exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    loaded = self._decode(json.load(f))
+            except Exception as e:
+                logger.warning(f"加载{self.store_name}失败: {e}")
+            else:
+                self._merge(loaded)
+        self._loaded = True
+
+    def save(self) -> bool:
+        """
+        保存数据到持久化文件（没有变化时跳过）
+
+        :return: 是否写入了文件
+        """
+        if self.path is None or not self._dirty:
+            return False
+        with self._lock:
+            data = self._encode()
+            self._dirty = False
+        temp_path = Path(self.path).with_suffix(".tmp.json")
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+            return True
+        except Exception as e:
+            logger.warning(f"保存{self.store_name}失败: {e}")
+            if temp_path.exists():
+                os.remove(temp_path)
+            return False
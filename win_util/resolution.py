@@ -0,0 +1,224 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import cv2
+from loguru import logger
+
+from win_util.template_cache import DEFAULT_MTIME_CHECK_INTERVAL
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# 模板截取时的游戏客户区尺寸（窗口 1154x680 对应的客户区），脚本中的坐标均以此为准
+REFERENCE_CLIENT_SIZE = (1138, 641)
+
+# 缩放比例与 1 的偏差在该范围内时视为原始分辨率，不缩放模板
+SCALE_TOLERANCE = 0.02
+
+# 缩放后模板的磁盘缓存目录，按分辨率分子目录（本地文件，不纳入版本管理）
+SCALED_TEMPLATE_DIR = _PROJECT_ROOT / "cache" / "templates"
+
+# 预生成缩放模板时扫描的目录
+TEMPLATE_ROOT = _PROJECT_ROOT / "yys"
+
+Point = Tuple[int, int]
+Region = Tuple[int, int, int, int]
+
+
+@dataclass(frozen=True)
+class ClientScale:
+    """实际客户区尺寸与基准尺寸之间的坐标映射"""
+    width: int
+    height: int
+    sx: float = 1.0
+    sy: float = 1.0
+
+    @property
+    def is_native(self) -> bool:
+        return self.sx == 1.0 and self.sy == 1.0
+
+    @property
+    def tag(self) -> str:
+        return f"{self.width}x{self.height}"
+
+    def to_client(self, x: int, y: int) -> Point:
+        """基准坐标 -> 实际客户区坐标"""
+        if self.is_native:
+            return x, y
+        return int(round(x * self.sx)), int(round(y * self.sy))
+
+    def to_reference(self, x: int, y: int) -> Point:
+        """实际客户区坐标 -> 基准坐标"""
+        if self.is_native:
+            return x, y
+        return int(round(x / self.sx)), int(round(y / self.sy))
+
+    def region_to_client(self, x0: int, y0: int, x1: int, y1: int) -> Region:
+        """基准区域 -> 实际客户区区域（向外取整，保证不丢失边缘）"""
+        if self.is_native:
+            return x0, y0, x1, y1
+        return (int(x0 * self.sx), int(y0 * self.sy),
+                int(-(-x1 * self.sx // 1)), int(-(-y1 * self.sy // 1)))
+
+    def region_to_reference(self, x0: int, y0: int, x1: int, y1: int) -> Region:
+        """实际客户区区域 -> 基准区域"""
+        if self.is_native:
+            return x0, y0, x1, y1
+        return (int(x0 / self.sx), int(y0 / self.sy),
+                int(-(-x1 / self.sx // 1)), int(-(-y1 / self.sy // 1)))
+
+
+NATIVE_SCALE = ClientScale(*REFERENCE_CLIENT_SIZE)
+
+
+@lru_cache(maxsize=16)
+def detect_client_scale(width: int, height: int) -> ClientScale:
+    """
+    根据客户区尺寸计算缩放比例
+
+    :param width: 客户区宽度
+    :param height: 客户区高度
+    :return: ClientScale，接近基准尺寸时为原始分辨率
+    """
+    sx = width / REFERENCE_CLIENT_SIZE[0]
+    sy = height / REFERENCE_CLIENT_SIZE[1]
+    if abs(sx - 1.0) <= SCALE_TOLERANCE and abs(sy - 1.0) <= SCALE_TOLERANCE:
+        return ClientScale(width, height)
+    return ClientScale(width, height, sx, sy)
+
+
+class ScaledTemplateStore:
+    """
+    按分辨率缓存缩放后的模板文件
+
+    模板在基准分辨率下截取，客户区尺寸不同时把模板缩放到实际分辨率并写入磁盘缓存，
+    匹配仍是单尺度的，耗时与原始分辨率相同。源文件更新后对应的缩放文件自动重建。
+    """
+
+    def __init__(self, cache_dir: Path = SCALED_TEMPLATE_DIR):
+        """
+        :param cache_dir: 缓存根目录
+        """
+        self.cache_dir = Path(cache_dir)
+        self._lock = threading.Lock()
+
+    def scaled_path(self, template_path: str, scale: ClientScale) -> Path:
+        """缩放模板在缓存中的路径（按相对项目根目录的路径组织）"""
+        path = Path(os.path.normpath(template_path))
+        try:
+            relative = path.relative_to(_PROJECT_ROOT)
+        except ValueError:
+            relative = Path(path.drive.rstrip(':')) / path.relative_to(path.anchor)
+        return self.cache_dir / scale.tag / relative
+
+    def resolve(self, template_path: str, scale: Optional[ClientScale]) -> str:
+        """
+        获取当前分辨率下应使用的模板路径，缩放文件缺失或过期时生成
+
+        :param template_path: 基准模板的绝对路径
+        :param scale: 当前缩放比例，None 或原始分辨率时直接返回原路径
+        :return: 模板路径
+        """
+        if scale is None or scale.is_native:
+            return template_path
+        target = self.scaled_path(template_path, scale)
+        try:
+            source_mtime = os.stat(template_path).st_mtime
+        except OSError:
+            return template_path
+        try:
+            if os.stat(target).st_mtime >= source_mtime:
+                return str(target)
+        except OSError:
+            pass
+        with self._lock:
+            return str(target) if self._build(template_path, target, scale) else template_path
+
+    def prebuild(self, scale: ClientScale, paths: Optional[Iterable[str]] = None) -> int:
+        """
+        预先生成所有模板在指定分辨率下的缩放文件
+
+        :param scale: 缩放比例
+        :param paths: 模板路径，None 时扫描 yys 目录下所有 bmp（不含调试图片）
+        :return: 新生成的文件数
+        """
+        if scale.is_native:
+            return 0
+        if paths is None:
+            paths = list_templates()
+        built = 0
+        for path in paths:
+            target = self.scaled_path(str(path), scale)
+            if target.exists() and target.stat().st_mtime >= os.stat(path).st_mtime:
+                continue
+            with self._lock:
+                built += self._build(str(path), target, scale)
+        if built:
+            logger.info(f"已生成 {scale.tag} 分辨率的缩放模板 {built} 个: {self.cache_dir / scale.tag}")
+        return built
+
+    @staticmethod
+    def _build(source: str, target: Path, scale: ClientScale) -> bool:
+        image = cv2.imread(source)
+        if image is None:
+            return False
+        h, w = image.shape[:2]
+        size = (max(1, int(round(w * scale.sx))), max(1, int(round(h * scale.sy))))
+        # 缩小用面积插值，放大用双线性插值
+        interpolation = cv2.INTER_AREA if scale.sx * scale.sy < 1.0 else cv2.INTER_LINEAR
+        target.parent.mkdir(parents=True, exist_ok=True)
+        return bool(cv2.imwrite(str(target), cv2.resize(image, size, interpolation=interpolation)))
+
+
+def list_templates(root: Path = TEMPLATE_ROOT) -> List[str]:
+    """列出目录下所有模板图片（不含调试输出）"""
+    return sorted(str(p) for p in Path(root).rglob("*.bmp") if "debug" not in p.parts)
+
+
+class CoordinateMapper:
+    """
+    坐标归一化层
+
+    脚本、配置中的坐标均为基准分辨率坐标；截图尺寸变化时检测一次缩放比例，
+    找图前把搜索区域映射到实际客户区，找图结果、点击坐标在两者之间来回映射。
+    ImageFinder 和 MouseController 共享同一个实例。
+    """
+
+    def __init__(self, store: Optional[ScaledTemplateStore] = None):
+        self.scale: ClientScale = NATIVE_SCALE
+        self.store = store or ScaledTemplateStore()
+        # 模板路径 -> (缩放比例, 缩放模板路径, 检查时间)，避免热循环中频繁 stat
+        self._resolved: Dict[str, Tuple[ClientScale, str, float]] = {}
+
+    def update(self, width: int, height: int) -> ClientScale:
+        """
+        根据新截图尺寸更新缩放比例，尺寸变化且非原始分辨率时预生成缩放模板
+
+        :return: 当前缩放比例
+        """
+        if (width, height) == (self.scale.width, self.scale.height):
+            return self.scale
+        scale = detect_client_scale(width, height)
+        if scale.sx != self.scale.sx or scale.sy != self.scale.sy:
+            logger.info(f"客户区尺寸 {width}x{height}，缩放比例 {scale.sx:.3f}x{scale.sy:.3f}")
+            if not scale.is_native:
+                self.store.prebuild(scale)
+        self.scale = scale
+        return scale
+
+    def template_path(self, template_path: str) -> str:
+        """当前分辨率下应使用的模板路径"""
+        scale = self.scale
+        if scale.is_native:
+            return template_path
+        now = time.time()
+        cached = self._resolved.get(template_path)
+        if cached is not None and cached[0] == scale and now - cached[2] < DEFAULT_MTIME_CHECK_INTERVAL:
+            return cached[1]
+        resolved = self.store.resolve(template_path, scale)
+        self._resolved[template_path] = (scale, resolved, now)
+        return resolved
@@ -0,0 +1,196 @@
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from win_util.persistence import JsonStore
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# 学习到的搜索区域持久化文件（本地文件，不纳入版本管理）
+DEFAULT_SEARCH_REGION_FILE = _PROJECT_ROOT / "config" / "learned_search_regions.json"
+
+# 学习区域四周额外扩展的像素
+DEFAULT_SEARCH_REGION_MARGIN = 24
+
+# 至少命中多少次后才启用学习区域，避免偶然的一次匹配就收窄搜索范围
+DEFAULT_MIN_MATCHES = 3
+
+Region = Tuple[int, int, int, int]
+
+
+@dataclass
+class LearnedRegion:
+    """某个模板历次匹配位置的外接矩形（整帧坐标）"""
+    x0: int
+    y0: int
+    x1: int
+    y1: int
+    matches: int = 1
+
+    def expand(self, x0: int, y0: int, x1: int, y1: int) -> None:
+        self.x0 = min(self.x0, x0)
+        self.y0 = min(self.y0, y0)
+        self.x1 = max(self.x1, x1)
+        self.y1 = max(self.y1, y1)
+        self.matches += 1
+
+
+class SearchRegionLearner(JsonStore):
+    """
+    按模板学习搜索区域
+
+    按钮类模板几乎总出现在固定位置，记录每个模板历次匹配框的外接矩形，
+    后续查找先在「学习区域 + 边距」内搜索，未命中再回退到原始区域。
+    学习结果持久化到本地 JSON 文件，并统计命中/回退次数和跳过的像素面积。
+    """
+
+    store_name = "学习搜索区域"
+
+    def __init__(self, path: Optional[Path] = DEFAULT_SEARCH_REGION_FILE,
+                 margin: int = DEFAULT_SEARCH_REGION_MARGIN, min_matches: int = DEFAULT_MIN_MATCHES):
+        """
+        :param path: 持久化文件路径，为 None 时不读写文件
+        :param margin: 学习区域四周扩展的像素
+        :param min_matches: 启用学习区域所需的最少命中次数
+        """
+        super().__init__(path)
+        self.margin = margin
+        self.min_matches = min_matches
+        self.enabled = True
+        self._regions: Dict[str, LearnedRegion] = {}
+        self._keys: Dict[str, str] = {}
+
+        self.hits = 0
+        self.fallbacks = 0
+        self.searched_pixels = 0
+        self.skipped_pixels = 0
+
+    def _key(self, template_path: str) -> str:
+        """模板路径统一为相对项目根目录的 posix 路径，保证持久化文件可跨机器使用"""
+        key = self._keys.get(template_path)
+        if key is None:
+            path = Path(template_path)
+            if not path.is_absolute():
+                path = _PROJECT_ROOT / path
+            try:
+                key = Path(os.path.normpath(path)).relative_to(_PROJECT_ROOT).as_posix()
+            except ValueError:
+                key = Path(os.path.normpath(path)).as_posix()
+            self._keys[template_path] = key
+        return key
+
+    def suggest(self, template_path: str, x0: int, y0: int, x1: int, y1: int) -> Optional[Region]:
+        """
+        获取模板的学习搜索区域
+
+        :param template_path: 模板路径
+        :param x0, y0, x1, y1: 调用方请求的搜索区域（已限制在截图范围内）
+        :return: 学习区域与请求区域的交集，没有可用学习区域或无法缩小范围时返回 None
+        """
+        if not self.enabled:
+            return None
+        self._ensure_loaded()
+        region = self._regions.get(self._key(template_path))
+        if region is None or region.matches < self.min_matches:
+            return None
+        rx0, ry0 = max(x0, region.x0 - self.margin), max(y0, region.y0 - self.margin)
+        rx1, ry1 = min(x1, region.x1 + self.margin), min(y1, region.y1 + self.margin)
+        if rx0 >= rx1 or ry0 >= ry1 or (rx0, ry0, rx1, ry1) == (x0, y0, x1, y1):
+            return None
+        return rx0, ry0, rx1, ry1
+
+    def record(self, template_path: str, x0: int, y0: int, x1: int, y1: int) -> None:
+        """
+        记录一次匹配框（整帧坐标），扩展该模板的学习区域
+
+        :param template_path: 模板路径
+        :param x0, y0, x1, y1: 匹配框
+        """
+        if not self.enabled:
+            return
+        self._ensure_loaded()
+        key = self._key(template_path)
+        with self._lock:
+            region = self._regions.get(key)
+            if region is None:
+                self._regions[key] = LearnedRegion(x0, y0, x1, y1)
+            else:
+                region.expand(x0, y0, x1, y1)
+            self._dirty = True
+
+    def note_hit(self, requested_area: int, searched_area: int) -> None:
+        """记录一次学习区域命中，跳过的面积为请求区域与学习区域之差"""
+        with self._lock:
+            self.hits += 1
+            self.searched_pixels += searched_area
+            self.skipped_pixels += requested_area - searched_area
+
+    def note_fallback(self, requested_area: int, searched_area: int) -> None:
+        """记录一次回退：学习区域未命中，额外搜索了完整请求区域"""
+        with self._lock:
+            self.fallbacks += 1
+            self.searched_pixels += searched_area + requested_area
+
+    def get_region(self, template_path: str) -> Optional[LearnedRegion]:
+        """获取模板当前的学习区域（不含边距）"""
+        self._ensure_loaded()
+        return self._regions.get(self._key(template_path))
+
+    def forget(self, template_path: Optional[str] = None) -> None:
+        """
+        清除学习区域
+
+        :param template_path: 模板路径，为 None 时清除全部
+        """
+        with self._lock:
+            if template_path is None:
+                self._regions.clear()
+            else:
+                self._regions.pop(self._key(template_path), None)
+            self._dirty = True
+
+    def stats(self) -> Dict[str, float]:
+        """获取统计信息"""
+        with self._lock:
+            total = self.searched_pixels + self.skipped_pixels
+            return {
+                'templates': len(self._regions),
+                'hits': self.hits,
+                'fallbacks': self.fallbacks,
+                'searched_pixels': self.searched_pixels,
+                'skipped_pixels': self.skipped_pixels,
+                'skipped_ratio': self.skipped_pixels / total if total else 0.0,
+            }
+
+    def reset_stats(self) -> None:
+        """重置计数器（不清除学习区域）"""
+        with self._lock:
+            self.hits = 0
+            self.fallbacks = 0
+            self.searched_pixels = 0
+            self.skipped_pixels = 0
+
+    def _decode(self, data: Any) -> Dict[str, LearnedRegion]:
+        return {key: LearnedRegion(**value) for key, value in data.items()}
+
+    def _merge(self, loaded: Dict[str, LearnedRegion]) -> None:
+        # 本次运行已学到的区域与文件中的合并
+        for key, region in loaded.items():
+            current = self._regions.get(key)
+            if current is None:
+                self._regions[key] = region
+            else:
+                current.expand(region.x0, region.y0, region.x1, region.y1)
+                current.matches += region.matches - 1
+
+    def _encode(self) -> Dict[str, Dict[str, int]]:
+        return {key: asdict(region) for key, region in sorted(self._regions.items())}
+
+
+_search_region_learner = SearchRegionLearner()
+
+
+def get_search_region_learner() -> SearchRegionLearner:
+    """获取进程级搜索区域学习器实例"""
+    return _search_region_learner
@@ -0,0 +1,271 @@
+"""
+模板预编译包
+
+把 yys 目录下所有模板的 BGR 图、灰度图、HSV 均值以及目录结构打包为一个 .npz 文件，
+启动时一次读取，模板首次使用时不再逐个解码 BMP，场景目录注册时不再逐个扫描目录。
+
+用法：
+    python -m win_util.template_bundle [--output cache/templates.npz]
+"""
+import argparse
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from loguru import logger
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# 预编译包默认路径（本地构建产物，不纳入版本管理）
+DEFAULT_BUNDLE_PATH = _PROJECT_ROOT / "cache" / "templates.npz"
+
+# 打包时扫描的模板目录
+BUNDLE_TEMPLATE_ROOT = _PROJECT_ROOT / "yys"
+
+# 包格式版本，格式变化时递增，旧包自动失效
+BUNDLE_VERSION = 1
+
+IMAGE_EXTENSIONS = ('.bmp', '.png', '.jpg', '.jpeg')
+
+# 不参与打包的目录：调试输出和示例截图
+EXCLUDED_DIRS = {"debug", "example"}
+
+
+def _normalize(path) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+@dataclass
+class BundledTemplate:
+    """包内的一个模板（图像为包内数组的视图）"""
+    path: str
+    mtime: float
+    bgr: np.ndarray
+    gray: np.ndarray
+    hsv_mean: np.ndarray
+
+
+class TemplateBundle:
+    """
+    已加载的模板预编译包
+
+    每个模板和目录都记录了打包时的 mtime：模板文件被修改后该模板回退到读盘，
+    目录中增删文件后该目录回退到 os.listdir，其余部分仍使用包内数据。
+    """
+
+    def __init__(self, templates: Dict[str, BundledTemplate], directories: Dict[str, Tuple[float, List[str]]]):
+        """
+        :param templates: 规范化绝对路径 -> 模板
+        :param directories: 规范化目录路径 -> (目录 mtime, 目录中的图片文件名)
+        """
+        self._templates = templates
+        self._directories = directories
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.stale = 0
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def get(self, path: str, mtime: Optional[float] = None) -> Optional[BundledTemplate]:
+        """
+        获取模板
+
+        :param path: 模板路径
+        :param mtime: 模板文件当前 mtime，为 None 时自行读取
+        :return: 包内模板，不在包内或文件已修改时返回 None
+        """
+        template = self._templates.get(_normalize(path))
+        if template is None:
+            return None
+        if mtime is None:
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                return None
+        with self._lock:
+            if mtime != template.mtime:
+                self.stale += 1
+                return None
+            self.hits += 1
+        return template
+
+    def listdir(self, directory: str) -> Optional[List[str]]:
+        """
+        获取目录中的图片文件名（顺序与打包时的 os.listdir 一致）
+
+        :param directory: 目录路径
+        :return: 文件名列表，目录不在包内或已变化时返回 None
+        """
+        cached = self._directories.get(_normalize(directory))
+        if cached is None:
+            return None
+        try:
+            if os.stat(directory).st_mtime != cached[0]:
+                return None
+        except OSError:
+            return None
+        return list(cached[1])
+
+    def stats(self) -> Dict[str, int]:
+        """获取统计信息"""
+        with self._lock:
+            return {'templates': len(self._templates), 'hits': self.hits, 'stale': self.stale}
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_BUNDLE_PATH, root: Path = _PROJECT_ROOT) -> Optional['TemplateBundle']:
+        """
+        加载预编译包
+
+        :param path: 包文件路径
+        :param root: 包内相对路径的根目录
+        :return: TemplateBundle，文件不存在、损坏或版本不符时返回 None
+        """
+        if not Path(path).exists():
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if int(data['version']) != BUNDLE_VERSION:
+                    logger.warning(f"模板预编译包版本不符，已忽略: {path}")
+                    return None
+                arrays = {key: data[key] for key in data.files}
+        except Exception as e:
+            logger.warning(f"加载模板预编译包失败: {e}")
+            return None
+
+        directories: Dict[str, Tuple[float, List[str]]] = {}
+        dir_paths = [_normalize(Path(root) / d) for d in arrays['dirs']]
+        for dir_path, dir_mtime in zip(dir_paths, arrays['dir_mtimes']):
+            directories[dir_path] = (float(dir_mtime), [])
+
+        templates: Dict[str, BundledTemplate] = {}
+        bgr_blob, gray_blob = arrays['bgr'], arrays['gray']
+        for i, relative in enumerate(arrays['paths']):
+            h, w = (int(v) for v in arrays['shapes'][i])
+            offset = int(arrays['offsets'][i])
+            key = _normalize(Path(root) / relative)
+            templates[key] = BundledTemplate(
+                path=key,
+                mtime=float(arrays['mtimes'][i]),
+                bgr=bgr_blob[offset * 3:(offset + h * w) * 3].reshape(h, w, 3),
+                gray=gray_blob[offset:offset + h * w].reshape(h, w),
+                hsv_mean=arrays['hsv_means'][i],
+            )
+            directories[dir_paths[arrays['dir_index'][i]]][1].append(os.path.basename(relative))
+        return cls(templates, directories)
+
+
+def _walk_template_dirs(root: Path) -> Iterator[Tuple[str, List[str]]]:
+    """遍历模板目录，返回 (目录, 目录中的图片文件名)"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in EXCLUDED_DIRS]
+        images = [f for f in filenames if f.lower().endswith(IMAGE_EXTENSIONS)]
+        if images:
+            yield dirpath, images
+
+
+def list_bundle_templates(root: Path = BUNDLE_TEMPLATE_ROOT) -> List[str]:
+    """列出会被打包的所有模板路径"""
+    return [os.path.join(dirpath, f) for dirpath, images in _walk_template_dirs(root) for f in images]
+
+
+def build_bundle(root: Path = BUNDLE_TEMPLATE_ROOT, output: Path = DEFAULT_BUNDLE_PATH,
+                 project_root: Path = _PROJECT_ROOT) -> int:
+    """
+    扫描模板目录并生成预编译包
+
+    :param root: 模板目录
+    :param output: 输出路径
+    :param project_root: 包内路径相对的根目录
+    :return: 打包的模板数
+    """
+    paths, dirs, dir_mtimes, dir_index = [], [], [], []
+    mtimes, shapes, offsets, hsv_means = [], [], [], []
+    bgr_parts, gray_parts = [], []
+    offset = 0
+    for dirpath, images in _walk_template_dirs(root):
+        dirs.append(Path(os.path.relpath(dirpath, project_root)).as_posix())
+        dir_mtimes.append(os.stat(dirpath).st_mtime)
+        for filename in images:
+            full_path = os.path.join(dirpath, filename)
+            bgr = cv2.imread(full_path)
+            if bgr is None:
+                continue
+            gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+            paths.append(f"{dirs[-1]}/{filename}")
+            dir_index.append(len(dirs) - 1)
+            mtimes.append(os.stat(full_path).st_mtime)
+            shapes.append(bgr.shape[:2])
+            offsets.append(offset)
+            hsv_means.append(cv2.mean(cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV))[:3])
+            bgr_parts.append(bgr.reshape(-1))
+            gray_parts.append(gray.reshape(-1))
+            offset += gray.size
+
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    # 先写临时文件再替换，避免运行中的脚本读到写了一半的包
+    temp_path = Path(output).with_suffix(".tmp.npz")
+    np.savez(
+        temp_path,
+        version=np.array(BUNDLE_VERSION),
+        paths=np.array(paths, dtype=str),
+        mtimes=np.array(mtimes, dtype=np.float64),
+        shapes=np.array(shapes, dtype=np.int32).reshape(-1, 2),
+        offsets=np.array(offsets, dtype=np.int64),
+        hsv_means=np.array(hsv_means, dtype=np.float64).reshape(-1, 3),
+        bgr=np.concatenate(bgr_parts) if bgr_parts else np.empty(0, np.uint8),
+        gray=np.concatenate(gray_parts) if gray_parts else np.empty(0, np.uint8),
+        dirs=np.array(dirs, dtype=str),
+        dir_mtimes=np.array(dir_mtimes, dtype=np.float64),
+        dir_index=np.array(dir_index, dtype=np.int32),
+    )
+    os.replace(temp_path, output)
+    return len(paths)
+
+
+_bundle: Optional[TemplateBundle] = None
+_bundle_loaded = False
+_bundle_lock = threading.Lock()
+
+
+def get_template_bundle() -> Optional[TemplateBundle]:
+    """获取进程级模板预编译包（首次调用时加载），未构建时返回 None"""
+    global _bundle, _bundle_loaded
+    if not _bundle_loaded:
+        with _bundle_lock:
+            if not _bundle_loaded:
+                _bundle = TemplateBundle.load()
+                _bundle_loaded = True
+                if _bundle is not None:
+                    logger.debug(f"已加载模板预编译包: {len(_bundle)} 个模板")
+    return _bundle
+
+
+def set_template_bundle(bundle: Optional[TemplateBundle]) -> None:
+    """替换进程级模板预编译包，None 表示不使用预编译包"""
+    global _bundle, _bundle_loaded
+    with _bundle_lock:
+        _bundle = bundle
+        _bundle_loaded = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成模板预编译包")
+    parser.add_argument("--root", type=Path, default=BUNDLE_TEMPLATE_ROOT)
+    parser.add_argument("--output", type=Path, default=DEFAULT_BUNDLE_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = build_bundle(args.root, args.output)
+    size = os.path.getsize(args.output) / 1024
+    print(f"已打包 {count} 个模板 -> {args.output} ({size:.0f} KB, {time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
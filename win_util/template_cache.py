@@ -0,0 +1,215 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+# 模板缓存默认内存上限（字节）
+DEFAULT_TEMPLATE_CACHE_BYTES = 64 * 1024 * 1024
+
+# 两次检查模板文件 mtime 的最小间隔（秒），避免热循环中频繁 stat
+DEFAULT_MTIME_CHECK_INTERVAL = 1.0
+
+
+@dataclass
+class TemplateEntry:
+    """已解码的模板图片及其预计算特征"""
+    path: str
+    mtime: float
+    bgr: np.ndarray
+    gray: np.ndarray
+    hsv_mean: np.ndarray
+    checked_at: float = 0.0
+    pyramid: Dict[int, np.ndarray] = field(default_factory=dict, repr=False)
+
+    @property
+    def height(self) -> int:
+        return self.bgr.shape[0]
+
+    @property
+    def width(self) -> int:
+        return self.bgr.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        return self.bgr.nbytes + self.gray.nbytes + self.hsv_mean.nbytes
+
+    def gray_pyramid(self, level: int) -> np.ndarray:
+        """
+        灰度金字塔下采样模板，与 ScreenFrame.gray_pyramid 使用相同的下采样方式
+
+        :param level: 层级，0 为原灰度图，每升一级宽高减半
+        """
+        if level <= 0:
+            return self.gray
+        image = self.pyramid.get(level)
+        if image is None:
+            image = cv2.pyrDown(self.gray_pyramid(level - 1))
+            self.pyramid[level] = image
+        return image
+
+
+class TemplateCache:
+    """
+    进程级模板缓存
+
+    以解析后的绝对路径为键，缓存解码后的 BGR 图、灰度图和 HSV 均值：
+    1. 按文件 mtime 失效，模板文件被替换后自动重新加载
+    2. 超出内存上限时按 LRU 淘汰
+    3. 记录命中/未命中次数，便于确认热循环不再读盘
+    4. 未命中时优先使用模板预编译包中的数据，省去解码和颜色转换
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_TEMPLATE_CACHE_BYTES,
+                 check_interval: float = DEFAULT_MTIME_CHECK_INTERVAL,
+                 use_bundle: bool = True):
+        """
+        初始化模板缓存
+
+        :param max_bytes: 缓存内存上限（字节）
+        :param check_interval: mtime 检查间隔（秒），0 表示每次访问都检查
+        :param use_bundle: 未缓存的模板优先从预编译包读取（包存在且模板未修改时）
+        """
+        self.max_bytes = max_bytes
+        self.check_interval = check_interval
+        self.use_bundle = use_bundle
+        self._entries: OrderedDict[str, TemplateEntry] = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.bundle_loads = 0
+
+    @staticmethod
+    def _resolve_key(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    def get(self, path: str) -> Optional[TemplateEntry]:
+        """
+        获取模板，未缓存或文件已变更时从磁盘加载
+
+        :param path: 模板图片路径
+        :return: TemplateEntry，文件不存在或无法解码时返回 None
+        """
+        key = self._resolve_key(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                now = time.time()
+                if now - entry.checked_at < self.check_interval:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return entry
+                mtime = self._get_mtime(key)
+                if mtime == entry.mtime:
+                    entry.checked_at = now
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return entry
+                self.invalidations += 1
+                self._remove(key)
+
+            self.misses += 1
+            entry = self._load(key)
+            if entry is None:
+                return None
+            self._entries[key] = entry
+            self._total_bytes += entry.nbytes
+            self._evict()
+            return entry
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """
+        使缓存失效
+
+        :param path: 模板路径，为 None 时清空全部缓存
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._total_bytes = 0
+                return
+            key = self._resolve_key(path)
+            if key in self._entries:
+                self._remove(key)
+
+    def stats(self) -> Dict[str, int]:
+        """获取缓存统计信息"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'bundle_loads': self.bundle_loads,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+            }
+
+    def reset_stats(self) -> None:
+        """重置计数器（不清空缓存内容）"""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.invalidations = 0
+            self.bundle_loads = 0
+
+    def __contains__(self, path: str) -> bool:
+        return self._resolve_key(path) in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _get_mtime(key: str) -> Optional[float]:
+        try:
+            return os.stat(key).st_mtime
+        except OSError:
+            return None
+
+    def _load(self, key: str) -> Optional[TemplateEntry]:
+        mtime = self._get_mtime(key)
+        if mtime is None:
+            return None
+        # 延迟导入：允许以 python -m win_util.template_bundle 运行打包命令
+        from win_util.template_bundle import get_template_bundle
+        bundle = get_template_bundle() if self.use_bundle else None
+        bundled = bundle.get(key, mtime) if bundle is not None else None
+        if bundled is not None:
+            self.bundle_loads += 1
+            return TemplateEntry(path=key, mtime=mtime, bgr=bundled.bgr, gray=bundled.gray,
+                                 hsv_mean=bundled.hsv_mean, checked_at=time.time())
+        bgr = cv2.imread(key)
+        if bgr is None:
+            return None
+        gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+        hsv_mean = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV).mean(axis=(0, 1))
+        return TemplateEntry(path=key, mtime=mtime, bgr=bgr, gray=gray,
+                             hsv_mean=hsv_mean, checked_at=time.time())
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry.nbytes
+
+    def _evict(self) -> None:
+        # 至少保留最近加载的一项，即使它本身超出上限
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, entry = self._entries.popitem(last=False)
+            self._total_bytes -= entry.nbytes
+            self.evictions += 1
+
+
+_template_cache = TemplateCache()
+
+
+def get_template_cache() -> TemplateCache:
+    """获取进程级模板缓存实例"""
+    return _template_cache
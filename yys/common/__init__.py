@@ -19,8 +19,10 @@ from yys.common.constants import (
 )
 from yys.common.operations import ImageOperations, OperationResult
 from yys.common.battle.base import BattleFlow
+from yys.common.battle.duration import BattleDurationModel
 from yys.common.battle.hooks import BattleHooks
 from yys.common.battle.flow import BattleStateMachine, BattlePhase
+from yys.common.battle.polling import FramePoller
 
 __all__ = [
     # constants
@@ -46,4 +48,6 @@ __all__ = [
     'BattleHooks',
     'BattleStateMachine',
     'BattlePhase',
+    'FramePoller',
+    'BattleDurationModel',
 ]
@@ -1,7 +1,9 @@
 # yys.common.battle - 战斗流程标准化模块
 
 from yys.common.battle.base import BattleFlow
+from yys.common.battle.duration import BattleDurationModel
 from yys.common.battle.hooks import BattleHooks
 from yys.common.battle.flow import BattleStateMachine, BattlePhase
+from yys.common.battle.polling import FramePoller
 
-__all__ = ['BattleFlow', 'BattleHooks', 'BattleStateMachine', 'BattlePhase']
+__all__ = ['BattleFlow', 'BattleHooks', 'BattleStateMachine', 'BattlePhase', 'FramePoller', 'BattleDurationModel']
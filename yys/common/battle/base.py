@@ -3,11 +3,14 @@
 
 import time
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from yys.common.constants import BattleSleep, ClickRange, ImageSimilarity, BattleEndType
 from yys.common.operations import ImageOperations, OperationResult
+from yys.common.battle.duration import BattleDurationModel
+from yys.common.battle.flow import BattlePhase, BattleStateMachine
 from yys.common.battle.hooks import BattleHooks
+from yys.common.battle.polling import DEFAULT_TICK_RATE, FramePoller
 
 
 class BattleFlow(ABC):
@@ -26,7 +29,9 @@ class BattleFlow(ABC):
         challenge_image: str,
         operations: ImageOperations,
         hooks: BattleHooks,
-        max_battle_count: int = 100
+        max_battle_count: int = 100,
+        tick_rate: float = DEFAULT_TICK_RATE,
+        durations: Optional[BattleDurationModel] = None
     ):
         """
         初始化战斗流程
@@ -36,6 +41,8 @@ class BattleFlow(ABC):
         :param operations: 图像操作实例
         :param hooks: 战斗钩子实例
         :param max_battle_count: 最大战斗次数
+        :param tick_rate: 检测战斗结束时每秒截图次数
+        :param durations: 战斗时长分布，为 None 时只在本次运行内统计（不读写持久化文件）
         """
         self.script_name = script_name
         self.challenge_image = challenge_image
@@ -44,15 +51,25 @@ class BattleFlow(ABC):
         self.max_battle_count = max_battle_count
         self.current_battle_count = 0
         self.current_victory_count = 0
+        self.state_machine = BattleStateMachine()
+        self.poller = FramePoller(operations, tick_rate, on_tick=self.state_machine.record_frame)
+        self.durations = durations if durations is not None else BattleDurationModel(path=None)
 
     def execute_battle_loop(self) -> None:
-        """执行战斗循环"""
+        """执行战斗循环，每一步进入对应的战斗阶段"""
+        phase = self.state_machine
         while self.hooks.should_continue():
+            phase.transition_to(BattlePhase.WAIT_CHALLENGE)
             self._wait_challenge()
+            phase.transition_to(BattlePhase.CLICK_CHALLENGE)
             self._click_challenge()
+            phase.transition_to(BattlePhase.WAIT_BATTLE_START)
             self._wait_battle_start()
+            phase.transition_to(BattlePhase.BATTLE_RUNNING)
             end_type = self._wait_battle_end()
+            phase.transition_to(BattlePhase.BATTLE_END)
             self._handle_battle_end(end_type)
+        phase.transition_to(BattlePhase.IDLE)
 
     def _wait_challenge(self) -> None:
         """等待挑战按钮出现"""
@@ -103,35 +120,23 @@ class BattleFlow(ABC):
         :param max_wait_seconds: 最大等待时间（秒），默认 300 秒
         :return: 战斗结束类型
         """
-        victory_images = [
-            c['image'] for c in self.BATTLE_END_CONFIGS
-            if c.get('type') == 'victory'
-        ]
-        defeat_images = [
-            c['image'] for c in self.BATTLE_END_CONFIGS
-            if c.get('type') == 'defeat'
-        ]
-
-        start_time = time.time()
-        while self.hooks.should_continue():
-            if time.time() - start_time > max_wait_seconds:
-                return BattleEndType.OTHER
-
-            # 检查胜利图片
-            for img in victory_images:
-                result = self.operations.find_image(img)
-                if result.success:
-                    return BattleEndType.VICTORY
-
-            # 检查失败图片
-            for img in defeat_images:
-                result = self.operations.find_image(img)
-                if result.success:
-                    return BattleEndType.DEFEAT
-
-            time.sleep(BattleSleep.SHORT)
-
-        return BattleEndType.OTHER
+        # 胜利图片优先：同一帧同时命中时按胜利处理
+        end_types = {}
+        for end_type, config_type in ((BattleEndType.VICTORY, 'victory'), (BattleEndType.DEFEAT, 'defeat')):
+            for c in self.BATTLE_END_CONFIGS:
+                if c.get('type') == config_type:
+                    end_types.setdefault(c['image'], end_type)
+
+        # 每个节拍截一帧新图，所有结束图片在这一帧上批量匹配；
+        # 按以往战斗时长，最早可能结束之前低频检测
+        slow_seconds = self.durations.slow_phase_seconds(self.script_name)
+        start = time.perf_counter()
+        image_path = self.poller.poll(list(end_types), max_wait_seconds, self.hooks.should_continue,
+                                      slow_seconds=slow_seconds)
+        if image_path is None:
+            return BattleEndType.OTHER
+        self.durations.record(self.script_name, time.perf_counter() - start)
+        return end_types[image_path]
 
     def _handle_battle_end(self, end_type: BattleEndType) -> None:
         """
@@ -0,0 +1,100 @@
+# yys.common.battle.duration - 战斗时长分布
+# 按脚本记录最近的战斗时长，预测本场战斗最早何时可能结束
+
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+from win_util.persistence import JsonStore, percentile
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+
+# 战斗时长持久化文件（本地文件，不纳入版本管理）
+DEFAULT_DURATION_FILE = _PROJECT_ROOT / "config" / "battle_durations.json"
+
+# 每个脚本保留的最近战斗时长样本数（滚动窗口，阵容或层数变化后能较快适应）
+DURATION_SAMPLE_SIZE = 50
+
+# 样本少于该数量时不做预测，全程高频检测
+MIN_DURATION_SAMPLES = 5
+
+# 以该分位数作为「最早可能结束」的时刻
+EARLY_QUANTILE = 0.1
+
+# 在最早可能结束的时刻之前提前多少秒切换到高频检测
+SLOW_POLL_MARGIN = 3.0
+
+
+class BattleDurationModel(JsonStore):
+    """
+    战斗时长分布
+
+    按脚本保存最近 DURATION_SAMPLE_SIZE 场战斗从开始检测到检测到结束画面的耗时，
+    跨运行持久化。同一脚本的战斗时长通常很接近，在最短的一批战斗结束之前
+    画面不可能出现结束图片，这段时间只需低频检测。
+    """
+
+    store_name = "战斗时长"
+
+    def __init__(self, path: Optional[Path] = DEFAULT_DURATION_FILE):
+        """
+        :param path: 持久化文件路径，为 None 时不读写文件
+        """
+        super().__init__(path)
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, key: str, seconds: float) -> None:
+        """
+        记录一场战斗的时长
+
+        :param key: 脚本名称
+        :param seconds: 战斗时长（秒）
+        """
+        self._ensure_loaded()
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=DURATION_SAMPLE_SIZE)
+            samples.append(seconds)
+            self._dirty = True
+
+    def slow_phase_seconds(self, key: str) -> float:
+        """
+        战斗开始后可以低频检测的时长（秒）：EARLY_QUANTILE 分位数减去 SLOW_POLL_MARGIN
+
+        :param key: 脚本名称
+        :return: 样本不足时返回 0（全程高频检测）
+        """
+        self._ensure_loaded()
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < MIN_DURATION_SAMPLES:
+            return 0.0
+        return max(0.0, percentile(samples, EARLY_QUANTILE) - SLOW_POLL_MARGIN)
+
+    def stats(self, key: str) -> Dict[str, float]:
+        """获取某个脚本的战斗时长统计"""
+        self._ensure_loaded()
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if not samples:
+            return {'samples': 0, 'mean': 0.0, 'p10': 0.0, 'p90': 0.0}
+        return {
+            'samples': len(samples),
+            'mean': sum(samples) / len(samples),
+            'p10': percentile(samples, 0.1),
+            'p90': percentile(samples, 0.9),
+        }
+
+    def _decode(self, data: Any) -> Dict[str, List[float]]:
+        return {key: [float(value) for value in values] for key, values in data.items()}
+
+    def _merge(self, loaded: Dict[str, List[float]]) -> None:
+        # 本次运行已有的样本排在以往样本之后
+        for key, values in loaded.items():
+            samples = deque(values, maxlen=DURATION_SAMPLE_SIZE)
+            samples.extend(self._samples.get(key, ()))
+            self._samples[key] = samples
+
+    def _encode(self) -> Dict[str, List[float]]:
+        return {key: [round(value, 3) for value in samples] for key, samples in sorted(self._samples.items())}
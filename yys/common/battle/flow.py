@@ -1,8 +1,11 @@
-# yys.common.battle.flow - 战斗状态机接口（预留）
-# 提供战斗阶段的状态机定义
+# yys.common.battle.flow - 战斗状态机
+# 按战斗阶段限定每帧需要匹配的模板，并记录各阶段耗时
 
+import threading
+import time
+from dataclasses import dataclass
 from enum import Enum
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, FrozenSet, Iterable, List
 
 
 class BattlePhase(Enum):
@@ -16,18 +19,57 @@ class BattlePhase(Enum):
     BATTLE_END = "battle_end"           # 战斗结束
 
 
+@dataclass
+class PhaseStats:
+    """单个阶段的累计统计"""
+    entries: int = 0
+    seconds: float = 0.0
+    frames: int = 0
+    templates: int = 0
+    match_seconds: float = 0.0
+
+
 class BattleStateMachine:
     """
-    战斗状态机（预留接口）
+    战斗状态机
 
-    提供战斗流程的状态转换管理，当前为预留接口，
-    后续可用于实现更复杂的状态机逻辑
+    每个阶段可以声明该阶段可能出现的模板集合（例如战斗进行中只可能出现战斗结束画面），
+    事件循环只匹配当前阶段声明的模板；未声明的阶段不做限制，匹配全部模板。
+    按阶段记录停留时间、帧数、每帧匹配的模板数和匹配耗时。
     """
 
     def __init__(self):
         """初始化状态机"""
         self.current_phase: BattlePhase = BattlePhase.IDLE
         self.phase_data: Dict[str, Any] = {}
+        self._phase_templates: Dict[BattlePhase, FrozenSet[str]] = {}
+        self._stats: Dict[BattlePhase, PhaseStats] = {BattlePhase.IDLE: PhaseStats(entries=1)}
+        self._entered_at = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def declare(self, phase: BattlePhase, templates: Iterable[str]) -> None:
+        """
+        声明某个阶段可能出现的模板，重复声明时合并
+
+        :param phase: 战斗阶段
+        :param templates: 模板路径
+        """
+        with self._lock:
+            self._phase_templates[phase] = self._phase_templates.get(phase, frozenset()) | frozenset(templates)
+
+    def templates_for(self, phase: Optional[BattlePhase] = None) -> Optional[FrozenSet[str]]:
+        """
+        获取阶段声明的模板集合
+
+        :param phase: 战斗阶段，为 None 时取当前阶段
+        :return: 模板路径集合，未声明时返回 None（不做限制）
+        """
+        return self._phase_templates.get(self.current_phase if phase is None else phase)
+
+    def allows(self, template_path: str) -> bool:
+        """当前阶段是否需要匹配该模板"""
+        templates = self._phase_templates.get(self.current_phase)
+        return templates is None or template_path in templates
 
     def transition_to(self, new_phase: BattlePhase, data: Optional[Dict] = None) -> None:
         """
@@ -36,7 +78,12 @@ class BattleStateMachine:
         :param new_phase: 新状态
         :param data: 状态转换时携带的数据
         """
-        self.current_phase = new_phase
+        now = time.perf_counter()
+        with self._lock:
+            self._phase_stats(self.current_phase).seconds += now - self._entered_at
+            self._phase_stats(new_phase).entries += 1
+            self._entered_at = now
+            self.current_phase = new_phase
         if data:
             self.phase_data.update(data)
 
@@ -47,3 +94,44 @@ class BattleStateMachine:
         :return: 当前战斗阶段
         """
         return self.current_phase
+
+    def phase_elapsed(self) -> float:
+        """在当前阶段已停留的时间（秒）"""
+        return time.perf_counter() - self._entered_at
+
+    def record_frame(self, seconds: float, templates: int) -> None:
+        """
+        记录当前阶段的一帧匹配
+
+        :param seconds: 本帧匹配耗时（秒）
+        :param templates: 本帧匹配的模板数
+        """
+        with self._lock:
+            stats = self._phase_stats(self.current_phase)
+            stats.frames += 1
+            stats.templates += templates
+            stats.match_seconds += seconds
+
+    def _phase_stats(self, phase: BattlePhase) -> PhaseStats:
+        stats = self._stats.get(phase)
+        if stats is None:
+            stats = self._stats[phase] = PhaseStats()
+        return stats
+
+    def report(self) -> List[Dict[str, object]]:
+        """每个阶段一行：进入次数、停留时间、帧数、平均每帧模板数和匹配耗时（含当前阶段已停留的时间）"""
+        with self._lock:
+            current = (self.current_phase, time.perf_counter() - self._entered_at)
+            items = [(phase, PhaseStats(**vars(stats))) for phase, stats in self._stats.items()]
+        rows = []
+        for phase, stats in items:
+            seconds = stats.seconds + (current[1] if phase == current[0] else 0.0)
+            rows.append({
+                'phase': phase.value,
+                'entries': stats.entries,
+                'seconds': round(seconds, 3),
+                'frames': stats.frames,
+                'templates_per_frame': round(stats.templates / stats.frames, 2) if stats.frames else 0.0,
+                'match_ms_per_frame': round(stats.match_seconds * 1000 / stats.frames, 3) if stats.frames else 0.0,
+            })
+        return rows
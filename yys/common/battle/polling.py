@@ -0,0 +1,140 @@
+# yys.common.battle.polling - 帧同步轮询
+# 每个节拍截取一帧新截图，在这一帧上批量匹配全部目标图片
+
+import threading
+import time
+from typing import Callable, Dict, Optional, Sequence
+
+from yys.common.operations import ImageOperations
+
+# 默认轮询频率（每秒节拍数）
+DEFAULT_TICK_RATE = 4.0
+
+# 低频阶段的轮询频率（每秒节拍数）
+DEFAULT_SLOW_TICK_RATE = 0.5
+
+
+class FramePoller:
+    """
+    帧同步轮询器
+
+    每个节拍只截一次图，所有目标图片在同一帧上批量匹配，命中即返回。
+    节拍间隔扣除截图和匹配本身的耗时，频率不随匹配开销漂移。
+
+    画面出现目标的时刻无法直接得知，只能确定它落在上一次未命中截图与本次命中截图之间，
+    因此「画面出现到检测到」的延迟按该区间的一半加上本次截图和匹配耗时估计。
+
+    已知目标在开始后一段时间内不会出现时（例如战斗时长很稳定），
+    可以指定这段时间按低频节拍检测，到点后切换到正常频率。
+    """
+
+    def __init__(self, operations: ImageOperations, tick_rate: float = DEFAULT_TICK_RATE,
+                 on_tick: Optional[Callable[[float, int], None]] = None,
+                 clock: Callable[[], float] = time.perf_counter,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        :param operations: 图像操作实例
+        :param tick_rate: 每秒节拍数
+        :param on_tick: 每个节拍结束后回调 (截图和匹配耗时秒数, 匹配的模板数)
+        :param clock: 计时函数（秒），测试时可替换
+        :param sleep: 休眠函数，测试时可替换
+        """
+        self.operations = operations
+        self.tick_rate = tick_rate
+        self.on_tick = on_tick
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+
+        self.ticks = 0
+        self.slow_ticks = 0
+        self.tick_seconds = 0.0
+        self.detections = 0
+        self.latency_seconds = 0.0
+        self.max_latency_seconds = 0.0
+
+    @property
+    def tick_interval(self) -> float:
+        return 1.0 / self.tick_rate if self.tick_rate > 0 else 0.0
+
+    def poll(
+        self,
+        image_paths: Sequence[str],
+        timeout: float,
+        should_continue: Callable[[], bool] = lambda: True,
+        similarity: float = 0.8,
+        slow_seconds: float = 0.0,
+        slow_tick_rate: float = DEFAULT_SLOW_TICK_RATE
+    ) -> Optional[str]:
+        """
+        轮询直到任一图片出现
+
+        :param image_paths: 图片路径列表，按优先级排列（同一帧多张命中时取靠前的）
+        :param timeout: 超时时间（秒）
+        :param should_continue: 每个节拍前检查，返回 False 时停止
+        :param similarity: 相似度阈值
+        :param slow_seconds: 开始后按 slow_tick_rate 低频检测的时长（秒）
+        :param slow_tick_rate: 低频阶段每秒节拍数
+        :return: 命中的图片路径，超时或被停止时返回 None
+        """
+        start = self.clock()
+        slow_until = start + slow_seconds
+        previous_capture = None
+        while should_continue():
+            tick_start = self.clock()
+            if tick_start - start > timeout:
+                return None
+            slow = tick_start < slow_until
+
+            image_path, result = self.operations.capture_and_find_first(image_paths, similarity)
+            elapsed = self.clock() - tick_start
+            with self._lock:
+                self.ticks += 1
+                self.slow_ticks += slow
+                self.tick_seconds += elapsed
+            if self.on_tick is not None:
+                self.on_tick(elapsed, len(image_paths))
+            if result.success:
+                self._record_detection(previous_capture, tick_start, elapsed)
+                return image_path
+
+            previous_capture = tick_start
+            remaining = self.tick_interval - elapsed
+            if slow and slow_tick_rate > 0:
+                # 低频节拍不越过切换时刻
+                remaining = min(1.0 / slow_tick_rate - elapsed, slow_until - self.clock())
+            if remaining > 0:
+                self.sleep(remaining)
+        return None
+
+    def _record_detection(self, previous_capture: Optional[float], capture: float, elapsed: float) -> None:
+        """记录一次检测延迟，首个节拍即命中时目标出现时刻未知，不计入"""
+        if previous_capture is None:
+            return
+        latency = (capture - previous_capture) / 2 + elapsed
+        with self._lock:
+            self.detections += 1
+            self.latency_seconds += latency
+            self.max_latency_seconds = max(self.max_latency_seconds, latency)
+
+    def stats(self) -> Dict[str, float]:
+        """获取统计信息"""
+        with self._lock:
+            return {
+                'ticks': self.ticks,
+                'slow_ticks': self.slow_ticks,
+                'mean_tick_ms': self.tick_seconds * 1000 / self.ticks if self.ticks else 0.0,
+                'detections': self.detections,
+                'mean_latency_ms': self.latency_seconds * 1000 / self.detections if self.detections else 0.0,
+                'max_latency_ms': self.max_latency_seconds * 1000,
+            }
+
+    def reset_stats(self) -> None:
+        """重置计数器"""
+        with self._lock:
+            self.ticks = 0
+            self.slow_ticks = 0
+            self.tick_seconds = 0.0
+            self.detections = 0
+            self.latency_seconds = 0.0
+            self.max_latency_seconds = 0.0
@@ -4,14 +4,16 @@ import random
 import sys
 import time
 from enum import IntEnum
-from typing import Optional, TYPE_CHECKING
+from typing import List, Optional, Sequence, TYPE_CHECKING
 
 import win32gui
 from loguru import logger
 
 from win_util import WinController
+from win_util.cascade import DetectorCascade, DownsampledCorrelationStage
 from win_util.event import EventBaseScript, Event
 from win_util.image import ImageMatchConfig, to_project_path
+from win_util.match_pool import MatchJob
 from yys.common import (
     BATTLE_VICTORY_SLEEP,
     BATTLE_END_SLEEP,
@@ -21,6 +23,7 @@ from yys.common import (
     BATTLE_END_CLICK_RANGE_Y,
     OCR_CLICK_RANGE,
 )
+from yys.common.battle.flow import BattlePhase, BattleStateMachine
 from yys.common.scene_manager import SceneManager, SceneDetectionResult
 
 if TYPE_CHECKING:
@@ -53,12 +56,21 @@ class WantedQuestAcceptType(IntEnum):
 BATTLE_END_SUCCESS_IMAGES = ["yys/images/battle_end_success.bmp", "yys/images/battle_end.bmp"]
 BATTLE_END_LOSS_IMAGES = ["yys/images/battle_end_loss.bmp"]
 BATTLE_END_OTHER_IMAGES = ["yys/images/battle_end_1.bmp", "yys/images/battle_end_2.bmp"]
+# 战斗结束图片每帧都要全屏匹配且绝大多数帧不会出现，先在 1/8 下采样灰度图上做相关预筛
+BATTLE_END_CASCADE_LEVEL = 3
+# 战斗中的界面元素（左上角返回箭头），出现即表示已进入战斗
+BATTLE_RUNNING_IMAGE = "yys/common/images/scene/battling.bmp"
 WANTED_QUEST_REJECT_IMAGE = "yys/images/xuanshangfengyin_reject.bmp"
 WANTED_QUEST_ACCEPT_IMAGE = "yys/images/xuanshangfengyin_accept.bmp"
 
 # OCR 点击屏幕继续
 OCR_CLICK_SCREEN_CONTINUE = "点击屏幕继续"
 
+# 战斗中连续多少帧既没有战斗界面也没有结束画面时，认为已离开战斗
+BATTLE_EXIT_MISSES = 3
+# 战斗阶段最长停留时间（秒），超过后回到空闲阶段重新匹配全部模板
+BATTLE_RUNNING_TIMEOUT = 600
+
 
 # ==================== 工具函数 ====================
 
@@ -132,6 +144,10 @@ class YYSBaseScript(EventBaseScript):
         self._max_battle_count = 103
         self.accept_wq_type: WantedQuestAcceptType = WantedQuestAcceptType.REFUSE
 
+        # 战斗阶段状态机，默认各阶段均不限制匹配范围，子类调用 _enable_battle_phases 后生效
+        self.battle_state = BattleStateMachine()
+        self._battle_exit_misses = 0
+
         # 初始化场景管理器
         self.logger.info("初始化场景管理器中...")
         self.scene_manager: SceneManager = SceneManager(self.hwnd, self.win_controller)
@@ -152,24 +168,25 @@ class YYSBaseScript(EventBaseScript):
 
     def __getattr__(self, name):
         """代理到 win_controller，实现子组件方法的直接访问"""
-        if name in ('win_controller', 'logger', 'hwnd', '_env', 'scene_manager'):
+        if name in ('win_controller', 'logger', 'hwnd', '_env', 'scene_manager', 'battle_state'):
             raise AttributeError(name)
         if hasattr(self.win_controller, name):
             return getattr(self.win_controller, name)
         raise AttributeError(name)
 
     def _register_battle_end_events(self):
-        """注册战斗结束相关的图像匹配事件"""
+        """注册战斗结束相关的图像匹配事件（共用一个下采样相关预筛，结束时输出各模板的拒绝率）"""
+        cascade = DetectorCascade([DownsampledCorrelationStage(BATTLE_END_CASCADE_LEVEL)])
         self._register_image_match_event(
-            ImageMatchConfig(BATTLE_END_SUCCESS_IMAGES),
+            ImageMatchConfig(BATTLE_END_SUCCESS_IMAGES, cascade=cascade),
             self._on_battle_victory
         )
         self._register_image_match_event(
-            ImageMatchConfig(BATTLE_END_LOSS_IMAGES),
+            ImageMatchConfig(BATTLE_END_LOSS_IMAGES, cascade=cascade),
             self._on_battle_end
         )
         self._register_image_match_event(
-            ImageMatchConfig(BATTLE_END_OTHER_IMAGES),
+            ImageMatchConfig(BATTLE_END_OTHER_IMAGES, cascade=cascade),
             self._on_battle_end
         )
 
@@ -188,6 +205,53 @@ class YYSBaseScript(EventBaseScript):
             self._on_ocr_click_screen_continue
         )
 
+    def _enable_battle_phases(self, running_images: Sequence[str] = ()):
+        """启用按战斗阶段限定匹配范围
+
+        检测到战斗界面后进入战斗阶段，此后每帧只匹配战斗界面和战斗结束图片（以及
+        running_images），不再匹配挑战按钮等战斗外的模板；战斗结束或战斗界面消失后
+        回到空闲阶段，恢复匹配全部模板。需在子类注册完自己的事件之后调用，
+        战斗界面事件优先级最低。
+
+        Args:
+            running_images: 战斗中还可能出现、需要继续匹配的图片
+        """
+        self.battle_state.declare(BattlePhase.BATTLE_RUNNING, [
+            BATTLE_RUNNING_IMAGE,
+            *BATTLE_END_SUCCESS_IMAGES,
+            *BATTLE_END_LOSS_IMAGES,
+            *BATTLE_END_OTHER_IMAGES,
+            *running_images,
+        ])
+        self._register_image_match_event(ImageMatchConfig(BATTLE_RUNNING_IMAGE), self._on_battle_running)
+
+    def _active_match_jobs(self) -> List[MatchJob]:
+        """只匹配当前战斗阶段声明的模板"""
+        jobs = super()._active_match_jobs()
+        if self.battle_state.templates_for() is None:
+            return jobs
+        return [job for job in jobs if self.battle_state.allows(job.image_path)]
+
+    def _trigger_event_from_screenshot_cache(self) -> Optional[str]:
+        """战斗中连续多帧未匹配到任何图片时回到空闲阶段"""
+        triggered = super()._trigger_event_from_screenshot_cache()
+        if self.battle_state.get_current_phase() == BattlePhase.BATTLE_RUNNING and triggered is None:
+            self._battle_exit_misses += 1
+            if self._battle_exit_misses >= BATTLE_EXIT_MISSES:
+                self.logger.debug("战斗界面已消失，恢复匹配全部模板")
+                self.battle_state.transition_to(BattlePhase.IDLE)
+        return triggered
+
+    def _on_frame_matched(self, seconds: float, templates: int):
+        """按战斗阶段记录每帧匹配耗时"""
+        self.battle_state.record_frame(seconds, templates)
+
+    def _on_battle_running(self, point: tuple):
+        """检测到战斗界面"""
+        self._battle_exit_misses = 0
+        if self.battle_state.get_current_phase() != BattlePhase.BATTLE_RUNNING:
+            self.battle_state.transition_to(BattlePhase.BATTLE_RUNNING)
+
     def bg_left_click(self, point: tuple, x_range: int = DEFAULT_CLICK_RANGE, y_range: int = DEFAULT_CLICK_RANGE):
         """后台左键点击（带随机偏移）
 
@@ -200,6 +264,7 @@ class YYSBaseScript(EventBaseScript):
 
     def _on_battle_victory(self, point: tuple):
         """战斗胜利处理"""
+        self.battle_state.transition_to(BattlePhase.BATTLE_END)
         self.bg_left_click(point)
         self._cur_battle_victory_count += 1
         time.sleep(BATTLE_VICTORY_SLEEP)
@@ -213,6 +278,7 @@ class YYSBaseScript(EventBaseScript):
         self._cur_battle_count += 1
         self._log_battle_count()
         time.sleep(BATTLE_END_CLICK_SLEEP)
+        self.battle_state.transition_to(BattlePhase.IDLE)
 
     def _log_battle_count(self):
         """记录战斗计数日志"""
@@ -263,7 +329,10 @@ class YYSBaseScript(EventBaseScript):
 
     def before_iteration(self):
         """每轮循环前的钩子方法"""
-        pass
+        if (self.battle_state.get_current_phase() == BattlePhase.BATTLE_RUNNING
+                and self.battle_state.phase_elapsed() > BATTLE_RUNNING_TIMEOUT):
+            self.logger.warning(f"战斗超过 {BATTLE_RUNNING_TIMEOUT} 秒未结束，恢复匹配全部模板")
+            self.battle_state.transition_to(BattlePhase.IDLE)
 
     def after_iteration(self):
         """每轮循环后的钩子方法"""
@@ -271,6 +340,20 @@ class YYSBaseScript(EventBaseScript):
         if self._cur_battle_count >= self._max_battle_count:
             self.stop()
 
+    def _save_match_state(self):
+        """脚本结束时额外持久化场景指纹，输出各战斗阶段耗时"""
+        super()._save_match_state()
+        self.scene_manager.save_state()
+        self._log_battle_phases(self.battle_state)
+
+    def _log_battle_phases(self, battle_state: BattleStateMachine):
+        """输出各战斗阶段的停留时间和每帧匹配开销"""
+        for row in battle_state.report():
+            if row['frames']:
+                self.logger.info(f"战斗阶段 {row['phase']}: 进入 {row['entries']} 次，共 {row['seconds']:.1f}s，"
+                                 f"{row['frames']} 帧，平均每帧 {row['templates_per_frame']:.1f} 个模板、"
+                                 f"{row['match_ms_per_frame']:.1f}ms")
+
     def on_scene_detected(self, detection_result: SceneDetectionResult):
         """场景检测回调（子类可覆盖）"""
         pass
@@ -2,7 +2,9 @@
 # 提供图像查找、点击等操作的统一封装
 
 from dataclasses import dataclass
-from typing import Optional, Tuple, TYPE_CHECKING
+from typing import Optional, Sequence, Tuple, TYPE_CHECKING
+
+from win_util.match_pool import MatchJob
 
 if TYPE_CHECKING:
     from win_util.controller import WinController
@@ -54,6 +56,25 @@ class ImageOperations:
             return OperationResult(success=True, position=point)
         return OperationResult(success=False, message="未找到目标")
 
+    def capture_and_find_first(
+        self,
+        image_paths: Sequence[str],
+        similarity: float = 0.8
+    ) -> Tuple[Optional[str], OperationResult]:
+        """
+        截取一帧新截图，在这一帧上批量查找多张图片，返回优先级最高的命中
+
+        :param image_paths: 图片路径列表，按优先级排列
+        :param similarity: 相似度阈值
+        :return: (命中的图片路径, OperationResult)，全部未命中时图片路径为 None
+        """
+        self._controller.update_screenshot_cache()
+        jobs = [MatchJob(image_path, similarity=similarity) for image_path in image_paths]
+        point, job = self._controller.bg_find_pic_first_by_cache(jobs)
+        if job is None:
+            return None, OperationResult(success=False, message="未找到目标")
+        return job.image_path, OperationResult(success=True, position=point)
+
     def find_and_click(
         self,
         image_path: str,
@@ -0,0 +1,155 @@
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from win_util.frame import ScreenFrame
+from win_util.image import to_project_path
+from win_util.resolution import ClientScale
+from win_util.template_cache import get_template_cache
+
+# 缩略图尺寸（宽, 高），场景图和画面对应区域都缩放到该尺寸后比较
+THUMBNAIL_SIZE = (12, 8)
+
+# 置信度（归一化缩略图的相关系数）低于该值的候选不做模板验证
+MIN_CONFIDENCE = 0.5
+
+# 只对排名前几的候选做模板验证
+DEFAULT_TOP_K = 2
+
+Region = Tuple[int, int, int, int]
+
+
+def normalized_thumbnail(image: np.ndarray) -> np.ndarray:
+    """
+    缩略图特征：缩放到 THUMBNAIL_SIZE，去均值并归一化为单位向量
+
+    两个特征的点积即相关系数，对整体亮度和对比度变化不敏感。
+
+    :param image: BGR 图
+    :return: 一维 float32 向量，纯色图像返回全零向量
+    """
+    thumbnail = cv2.resize(image, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+    vector = thumbnail.astype(np.float32).reshape(-1, 1)
+    mean, std = cv2.meanStdDev(vector)
+    if std[0, 0] < 1e-6:
+        return np.zeros(vector.size, dtype=np.float32)
+    return ((vector - mean[0, 0]) / (std[0, 0] * np.sqrt(vector.size))).reshape(-1)
+
+
+class SceneThumbnailClassifier:
+    """
+    场景缩略图最近邻分类器
+
+    场景图都是界面上固定位置的局部元素。注册场景图时同时给出它在画面中的区域
+    （基准坐标，固定区域或指纹学习到的位置），把场景图缩放为归一化缩略图并堆叠为参考矩阵。识别时每个不同的区域
+    只裁剪、缩放一次，区域缩略图矩阵与参考矩阵做一次矩阵乘法，取每张场景图对应区域的
+    相关系数作为置信度排序，只需对排名最前的一两个候选做模板验证，
+    识别开销不随场景数量线性增长。
+    """
+
+    def __init__(self):
+        self.enabled = True
+        # 场景图路径 -> (场景名, 区域, 缩略图)
+        self._references: Dict[str, Tuple[str, Region, np.ndarray]] = {}
+        # 参考矩阵及其索引，注册变化时重建：(场景图路径, 场景名, 区域序号, 不同区域, 参考矩阵)
+        self._matrix: Optional[Tuple[List[str], List[str], np.ndarray, List[Region], np.ndarray]] = None
+        self._lock = threading.Lock()
+
+        self.classifications = 0
+        self.classify_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self._references)
+
+    def add(self, scene: str, image_path: str, region: Optional[Region]) -> bool:
+        """
+        注册场景图（已注册时更新区域），读取失败或没有区域的图片不参与分类
+
+        :param scene: 场景名称
+        :param image_path: 场景图路径
+        :param region: 场景图在画面中的区域 (x0, y0, x1, y1)（基准坐标）
+        :return: 是否注册成功
+        """
+        if region is None:
+            return False
+        template = get_template_cache().get(to_project_path(image_path))
+        if template is None:
+            return False
+        with self._lock:
+            self._references[image_path] = (scene, tuple(int(v) for v in region), normalized_thumbnail(template.bgr))
+            self._matrix = None
+        return True
+
+    def region(self, image_path: str) -> Optional[Region]:
+        """场景图注册时的区域，未注册时返回 None"""
+        reference = self._references.get(image_path)
+        return reference[1] if reference is not None else None
+
+    def _build_matrix(self) -> Tuple[List[str], List[str], np.ndarray, List[Region], np.ndarray]:
+        paths, scenes, region_index, regions, thumbnails = [], [], [], [], []
+        positions: Dict[Region, int] = {}
+        for image_path, (scene, region, thumbnail) in self._references.items():
+            if region not in positions:
+                positions[region] = len(regions)
+                regions.append(region)
+            paths.append(image_path)
+            scenes.append(scene)
+            region_index.append(positions[region])
+            thumbnails.append(thumbnail)
+        return paths, scenes, np.array(region_index, dtype=np.intp), regions, np.stack(thumbnails)
+
+    def classify(self, frame: ScreenFrame, scale: ClientScale) -> List[Tuple[str, str, float]]:
+        """
+        对画面分类
+
+        :param frame: 整帧截图（实际客户区坐标）
+        :param scale: 当前缩放比例
+        :return: [(场景名, 场景图路径, 置信度), ...]，按置信度降序；区域超出画面的场景图不在其中
+        """
+        if not self.enabled or frame is None or not self._references:
+            return []
+        start = time.perf_counter()
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = self._build_matrix()
+            paths, scenes, region_index, regions, references = self._matrix
+
+        image = np.asarray(frame)
+        height, width = image.shape[:2]
+        observed = np.zeros((len(regions), references.shape[1]), dtype=np.float32)
+        inside = np.zeros(len(regions), dtype=bool)
+        for i, region in enumerate(regions):
+            x0, y0, x1, y1 = scale.region_to_client(*region)
+            if x0 < 0 or y0 < 0 or x1 > width or y1 > height or x0 >= x1 or y0 >= y1:
+                continue
+            observed[i] = normalized_thumbnail(image[y0:y1, x0:x1])
+            inside[i] = True
+
+        # (区域数, 场景图数) 的相关系数矩阵，每张场景图取自己区域对应的一行
+        correlations = observed @ references.T
+        confidences = correlations[region_index, np.arange(len(paths))]
+        order = np.argsort(-confidences, kind='stable')
+        ranked = [(scenes[i], paths[i], float(confidences[i])) for i in order if inside[region_index[i]]]
+
+        with self._lock:
+            self.classifications += 1
+            self.classify_seconds += time.perf_counter() - start
+        return ranked
+
+    def stats(self) -> Dict[str, float]:
+        """获取统计信息"""
+        with self._lock:
+            return {
+                'references': len(self._references),
+                'classifications': self.classifications,
+                'mean_us': self.classify_seconds * 1e6 / self.classifications if self.classifications else 0.0,
+            }
+
+    def reset_stats(self) -> None:
+        """重置计数器"""
+        with self._lock:
+            self.classifications = 0
+            self.classify_seconds = 0.0
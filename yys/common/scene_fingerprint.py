@@ -0,0 +1,317 @@
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from win_util.frame import ScreenFrame
+from win_util.persistence import JsonStore
+from win_util.resolution import ClientScale
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+# 场景指纹持久化文件（本地文件，不纳入版本管理）
+DEFAULT_FINGERPRINT_FILE = _PROJECT_ROOT / "config" / "scene_fingerprints.json"
+
+# 每张场景图采样的像素数（按 4 x 2 网格各取一个）
+FINGERPRINT_GRID = (4, 2)
+
+# 采样点周围用于评估平坦度的窗口边长：只取颜色均匀区域的像素，
+# 匹配位置偏差一两个像素或缩放插值时颜色基本不变
+FLATNESS_WINDOW = 5
+
+# 探测时各通道允许的最大差值
+DEFAULT_FINGERPRINT_TOLERANCE = 24
+
+# 与场景图一致的采样点少于该数量时不学习指纹（场景图大部分为透明背景等）
+MIN_FINGERPRINT_POINTS = 4
+
+
+@dataclass
+class SceneFingerprint:
+    """
+    某张场景图的像素指纹
+
+    points 为相对场景图左上角的采样点，colors 为确认匹配的画面在这些点的 BGR 颜色；
+    anchor 为该场景图在画面中的左上角（基准坐标），由完整模板匹配确认后学习。
+    """
+    scene: str
+    width: int
+    height: int
+    points: List[Tuple[int, int]]
+    colors: List[Tuple[int, int, int]]
+    anchor: Tuple[int, int]
+
+    @property
+    def center(self) -> Tuple[int, int]:
+        """场景图中心（基准坐标），与 bg_find_pic 返回的位置一致"""
+        return self.anchor[0] + self.width // 2, self.anchor[1] + self.height // 2
+
+
+def sample_fingerprint_points(bgr: np.ndarray, grid: Tuple[int, int] = FINGERPRINT_GRID,
+                              valid: Optional[np.ndarray] = None) -> List[Tuple[int, int]]:
+    """
+    从场景图中选取采样点
+
+    把图像划分为 cols x rows 个网格，每格取局部方差最小（颜色最均匀）的像素，
+    采样点分散在整张图上，且避开边缘和文字笔画等对位置敏感的像素。
+
+    :param bgr: 场景图（或画面中与场景图对应的区域）
+    :param grid: (cols, rows)
+    :param valid: 与 bgr 同尺寸的掩码，非 0 的像素才能作为采样点；某格没有可用像素时该格不取点
+    :return: [(x, y), ...]，相对场景图左上角
+    """
+    h, w = bgr.shape[:2]
+    half = FLATNESS_WINDOW // 2
+    if w <= 2 * half or h <= 2 * half:
+        if valid is not None and not valid[h // 2, w // 2]:
+            return []
+        return [(w // 2, h // 2)]
+
+    gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY).astype(np.float32)
+    window = (FLATNESS_WINDOW, FLATNESS_WINDOW)
+    variance = cv2.boxFilter(gray * gray, -1, window) - cv2.boxFilter(gray, -1, window) ** 2
+    if valid is not None:
+        # 不可用的像素方差置为无穷大，永远不会被选中
+        variance[valid == 0] = np.inf
+    # 窗口不完整的边缘像素不参与
+    inner = variance[half:h - half, half:w - half]
+
+    cols, rows = grid
+    inner_h, inner_w = inner.shape
+    points = []
+    for row in range(rows):
+        y0, y1 = row * inner_h // rows, (row + 1) * inner_h // rows
+        for col in range(cols):
+            x0, x1 = col * inner_w // cols, (col + 1) * inner_w // cols
+            if x0 >= x1 or y0 >= y1:
+                continue
+            cell = inner[y0:y1, x0:x1]
+            y, x = np.unravel_index(np.argmin(cell), cell.shape)
+            if not np.isfinite(cell[y, x]):
+                continue
+            points.append((x0 + int(x) + half, y0 + int(y) + half))
+    return points
+
+
+def _observed_region(frame: ScreenFrame, scale: ClientScale, anchor: Tuple[int, int],
+                     width: int, height: int) -> Optional[np.ndarray]:
+    """画面中场景图所在区域，缩放到场景图尺寸（基准分辨率）；区域超出画面时返回 None"""
+    x0, y0, x1, y1 = scale.region_to_client(anchor[0], anchor[1], anchor[0] + width, anchor[1] + height)
+    image = np.asarray(frame)
+    if x0 < 0 or y0 < 0 or x1 > image.shape[1] or y1 > image.shape[0] or x0 >= x1 or y0 >= y1:
+        return None
+    observed = image[y0:y1, x0:x1, :3]
+    if observed.shape[:2] != (height, width):
+        observed = cv2.resize(observed, (width, height), interpolation=cv2.INTER_AREA)
+    return np.ascontiguousarray(observed)
+
+
+class SceneFingerprintIndex(JsonStore):
+    """
+    场景像素指纹索引
+
+    场景图都是界面上固定位置的局部元素。某张场景图通过完整模板匹配确认后，
+    记录它在画面中的位置，并从确认匹配的画面中采样若干颜色均匀、且与场景图颜色一致的像素
+    作为指纹（场景图中的透明背景等与画面不一致的像素不会被采样）；
+    指纹未命中而模板匹配再次确认时按新画面重新学习；
+    之后识别场景时，所有已学习场景的指纹在一次向量化像素比较中完成检查，
+    只有一个场景全部命中时直接确认，多个场景同时命中或都未命中时才回退到模板匹配。
+    """
+
+    store_name = "场景指纹"
+
+    def __init__(self, path: Optional[Path] = DEFAULT_FINGERPRINT_FILE,
+                 tolerance: int = DEFAULT_FINGERPRINT_TOLERANCE):
+        """
+        :param path: 持久化文件路径，为 None 时不读写文件
+        :param tolerance: 探测时各通道允许的最大差值
+        """
+        super().__init__(path)
+        self.tolerance = tolerance
+        self.enabled = True
+        self._fingerprints: Dict[str, SceneFingerprint] = {}
+        self._keys: Dict[str, str] = {}
+        # 所有指纹拼接后的探测数组，指纹变化时重建
+        self._arrays: Optional[Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]] = None
+
+        self.probes = 0
+        self.unique_hits = 0
+        self.ties = 0
+        self.misses = 0
+        self.probe_seconds = 0.0
+
+    def _key(self, image_path: str) -> str:
+        """场景图路径统一为相对项目根目录的 posix 路径，保证持久化文件可跨机器使用"""
+        key = self._keys.get(image_path)
+        if key is None:
+            path = Path(os.path.normpath(os.path.abspath(image_path)))
+            try:
+                key = path.relative_to(_PROJECT_ROOT).as_posix()
+            except ValueError:
+                key = path.as_posix()
+            self._keys[image_path] = key
+        return key
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._fingerprints)
+
+    def get(self, image_path: str) -> Optional[SceneFingerprint]:
+        """获取场景图的指纹，未学习时返回 None"""
+        self._ensure_loaded()
+        return self._fingerprints.get(self._key(image_path))
+
+    def learn(self, scene: str, image_path: str, bgr: np.ndarray, anchor: Tuple[int, int],
+              frame: ScreenFrame, scale: ClientScale) -> bool:
+        """
+        记录一次完整模板匹配确认的场景图位置，从确认匹配的画面中采样指纹
+
+        :param scene: 场景名称
+        :param image_path: 场景图路径
+        :param bgr: 场景图（基准分辨率）
+        :param anchor: 场景图在画面中的左上角（基准坐标）
+        :param frame: 确认匹配的整帧截图（实际客户区坐标）
+        :param scale: 当前缩放比例
+        :return: 是否学到了指纹；与场景图一致的像素太少时（如画面被半透明遮罩压暗）不学习，保留旧指纹
+        """
+        if not self.enabled or frame is None:
+            return False
+        self._ensure_loaded()
+        key = self._key(image_path)
+        h, w = bgr.shape[:2]
+        anchor = (int(anchor[0]), int(anchor[1]))
+
+        observed = _observed_region(frame, scale, anchor, w, h)
+        points = []
+        if observed is not None:
+            # 只在画面与场景图颜色一致的像素中采样：抠图背景等在画面中是别的内容
+            diff = cv2.absdiff(observed, np.ascontiguousarray(bgr[:, :, :3]))
+            agree = (cv2.cvtColor(cv2.threshold(diff, self.tolerance, 255, cv2.THRESH_BINARY)[1],
+                                  cv2.COLOR_BGR2GRAY) == 0).astype(np.uint8)
+            # 采样点周围整个窗口都要一致，匹配位置偏差几个像素时仍落在一致的区域内
+            agree = cv2.erode(agree, np.ones((FLATNESS_WINDOW, FLATNESS_WINDOW), np.uint8),
+                              borderType=cv2.BORDER_CONSTANT, borderValue=0)
+            points = sample_fingerprint_points(observed, valid=agree)
+
+        if len(points) < MIN_FINGERPRINT_POINTS:
+            return False
+        with self._lock:
+            colors = [tuple(int(c) for c in observed[y, x]) for x, y in points]
+            fingerprint = SceneFingerprint(scene, w, h, points, colors, anchor)
+            if self._fingerprints.get(key) != fingerprint:
+                self._fingerprints[key] = fingerprint
+                self._arrays = None
+                self._dirty = True
+        return True
+
+    def forget(self, image_path: Optional[str] = None) -> None:
+        """
+        清除指纹
+
+        :param image_path: 场景图路径，为 None 时清除全部
+        """
+        with self._lock:
+            if image_path is None:
+                self._fingerprints.clear()
+            else:
+                self._fingerprints.pop(self._key(image_path), None)
+            self._arrays = None
+            self._dirty = True
+
+    def _build_arrays(self) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        """把所有指纹的采样点（基准坐标）和颜色拼接为连续数组，便于一次比较"""
+        keys, points, colors, starts = [], [], [], []
+        for key, fingerprint in self._fingerprints.items():
+            keys.append(key)
+            starts.append(len(points))
+            ax, ay = fingerprint.anchor
+            points.extend((ax + x, ay + y) for x, y in fingerprint.points)
+            colors.extend(fingerprint.colors)
+        return (keys,
+                np.array(points, dtype=np.float64).reshape(-1, 2),
+                np.array(colors, dtype=np.int16).reshape(-1, 3),
+                np.array(starts, dtype=np.intp))
+
+    def match(self, frame: ScreenFrame, scale: ClientScale, scenes: Dict[str, List[str]]) -> List[Tuple[str, str]]:
+        """
+        用指纹检查当前画面
+
+        :param frame: 整帧截图（实际客户区坐标）
+        :param scale: 当前缩放比例
+        :param scenes: 当前注册的 {场景名: [场景图路径]}，只返回其中的场景图
+        :return: 全部采样点都命中的 [(场景名, 场景图路径), ...]，按注册顺序
+        """
+        if not self.enabled or frame is None:
+            return []
+        self._ensure_loaded()
+        start = time.perf_counter()
+        with self._lock:
+            if self._arrays is None:
+                self._arrays = self._build_arrays()
+            keys, points, colors, starts = self._arrays
+        if not keys:
+            return []
+
+        xs = np.round(points[:, 0] * scale.sx).astype(np.intp)
+        ys = np.round(points[:, 1] * scale.sy).astype(np.intp)
+        hits = np.logical_and.reduceat(frame.probe_pixels(xs, ys, colors, self.tolerance), starts)
+        matched = {keys[i] for i in np.flatnonzero(hits)}
+
+        candidates = [(scene, path) for scene, paths in scenes.items() for path in paths
+                      if self._key(path) in matched and self._fingerprints[self._key(path)].scene == scene]
+
+        with self._lock:
+            self.probes += 1
+            self.probe_seconds += time.perf_counter() - start
+            if len(candidates) == 1:
+                self.unique_hits += 1
+            elif candidates:
+                self.ties += 1
+            else:
+                self.misses += 1
+        return candidates
+
+    def stats(self) -> Dict[str, float]:
+        """获取统计信息"""
+        with self._lock:
+            return {
+                'fingerprints': len(self._fingerprints),
+                'probes': self.probes,
+                'unique_hits': self.unique_hits,
+                'ties': self.ties,
+                'misses': self.misses,
+                'unique_ratio': self.unique_hits / self.probes if self.probes else 0.0,
+                'mean_us': self.probe_seconds * 1e6 / self.probes if self.probes else 0.0,
+            }
+
+    def reset_stats(self) -> None:
+        """重置计数器（不清除指纹）"""
+        with self._lock:
+            self.probes = 0
+            self.unique_hits = 0
+            self.ties = 0
+            self.misses = 0
+            self.probe_seconds = 0.0
+
+    def _decode(self, data: Any) -> Dict[str, SceneFingerprint]:
+        return {key: SceneFingerprint(
+            scene=value['scene'],
+            width=value['width'],
+            height=value['height'],
+            points=[tuple(p) for p in value['points']],
+            colors=[tuple(c) for c in value['colors']],
+            anchor=tuple(value['anchor']),
+        ) for key, value in data.items()}
+
+    def _merge(self, loaded: Dict[str, SceneFingerprint]) -> None:
+        # 本次运行已学到的指纹优先
+        for key, fingerprint in loaded.items():
+            self._fingerprints.setdefault(key, fingerprint)
+        self._arrays = None
+
+    def _encode(self) -> Dict[str, Dict[str, Any]]:
+        return {key: asdict(fingerprint) for key, fingerprint in sorted(self._fingerprints.items())}
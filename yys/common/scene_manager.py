@@ -1,3 +1,6 @@
+import heapq
+import itertools
+import json
 import os
 import re
 import time
@@ -6,12 +9,33 @@ from typing import Dict, List, Optional, Tuple, Set, TYPE_CHECKING, overload, An
 
 from loguru import logger
 
+from win_util.frame import as_frame
 from win_util.mouse import bg_left_click_with_range
 from win_util.image import to_project_path
+from win_util.template_bundle import get_template_bundle
+from win_util.search_region import DEFAULT_SEARCH_REGION_MARGIN
+from yys.common.scene_classifier import DEFAULT_TOP_K, MIN_CONFIDENCE, SceneThumbnailClassifier
+from yys.common.scene_fingerprint import SceneFingerprintIndex
+from yys.common.scene_telemetry import TransitionTelemetry
 
 if TYPE_CHECKING:
     from win_util.controller import WinController
 
+IMAGE_EXTENSIONS = ('.bmp', '.png', '.jpg', '.jpeg')
+
+# 场景图目录下记录各场景图在画面中固定区域的文件：{文件名: [x0, y0, x1, y1]}（基准坐标）
+SCENE_REGION_FILE = 'scene_regions.json'
+
+# 跳转按钮文件名：source_to_dest.bmp / to_dest.bmp
+_TRANSITION_PATTERN = re.compile(r'(.+)_to_(.+)\.(bmp|png|jpg|jpeg)')
+_GLOBAL_TRANSITION_PATTERN = re.compile(r'to_(.+)\.(bmp|png|jpg|jpeg)')
+
+# 点击跳转按钮后检测场景的轮询间隔（秒）
+TRANSITION_POLL_INTERVAL = 0.2
+
+# 单步跳转的超时时间（秒），超过后视为跳转失败
+DEFAULT_HOP_TIMEOUT = 8.0
+
 
 class SceneDetectionResult:
     """场景检测结果"""
@@ -60,6 +84,11 @@ class SceneManager:
 
         self.current_scene: Optional[str] = None
 
+        # 路由备忘：{source_scene: {dest_scene: 最短路径}}，场景图变化时清空，边权变化时丢弃受影响的源场景
+        self._routes: Dict[str, Dict[str, Tuple[Tuple[str, str, str], ...]]] = {}
+        # 路由备忘对应的边权来源及其边权版本
+        self._routes_version: Tuple[int, int] = (0, -1)
+
         # 场景图存储：{source_scene: {dest_scene: button_image_path}}
         self.scene_graph: Dict[str, Dict[str, str]] = defaultdict(dict)
 
@@ -71,17 +100,49 @@ class SceneManager:
         # 通用跳转按钮：{dest_scene: button_path}
         self.global_transitions: Dict[str, str] = {}
 
-    def register_scene(self, name: str, image_paths: List[str]):
+        # 场景像素指纹：模板匹配确认过的场景图，之后用少量像素探测即可识别
+        self.fingerprints = SceneFingerprintIndex()
+        # 场景缩略图分类器：指纹无法确认时按置信度排序，只验证排名最前的候选
+        self.classifier = SceneThumbnailClassifier()
+        # 有固定区域的场景图，其余场景图使用指纹学习到的位置参与分类
+        self._fixed_regions: Set[str] = set()
+        # 持久化的指纹位置是否已同步到分类器
+        self._learned_regions_synced = False
+
+        # 场景识别统计：每次识别实际做了几次模板匹配，直接决定跳转延迟
+        self.detections = 0
+        self.templates_tried = 0
+        self.max_templates_tried = 0
+
+        # 各跳转边的实际耗时（持久化），同时作为路径规划的边权
+        self.transition_telemetry = TransitionTelemetry()
+
+    @property
+    def scene_graph(self) -> Dict[str, Dict[str, str]]:
+        """场景有向图：{source_scene: {dest_scene: button_image_path}}"""
+        return self._scene_graph
+
+    @scene_graph.setter
+    def scene_graph(self, graph: Dict[str, Dict[str, str]]):
+        self._scene_graph = graph
+        self._routes.clear()
+
+    def register_scene(self, name: str, image_paths: List[str],
+                       regions: Optional[Dict[str, Tuple[int, int, int, int]]] = None):
         """
         注册场景及其图片
 
         Args:
             name: 场景名称
             image_paths: 场景图片路径列表（支持多张图片用于同一场景）
+            regions: {场景图路径: 在画面中的固定区域 (x0, y0, x1, y1)}，没有固定区域的场景图在指纹学到位置后参与缩略图分类
         """
         if name not in self.scene_images:
             self.scene_images[name] = []
         self.scene_images[name].extend(image_paths)
+        self._routes.clear()
+        for image_path in image_paths:
+            self._add_to_classifier(name, image_path, (regions or {}).get(image_path))
         logger.debug(f"注册场景: {name}, 图片: {image_paths}")
 
     def register_transition(self, from_scene: str, to_scene: str, button_path: str):
@@ -95,6 +156,7 @@ class SceneManager:
         """
         self.scene_transitions[(from_scene, to_scene)] = button_path
         self.scene_graph[from_scene][to_scene] = button_path
+        self._routes.clear()
         logger.debug(f"注册跳转: {from_scene} -> {to_scene}, 按钮: {button_path}")
 
     def register_global_transition(self, to_scene: str, button_path: str):
@@ -110,6 +172,7 @@ class SceneManager:
         for scene in self.scene_images.keys():
             if to_scene not in self.scene_graph[scene]:
                 self.scene_graph[scene][to_scene] = button_path
+        self._routes.clear()
         logger.debug(f"注册通用跳转: * -> {to_scene}, 按钮: {button_path}")
 
     def register_scenes_from_directory(self, scene_dir: str, control_dir: str) -> None:
@@ -117,6 +180,7 @@ class SceneManager:
         从指定目录注册场景和跳转
 
         扫描 scene_dir 下的图片文件，文件名（不含后缀）作为场景名注册。
+        scene_dir 下的 scene_regions.json 记录场景图在画面中的固定区域，不在其中的场景图在指纹学到位置后参与缩略图分类。
         扫描 control_dir 下的图片文件，按命名规则解析跳转关系：
           - source_to_dest.bmp：从 source 场景跳转到 dest 场景
           - to_dest.bmp：从任意场景跳转到 dest 场景（通用跳转）
@@ -127,26 +191,28 @@ class SceneManager:
         """
         # 注册场景图片
         if os.path.exists(scene_dir):
-            for filename in os.listdir(scene_dir):
-                if filename.lower().endswith(('.bmp', '.png', '.jpg', '.jpeg')) and filename != "scene_control":
+            regions = self._load_scene_regions(scene_dir)
+            for filename in self._list_directory(scene_dir):
+                if filename.lower().endswith(IMAGE_EXTENSIONS) and filename != "scene_control":
                     scene_name = os.path.splitext(filename)[0]
                     image_path = os.path.join(scene_dir, filename)
 
                     if scene_name not in self.scene_images:
                         self.scene_images[scene_name] = []
                     self.scene_images[scene_name].append(image_path)
+                    self._add_to_classifier(scene_name, image_path, regions.get(filename))
                     logger.debug(f"注册场景: {scene_name}, 图片: {image_path}")
 
         # 注册场景跳转
         if os.path.exists(control_dir):
-            for filename in os.listdir(control_dir):
-                if not filename.lower().endswith(('.bmp', '.png', '.jpg', '.jpeg')):
+            for filename in self._list_directory(control_dir):
+                if not filename.lower().endswith(IMAGE_EXTENSIONS):
                     continue
 
                 button_path = os.path.join(control_dir, filename)
 
                 # source_to_dest 格式
-                match = re.match(r'(.+)_to_(.+)\.(bmp|png|jpg|jpeg)', filename)
+                match = _TRANSITION_PATTERN.match(filename)
                 if match:
                     source_scene = match.group(1)
                     dest_scene = match.group(2)
@@ -155,7 +221,7 @@ class SceneManager:
                     continue
 
                 # to_dest 格式（通用跳转）
-                match = re.match(r'to_(.+)\.(bmp|png|jpg|jpeg)', filename)
+                match = _GLOBAL_TRANSITION_PATTERN.match(filename)
                 if match:
                     dest_scene = match.group(1)
                     self.global_transitions[dest_scene] = button_path
@@ -164,6 +230,56 @@ class SceneManager:
         # 重建场景图
         self._build_scene_graph()
 
+    def _add_to_classifier(self, scene_name: str, image_path: str,
+                           region: Optional[Tuple[int, int, int, int]]) -> None:
+        """
+        把场景图注册到缩略图分类器
+
+        没有固定区域的场景图在指纹学习到它在画面中的位置后再注册（见 _sync_learned_region）。
+
+        Args:
+            scene_name: 场景名称
+            image_path: 场景图路径
+            region: 固定区域 (x0, y0, x1, y1)（基准坐标），没有时为 None
+        """
+        if region is None:
+            self._learned_regions_synced = False
+            return
+        self._fixed_regions.add(image_path)
+        self.classifier.add(scene_name, image_path, region)
+
+    def _sync_learned_region(self, scene_name: str, image_path: str) -> None:
+        """没有固定区域的场景图按指纹学习到的位置注册到分类器，位置变化时更新"""
+        if image_path in self._fixed_regions:
+            return
+        fingerprint = self.fingerprints.get(image_path)
+        if fingerprint is None:
+            return
+        x, y = fingerprint.anchor
+        region = (x, y, x + fingerprint.width, y + fingerprint.height)
+        if self.classifier.region(image_path) != region:
+            self.classifier.add(scene_name, image_path, region)
+
+    @staticmethod
+    def _load_scene_regions(scene_dir: str) -> Dict[str, Tuple[int, int, int, int]]:
+        """读取场景图目录下的固定区域文件，不存在或损坏时返回空字典"""
+        path = os.path.join(scene_dir, SCENE_REGION_FILE)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return {filename: tuple(int(v) for v in region) for filename, region in json.load(f).items()}
+        except Exception as e:
+            logger.warning(f"读取场景图区域失败: {path}: {e}")
+            return {}
+
+    @staticmethod
+    def _list_directory(directory: str) -> List[str]:
+        """列出目录中的文件，模板预编译包中有该目录且目录未变化时直接使用包内列表"""
+        bundle = get_template_bundle()
+        filenames = bundle.listdir(directory) if bundle is not None else None
+        return filenames if filenames is not None else os.listdir(directory)
+
     def _build_scene_graph(self):
         """构建场景有向图"""
 
@@ -178,6 +294,7 @@ class SceneManager:
                 if dest_scene in self.scene_graph[source_scene]:
                     continue
                 self.scene_graph[source_scene][dest_scene] = button_path
+        self._routes.clear()
 
         logger.info(f"场景图构建完成，共发现 {len(self.scene_graph)} 个场景节点")
         for source, destinations in self.scene_graph.items():
@@ -195,24 +312,194 @@ class SceneManager:
 
     # 最后的实现部分
     def detect_current_scene(self, screenshot: Optional[Any] = None) -> Optional[SceneDetectionResult]:
-        # 如果没有传入 screenshot，则使用缓存
-        big_img = screenshot if screenshot is not None else self.win_controller.image_finder.screenshot_cache
-
-        # 遍历所有场景及其对应的图像
-        for scene_name, image_paths in self.scene_images.items():
-            for image_path in image_paths:
-                # 注意这里使用的是处理后的 big_img
-                pos = self.win_controller.bg_find_pic(big_img, image_path)
-
-                if pos != (-1, -1):
-                    self.current_scene = scene_name
-                    return SceneDetectionResult(
-                        scene_name=scene_name,
-                        matched_image=image_path,
-                        position=pos
-                    )
+        # 如果没有传入 screenshot，则使用缓存；外部截图包装为 ScreenFrame，让所有场景图共享灰度图等产物
+        big_img = as_frame(screenshot) if screenshot is not None else self.win_controller.image_finder.screenshot_cache
+
+        tried_before = self.templates_tried
+        result = self._detect(big_img)
+        tried = self.templates_tried - tried_before
+        self.detections += 1
+        self.max_templates_tried = max(self.max_templates_tried, tried)
+        return result
+
+    def _detect(self, big_img: Any) -> Optional[SceneDetectionResult]:
+        """依次用像素指纹、缩略图分类和按场景图顺序的模板匹配识别场景，确认即返回"""
+        # 先用像素指纹识别：唯一命中时直接确认，多个命中时只在这些场景图中做模板匹配
+        scale = self.win_controller.image_finder.mapper.scale
+        candidates = self.fingerprints.match(big_img, scale, self.scene_images)
+        if len(candidates) == 1:
+            scene_name, image_path = candidates[0]
+            self.current_scene = scene_name
+            return SceneDetectionResult(
+                scene_name=scene_name,
+                matched_image=image_path,
+                position=self.fingerprints.get(image_path).center
+            )
+        scan_order = self._scan_order()
+        if candidates:
+            priority = {item: i for i, item in enumerate(scan_order)}
+            candidates.sort(key=lambda item: priority.get(item, len(priority)))
+        for scene_name, image_path in candidates:
+            result = self._detect_by_template(big_img, scene_name, image_path)
+            if result is not None:
+                return result
+        tried = set(candidates)
+
+        # 再用缩略图分类排序，只在排名最前的候选的区域附近做模板验证
+        if not self._learned_regions_synced:
+            # 以往运行学到的指纹位置在首次识别时同步到分类器
+            for scene_name, image_path in self._scan_order():
+                self._sync_learned_region(scene_name, image_path)
+            self._learned_regions_synced = True
+        ranked = self.classifier.classify(big_img, scale)
+        verified = 0
+        for scene_name, image_path, confidence in ranked:
+            if verified >= DEFAULT_TOP_K or confidence < MIN_CONFIDENCE:
+                break
+            if (scene_name, image_path) in tried or image_path not in self.scene_images.get(scene_name, ()):
+                continue
+            verified += 1
+            # 验证未通过的候选不再在整帧上重复匹配
+            tried.add((scene_name, image_path))
+            x0, y0, x1, y1 = self.classifier.region(image_path)
+            margin = DEFAULT_SEARCH_REGION_MARGIN
+            result = self._detect_by_template(big_img, scene_name, image_path,
+                                              (x0 - margin, y0 - margin, x1 + margin, y1 + margin))
+            if result is not None:
+                return result
+
+        # 都未确认时回退到逐个模板匹配：上次场景、其相邻场景优先
+        for scene_name, image_path in scan_order:
+            if (scene_name, image_path) in tried:
+                continue
+            result = self._detect_by_template(big_img, scene_name, image_path)
+            if result is not None:
+                return result
         return None
+
+    def _scan_order(self) -> List[Tuple[str, str]]:
+        """
+        逐个模板匹配时的场景图顺序
+
+        上一次识别到的场景最可能仍是当前场景，其次是从它一步可达的场景，其余按注册顺序。
+
+        Returns:
+            [(场景名, 场景图路径), ...]
+        """
+        scenes: List[str] = []
+        if self.current_scene in self.scene_images:
+            scenes.append(self.current_scene)
+            for neighbour in self.scene_graph.get(self.current_scene, {}):
+                if neighbour in self.scene_images and neighbour != self.current_scene:
+                    scenes.append(neighbour)
+        seen = set(scenes)
+        scenes.extend(scene for scene in self.scene_images if scene not in seen)
+        return [(scene, image_path) for scene in scenes for image_path in self.scene_images[scene]]
+
+    def _detect_by_template(self, big_img: Any, scene_name: str, image_path: str,
+                            region: Optional[Tuple[int, int, int, int]] = None) -> Optional[SceneDetectionResult]:
+        """
+        用完整模板匹配确认场景图，命中时从该帧重新学习该场景图的像素指纹
+
+        Args:
+            big_img: 截图
+            scene_name: 场景名称
+            image_path: 场景图路径
+            region: 搜索区域 (x0, y0, x1, y1)，为 None 时搜索整帧
+
+        Returns:
+            命中时返回检测结果，否则返回 None
+        """
+        self.templates_tried += 1
+        x0, y0, x1, y1 = region if region is not None else (0, 0, 99999, 99999)
+        pos = self.win_controller.bg_find_pic(big_img, image_path, max(0, x0), max(0, y0), x1, y1)
+        if pos == (-1, -1):
+            return None
+
+        template = self.win_controller.image_finder.template_cache.get(to_project_path(image_path))
+        if template is not None:
+            anchor = (pos[0] - template.width // 2, pos[1] - template.height // 2)
+            self.fingerprints.learn(scene_name, image_path, template.bgr, anchor,
+                                    big_img, self.win_controller.image_finder.mapper.scale)
+            self._sync_learned_region(scene_name, image_path)
+
+        self.current_scene = scene_name
+        return SceneDetectionResult(
+            scene_name=scene_name,
+            matched_image=image_path,
+            position=pos
+        )
+
+    def detection_stats(self) -> Dict[str, float]:
+        """获取场景识别统计"""
+        return {
+            'detections': self.detections,
+            'templates_tried': self.templates_tried,
+            'mean_templates_tried': self.templates_tried / self.detections if self.detections else 0.0,
+            'max_templates_tried': self.max_templates_tried,
+        }
+
+    def save_state(self) -> None:
+        """持久化学习到的场景指纹和跳转耗时并输出统计"""
+        self.fingerprints.save()
+        self.transition_telemetry.save()
+        stats = self.fingerprints.stats()
+        if stats['probes']:
+            logger.info(f"场景指纹: 唯一命中 {stats['unique_hits']} / {stats['probes']} 次 ({stats['unique_ratio']:.1%})，"
+                        f"并列 {stats['ties']} 次，未命中 {stats['misses']} 次，平均 {stats['mean_us']:.0f}us")
+        stats = self.detection_stats()
+        if stats['detections']:
+            logger.info(f"场景识别: {stats['detections']} 次，平均每次模板匹配 {stats['mean_templates_tried']:.2f} 次，"
+                        f"最多 {stats['max_templates_tried']} 次")
+        for row in self.transition_telemetry.report():
+            logger.info(f"场景跳转: {row['from']} -> {row['to']} {row['attempts']} 次，失败 {row['failures']} 次，"
+                        f"平均 {row['mean_ms']}ms，P95 {row['p95_ms']}ms")
+        stats = self.classifier.stats()
+        if stats['classifications']:
+            logger.info(f"场景缩略图分类: {stats['classifications']} 次，{stats['references']} 张场景图，"
+                        f"平均 {stats['mean_us']:.0f}us")
     
+    def _routes_from(self, source_scene: str) -> Dict[str, Tuple[Tuple[str, str, str], ...]]:
+        """
+        从源场景出发一次 Dijkstra 得到到所有可达场景的预期耗时最短路径，结果备忘到场景图或边权变化为止
+
+        边权为该跳转实测的预期代价（平均耗时 + 失败惩罚），只在明显变化时更新，没有记录的边使用默认值，
+        此时等价于跳转次数最少；代价相同时取跳转次数少的路径。
+
+        Args:
+            source_scene: 源场景
+
+        Returns:
+            {dest_scene: ((from_scene, to_scene, button_path), ...)}，不含源场景自身
+        """
+        telemetry = self.transition_telemetry
+        if self._routes_version != (id(telemetry), telemetry.routing_version):
+            self._routes.clear()
+        routes = self._routes.get(source_scene)
+        if routes is not None:
+            return routes
+
+        paths = {source_scene: ()}
+        settled = set()
+        counter = itertools.count()
+        heap = [(0.0, 0, next(counter), source_scene, ())]
+        while heap:
+            cost, hops, _, current, path = heapq.heappop(heap)
+            if current in settled:
+                continue
+            settled.add(current)
+            paths[current] = path
+            for next_scene, button_path in self.scene_graph.get(current, {}).items():
+                if next_scene not in settled:
+                    edge_cost = telemetry.routing_cost(current, next_scene)
+                    heapq.heappush(heap, (cost + edge_cost, hops + 1, next(counter), next_scene,
+                                          path + ((current, next_scene, button_path),)))
+        del paths[source_scene]
+        self._routes[source_scene] = paths
+        # 计算过程中可能首次加载了持久化记录，以计算后的版本为准
+        self._routes_version = (id(telemetry), telemetry.routing_version)
+        return paths
+
     def is_reachable(self, source_scene: str, target_scene: str) -> bool:
         """
         检查两个场景是否可达
@@ -224,30 +511,11 @@ class SceneManager:
         Returns:
             是否可达
         """
-        if source_scene == target_scene:
-            return True
-        
-        # 使用BFS检查可达性
-        visited = set()
-        queue = deque([source_scene])
-        visited.add(source_scene)
-        
-        while queue:
-            current = queue.popleft()
-            
-            if current == target_scene:
-                return True
-            
-            for neighbor in self.scene_graph[current]:
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append(neighbor)
-        
-        return False
+        return source_scene == target_scene or target_scene in self._routes_from(source_scene)
     
     def get_shortest_path(self, source_scene: str, target_scene: str) -> Optional[List[Tuple[str, str, str]]]:
         """
-        使用BFS计算从源场景到目标场景的最短路径
+        获取从源场景到目标场景预期耗时最短的路径
         
         Args:
             source_scene: 源场景
@@ -258,36 +526,37 @@ class SceneManager:
         """
         if source_scene == target_scene:
             return []  # 已在目标场景
-        
-        if not self.is_reachable(source_scene, target_scene):
+
+        path = self._routes_from(source_scene).get(target_scene)
+        if path is None:
             logger.error(f"无法从 {source_scene} 到达 {target_scene}")
             return None
-        
-        # BFS寻找最短路径
-        queue = deque([(source_scene, [])])  # (current_scene, path_to_here)
-        visited = {source_scene}
-        
-        while queue:
-            current_scene, path = queue.popleft()
-            
-            if current_scene == target_scene:
-                return path
-            
-            for next_scene, button_path in self.scene_graph[current_scene].items():
-                if next_scene not in visited:
-                    visited.add(next_scene)
-                    new_path = path + [(current_scene, next_scene, button_path)]
-                    queue.append((next_scene, new_path))
-        
-        return None  # 不应到达此行，因为前面已检查可达性
+        return list(path)
+
+    def get_reachable_scenes(self, source_scene: str) -> Set[str]:
+        """
+        获取从源场景出发可到达的所有场景（不含源场景自身）
+
+        Args:
+            source_scene: 源场景
+
+        Returns:
+            可达场景名称集合
+        """
+        return set(self._routes_from(source_scene))
     
-    def goto_scene(self, target_scene: str, timeout: int = 30) -> bool:
+    def goto_scene(self, target_scene: str, timeout: int = 30, hop_timeout: float = DEFAULT_HOP_TIMEOUT,
+                   poll_interval: float = TRANSITION_POLL_INTERVAL) -> bool:
         """
         跳转到目标场景
+
+        每一步点击跳转按钮后按 poll_interval 轮询，识别到下一场景即继续，不再固定等待。
         
         Args:
             target_scene: 目标场景名称
             timeout: 整个跳转过程的超时时间（秒）
+            hop_timeout: 单步跳转的超时时间（秒）
+            poll_interval: 点击后检测场景的轮询间隔（秒）
             
         Returns:
             是否成功跳转
@@ -315,11 +584,12 @@ class SceneManager:
         
         logger.info(f"找到跳转路径: {' -> '.join([current_scene] + [step[1] for step in path])}")
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # 按路径顺序执行跳转
         for from_scene, to_scene, button_path in path:
-            if time.time() - start_time > timeout:
+            remaining = timeout - (time.perf_counter() - start_time)
+            if remaining <= 0:
                 logger.error("跳转超时")
                 return False
             
@@ -334,32 +604,74 @@ class SceneManager:
             # 点击跳转按钮
             bg_left_click_with_range(self.hwnd, button_pos, x_range=5, y_range=5)
 
-            # 等待场景切换完成（可适当延时等待动画）
-            time.sleep(3.0)
-
-            # 点击后刷新截图缓存，确保检测使用的是最新截图
-            self.win_controller.update_screenshot_cache()
-
-            # 重新检测当前场景以确认跳转成功
-            new_detection = self.detect_current_scene()
-            if not new_detection or new_detection.scene_name != to_scene:
-                logger.warning(f"跳转到 {to_scene} 可能失败，当前场景为 {new_detection.scene_name if new_detection else '未知'}")
-                # 可以选择重试或继续等待
-                time.sleep(1.0)
-                new_detection = self.detect_current_scene()
-            
-            if not new_detection or new_detection.scene_name != to_scene:
+            # 轮询直到确认进入目标场景，不再固定等待动画
+            if not self._wait_for_scene(from_scene, to_scene, min(hop_timeout, remaining), poll_interval):
                 logger.error(f"未能成功跳转到 {to_scene}")
                 return False
         
-        # 最终确认已到达目标场景
-        final_detection = self.detect_current_scene()
-        if final_detection and final_detection.scene_name == target_scene:
-            logger.success(f"成功跳转到场景: {target_scene}")
-            return True
-        else:
-            logger.error(f"跳转完成后场景检测异常，期望: {target_scene}，实际: {final_detection.scene_name if final_detection else '未知'}")
-            return False
+        logger.success(f"成功跳转到场景: {target_scene}，耗时 {time.perf_counter() - start_time:.2f}s")
+        return True
+
+    def _wait_for_scene(self, from_scene: str, to_scene: str, timeout: float, poll_interval: float) -> bool:
+        """
+        点击跳转按钮后轮询截图，直到识别到目标场景或超时，并记录该边的实际耗时
+
+        Args:
+            from_scene: 源场景
+            to_scene: 目标场景
+            timeout: 本次跳转的超时时间（秒）
+            poll_interval: 轮询间隔（秒）
+
+        Returns:
+            是否到达目标场景
+        """
+        clicked_at = time.perf_counter()
+        deadline = clicked_at + timeout
+        detection = None
+        while True:
+            time.sleep(poll_interval)
+            # 刷新截图缓存，确保检测使用的是最新截图
+            self.win_controller.update_screenshot_cache()
+            detection = self.detect_current_scene()
+            if detection and detection.scene_name == to_scene:
+                elapsed = time.perf_counter() - clicked_at
+                self._record_transition(from_scene, to_scene, elapsed, True)
+                logger.info(f"已进入 {to_scene}，耗时 {elapsed:.2f}s")
+                return True
+            if time.perf_counter() >= deadline:
+                break
+
+        self._record_transition(from_scene, to_scene, time.perf_counter() - clicked_at, False)
+        logger.warning(f"跳转到 {to_scene} 超时（{timeout:.1f}s），当前场景为 {detection.scene_name if detection else '未知'}")
+        return False
+
+    def _record_transition(self, from_scene: str, to_scene: str, seconds: float, success: bool) -> None:
+        """
+        记录一次跳转耗时；边权变化时只丢弃可能受影响的源场景的路由备忘
+
+        边权变大时，只有最短路径经过该边的源场景需要重算；边权变小时，
+        能到达该边起点的源场景才可能出现更短的路径。
+
+        Args:
+            from_scene: 源场景
+            to_scene: 目标场景
+            seconds: 点击到确认（或超时）的耗时（秒）
+            success: 是否到达目标场景
+        """
+        telemetry = self.transition_telemetry
+        memo_current = self._routes_version == (id(telemetry), telemetry.routing_version)
+        old_cost = telemetry.routing_cost(from_scene, to_scene)
+        if not telemetry.record(from_scene, to_scene, seconds, success) or not memo_current:
+            return
+        cheaper = telemetry.routing_cost(from_scene, to_scene) < old_cost
+        for source_scene, routes in list(self._routes.items()):
+            if cheaper:
+                affected = source_scene == from_scene or from_scene in routes
+            else:
+                affected = any(step[:2] == (from_scene, to_scene) for path in routes.values() for step in path)
+            if affected:
+                del self._routes[source_scene]
+        self._routes_version = (id(telemetry), telemetry.routing_version)
 
     def click_return(self):
         """点击返回按钮"""
@@ -0,0 +1,189 @@
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from win_util.persistence import JsonStore, percentile
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+# 跳转耗时持久化文件（本地文件，不纳入版本管理）
+DEFAULT_TRANSITION_FILE = _PROJECT_ROOT / "config" / "scene_transitions.json"
+
+# 每条边保留的最近耗时样本数，用于计算分位数
+LATENCY_SAMPLE_SIZE = 256
+
+# 没有成功记录的边的预估耗时（秒），与原先每步固定等待的时间相同
+DEFAULT_EDGE_COST = 3.0
+
+# 一次失败的代价（秒）：等到单步超时后还需要重新识别、重新规划
+FAILURE_PENALTY = 8.0
+
+# 预期代价相对路径规划所用边权的变化超过该比例时才更新边权，
+# 每次跳转带来的小幅波动不足以改变路线，不必重新规划
+ROUTE_COST_TOLERANCE = 0.2
+
+Edge = Tuple[str, str]
+
+
+@dataclass
+class EdgeLatency:
+    """单条场景跳转边的累计耗时"""
+    attempts: int = 0
+    failures: int = 0
+    total_seconds: float = 0.0
+    samples: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLE_SIZE), repr=False)
+
+    @property
+    def successes(self) -> int:
+        return self.attempts - self.failures
+
+    @property
+    def mean_seconds(self) -> Optional[float]:
+        """成功跳转的平均耗时，没有成功记录时为 None"""
+        return self.total_seconds / self.successes if self.successes else None
+
+    @property
+    def failure_rate(self) -> float:
+        return self.failures / self.attempts if self.attempts else 0.0
+
+    @property
+    def expected_cost(self) -> float:
+        """预期代价（秒）：平均耗时 + 失败率 * FAILURE_PENALTY，没有成功记录时按 DEFAULT_EDGE_COST 估计耗时"""
+        mean = self.mean_seconds
+        return (mean if mean is not None else DEFAULT_EDGE_COST) + self.failure_rate * FAILURE_PENALTY
+
+
+class TransitionTelemetry(JsonStore):
+    """
+    场景跳转耗时统计
+
+    按边（源场景 -> 目标场景）记录从点击跳转按钮到确认进入目标场景的实际耗时，
+    以及超时未到达的次数。次数、累计耗时和最近的耗时样本持久化到本地 JSON 文件，
+    跨运行累积。
+
+    路径规划使用的边权（routing_cost）只在预期代价偏离超过 ROUTE_COST_TOLERANCE 时更新，
+    并递增 routing_version，路由备忘据此判断是否需要重新规划。
+    """
+
+    store_name = "场景跳转耗时"
+
+    def __init__(self, path: Optional[Path] = DEFAULT_TRANSITION_FILE):
+        """
+        :param path: 持久化文件路径，为 None 时不读写文件
+        """
+        super().__init__(path)
+        self._edges: Dict[Edge, EdgeLatency] = {}
+        # 路径规划使用的边权，没有记录的边为 DEFAULT_EDGE_COST
+        self._routing_costs: Dict[Edge, float] = {}
+        # 路径规划使用的边权变化时递增
+        self.routing_version = 0
+
+    def record(self, from_scene: str, to_scene: str, seconds: float, success: bool) -> bool:
+        """
+        记录一次跳转
+
+        :param from_scene: 源场景
+        :param to_scene: 目标场景
+        :param seconds: 点击到确认（或超时）的耗时（秒）
+        :param success: 是否到达目标场景
+        :return: 该边用于路径规划的边权是否发生了变化
+        """
+        self._ensure_loaded()
+        with self._lock:
+            edge = self._edges.get((from_scene, to_scene))
+            if edge is None:
+                edge = self._edges[(from_scene, to_scene)] = EdgeLatency()
+            edge.attempts += 1
+            if success:
+                edge.total_seconds += seconds
+                edge.samples.append(seconds)
+            else:
+                edge.failures += 1
+            self._dirty = True
+            routing_cost = self._routing_costs.get((from_scene, to_scene), DEFAULT_EDGE_COST)
+            cost = edge.expected_cost
+            if abs(cost - routing_cost) <= ROUTE_COST_TOLERANCE * routing_cost:
+                return False
+            self._routing_costs[(from_scene, to_scene)] = cost
+            self.routing_version += 1
+            return True
+
+    def get(self, from_scene: str, to_scene: str) -> Optional[EdgeLatency]:
+        """获取某条边的统计，没有记录时返回 None"""
+        self._ensure_loaded()
+        with self._lock:
+            return self._edges.get((from_scene, to_scene))
+
+    def expected_cost(self, from_scene: str, to_scene: str) -> float:
+        """
+        某条边的预期代价（秒）：平均耗时 + 失败率 * FAILURE_PENALTY
+
+        没有成功记录的边按 DEFAULT_EDGE_COST 估计耗时。
+        """
+        edge = self.get(from_scene, to_scene)
+        return edge.expected_cost if edge is not None else DEFAULT_EDGE_COST
+
+    def routing_cost(self, from_scene: str, to_scene: str) -> float:
+        """路径规划使用的边权（秒）：最近一次明显变化时的预期代价"""
+        self._ensure_loaded()
+        with self._lock:
+            return self._routing_costs.get((from_scene, to_scene), DEFAULT_EDGE_COST)
+
+    def report(self) -> List[Dict[str, object]]:
+        """每条边一行（包含以往运行的累计记录和最近的耗时样本），按平均耗时降序"""
+        self._ensure_loaded()
+        with self._lock:
+            edges = {key: (e.attempts, e.failures, e.mean_seconds, sorted(e.samples)) for key, e in self._edges.items()}
+        rows = [{
+            'from': from_scene,
+            'to': to_scene,
+            'attempts': attempts,
+            'failures': failures,
+            'mean_ms': round(mean * 1000, 1) if mean is not None else None,
+            'p50_ms': round(percentile(samples, 0.5) * 1000, 1),
+            'p95_ms': round(percentile(samples, 0.95) * 1000, 1),
+        } for (from_scene, to_scene), (attempts, failures, mean, samples) in edges.items()]
+        rows.sort(key=lambda row: (-(row['mean_ms'] or 0), row['from'], row['to']))
+        return rows
+
+    def reset(self) -> None:
+        """清空所有记录"""
+        with self._lock:
+            self._edges.clear()
+            self._routing_costs.clear()
+            self._dirty = True
+            self.routing_version += 1
+
+    def _decode(self, data: Any) -> Dict[Edge, Tuple[int, int, float, List[float]]]:
+        return {(from_scene, to_scene): (int(value['attempts']), int(value['failures']),
+                                         float(value['total_seconds']),
+                                         [float(sample) for sample in value.get('samples', ())])
+                for from_scene, targets in data.items() for to_scene, value in targets.items()}
+
+    def _merge(self, loaded: Dict[Edge, Tuple[int, int, float, List[float]]]) -> None:
+        # 与本次运行已有的记录合并，本次运行的样本排在以往样本之后
+        for key, (attempts, failures, total_seconds, samples) in loaded.items():
+            edge = self._edges.get(key)
+            if edge is None:
+                edge = self._edges[key] = EdgeLatency()
+            edge.attempts += attempts
+            edge.failures += failures
+            edge.total_seconds += total_seconds
+            current = list(edge.samples)
+            edge.samples.clear()
+            edge.samples.extend(samples)
+            edge.samples.extend(current)
+        self._routing_costs = {key: edge.expected_cost for key, edge in self._edges.items()}
+        self.routing_version += 1
+
+    def _encode(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        data: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (from_scene, to_scene), edge in sorted(self._edges.items()):
+            data.setdefault(from_scene, {})[to_scene] = {
+                'attempts': edge.attempts,
+                'failures': edge.failures,
+                'total_seconds': round(edge.total_seconds, 3),
+                'samples': [round(sample, 3) for sample in edge.samples],
+            }
+        return data
@@ -32,6 +32,8 @@ class ExplorationScript(YYSBaseScript):
                                          self.bg_left_click)
         self._register_image_match_event(ImageMatchConfig("yys/exploration/images/exploration_she_zhi.bmp"),
                                          self._on_tansuo_idle)
+        # 以上均为探索地图中的事件，战斗中只需匹配战斗界面和战斗结束图片
+        self._enable_battle_phases()
 
         self.logger.info("探索脚本初始化完成")
 
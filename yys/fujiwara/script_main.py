@@ -9,6 +9,7 @@ class Main(YYSBaseScript):
         super().__init__("藤原道长-传承试炼")
 
         self._register_image_match_event(ImageMatchConfig("yys/fujiwara/images/challenge_button.bmp"), self.bg_left_click)
+        self._enable_battle_phases()
 
 
 if __name__ == '__main__':
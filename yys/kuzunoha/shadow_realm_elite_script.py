@@ -9,6 +9,7 @@ class Main(YYSBaseScript):
     def __init__(self):
         super().__init__("葛叶-影域精锐")
         self._register_image_match_event(ImageMatchConfig("yys/kuzunoha/images/challenge_button.bmp"), self.bg_left_click)
+        self._enable_battle_phases()
 
 
 if __name__ == '__main__':
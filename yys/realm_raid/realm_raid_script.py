@@ -28,6 +28,7 @@ class RealmRaidScript(YYSBaseScript):
         # 检测是不是没有可以挑战的了
         self._register_image_match_event(ImageMatchConfig("yys/common/images/scene/barrier_breakthrough.bmp"),
                                          self.on_scene_barrier_breakthrough)
+        self._enable_battle_phases()
 
     def _on_ticket_not_enough(self, point):
         """处理结界突破券不足事件"""
@@ -105,7 +106,8 @@ class RealmRaidScript(YYSBaseScript):
 
     def refresh_if_no_attackable_barrier(self):
         """检查是否有未打的结界"""
-        realm_list = self.image_finder.bg_find_pic_all_by_cache("yys/realm_raid/images/realm_raid_user_realm.bmp")
+        realm_list = self.image_finder.bg_find_pic_all_by_cache("yys/realm_raid/images/realm_raid_user_realm.bmp",
+                                                                max_results=1)
         if len(realm_list) > 0:
             return
 
@@ -5,6 +5,7 @@ import time
 
 from yys.common.event_script_base import YYSBaseScript
 from yys.common.battle.base import BattleFlow
+from yys.common.battle.duration import BattleDurationModel
 from yys.common.battle.hooks import BattleHooks
 from yys.common.constants import (
     BattleSleep,
@@ -104,7 +105,8 @@ class SoulRaidScript(YYSBaseScript):
             challenge_image="yys/soul_raid/images/yuhun_tiaozhan.bmp",
             operations=self.operations,
             hooks=hooks,
-            max_battle_count=307
+            max_battle_count=307,
+            durations=BattleDurationModel()
         )
 
         # 设置战斗结束检测配置
@@ -118,7 +120,23 @@ class SoulRaidScript(YYSBaseScript):
     def run(self):
         """启动御魂挂机"""
         self.logger.info("启动御魂挂机脚本")
-        self.battle_flow.execute_battle_loop()
+        try:
+            self.battle_flow.execute_battle_loop()
+        finally:
+            stats = self.battle_flow.poller.stats()
+            if stats['ticks']:
+                self.logger.info(f"战斗结束检测: {stats['ticks']} 帧，平均每帧 {stats['mean_tick_ms']:.1f}ms，"
+                                 f"检测延迟平均 {stats['mean_latency_ms']:.0f}ms，最大 {stats['max_latency_ms']:.0f}ms")
+            self._log_battle_phases(self.battle_flow.state_machine)
+            durations = self.battle_flow.durations
+            durations.save()
+            # 持久化学习搜索区域、模板耗时报告和场景指纹
+            self._save_match_state()
+            duration = durations.stats(self.battle_flow.script_name)
+            if duration['samples']:
+                self.logger.info(f"战斗时长: 最近 {duration['samples']} 场平均 {duration['mean']:.1f}s，"
+                                 f"P10 {duration['p10']:.1f}s，P90 {duration['p90']:.1f}s，"
+                                 f"低频检测 {stats['slow_ticks']} 帧")
 
 
 def main():
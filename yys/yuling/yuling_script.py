@@ -7,6 +7,7 @@ class AutoYuling(YYSBaseScript):
     def __init__(self):
         super().__init__("御灵")
         self._register_image_match_event(ImageMatchConfig("yys/yuling/images/yuling_tiaozhan.bmp"), self.bg_left_click)
+        self._enable_battle_phases()
 
 
 if __name__ == '__main__':